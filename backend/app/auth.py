@@ -1,56 +1,385 @@
 """
 Supabase JWT authentication middleware.
 Verifies tokens from Supabase Auth and extracts user information.
+
+Tokens are verified locally by default: HS256 tokens against the project
+JWT secret, RS256/ES256 tokens against the project's JWKS (cached and
+refreshed in the background). The Supabase `/auth/v1/user` round trip is
+only used when local verification is disabled or has no key material.
+
+Verification results are cached per token hash for the token's remaining
+lifetime, and concurrent checks of the same token share one verification.
 """
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import httpx
+import httpx
+from jose import jwt, JWTError
 from app.config import settings
+from app.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 # Bearer token security scheme
 security = HTTPBearer()
 
+# Algorithms Supabase signs access tokens with
+SUPPORTED_ALGORITHMS = ("HS256", "RS256", "ES256")
+
+# Minimum delay between forced JWKS refreshes triggered by an unknown `kid`
+JWKS_MIN_REFRESH_INTERVAL = 30.0
+
+
+class LocalVerificationUnavailable(Exception):
+    """Raised when a token cannot be checked locally (no secret or signing key)."""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# JWKS Cache
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class JWKSCache:
+    """
+    In-process cache of the Supabase project's signing keys.
+
+    Keys are served from memory; once the cache is older than its TTL a
+    refresh is scheduled in the background and the current keys keep being
+    used until it completes. An unknown `kid` (key rotation) forces one
+    awaited refresh, rate limited so bogus tokens cannot hammer Supabase.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._keys: dict[str, dict] = {}
+        self._fetched_at: float = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl_seconds
+
+    async def refresh(self) -> None:
+        """Fetch the JWKS document; concurrent callers share one request."""
+        started = time.monotonic()
+        async with self._lock:
+            # Another caller refreshed while we waited for the lock
+            if self._fetched_at >= started:
+                return
+            try:
+                response = await get_http_client().get(self.url)
+                response.raise_for_status()
+                keys = response.json().get("keys", [])
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning(f"JWKS refresh failed: {exc}")
+                return
+            self._keys = {k["kid"]: k for k in keys if "kid" in k}
+            self._fetched_at = time.monotonic()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """
+        Return the JWK for `kid`, refreshing the cache when needed.
+
+        Args:
+            kid: Key id from the token header
+
+        Returns:
+            JWK dict, or None if the key is unknown
+        """
+        if not self._keys:
+            await self.refresh()
+        elif self._is_stale():
+            self._schedule_refresh()
+
+        key = self._keys.get(kid) if kid else None
+        if key is None and time.monotonic() - self._fetched_at > JWKS_MIN_REFRESH_INTERVAL:
+            await self.refresh()
+            key = self._keys.get(kid) if kid else None
+        return key
+
+
+jwks_cache = JWKSCache(
+    url=f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+    ttl_seconds=settings.SUPABASE_JWKS_TTL_SECONDS,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Verified Token Cache
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_MISS = object()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of token verification results, keyed by token hash.
+
+    Accepted tokens are kept until they expire (capped by `max_ttl`),
+    rejected tokens for a short `negative_ttl`. Concurrent lookups of an
+    uncached token share one in-flight verification, so a burst of N
+    requests carrying the same token costs a single upstream call.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float, negative_ttl: float):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        # key -> (user or None for a rejected token, monotonic expiry)
+        self._entries: OrderedDict[str, tuple[Optional[dict], float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _get(self, key: str):
+        item = self._entries.get(key)
+        if item is None:
+            return _MISS
+        user, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return _MISS
+        self._entries.move_to_end(key)
+        return user
+
+    def _put(self, key: str, user: Optional[dict], ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._entries[key] = (user, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _ttl_for(self, token: str) -> float:
+        """Seconds until the (already verified) token expires, capped by max_ttl."""
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            exp = None
+        if exp is None:
+            return self.max_ttl
+        return min(float(exp) - time.time(), self.max_ttl)
+
+    async def _verify_and_store(
+        self,
+        key: str,
+        token: str,
+        verify: Callable[[str], Awaitable[dict]]
+    ) -> dict:
+        try:
+            user = await verify(token)
+        except HTTPException as exc:
+            # Only cache definitive rejections, not upstream outages
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                self._put(key, None, self.negative_ttl)
+            raise
+        self._put(key, user, self._ttl_for(token))
+        return user
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every waiter went away
+
+    async def get_or_verify(
+        self,
+        token: str,
+        verify: Callable[[str], Awaitable[dict]]
+    ) -> dict:
+        """
+        Return the cached user for `token`, verifying it at most once.
+
+        Args:
+            token: Raw JWT
+            verify: Coroutine function that verifies a token or raises HTTPException
+
+        Returns:
+            Verified user data
+        """
+        key = self._key(token)
+        cached = self._get(key)
+        if cached is not _MISS:
+            if cached is None:
+                raise _unauthorized()
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._verify_and_store(key, token, verify))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        # Shield so one cancelled request does not abort the shared check
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    max_ttl=settings.AUTH_CACHE_MAX_TTL_SECONDS,
+    negative_ttl=settings.AUTH_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Verification
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def _user_from_claims(claims: dict) -> dict:
+    """Shape verified JWT claims like the Supabase `/auth/v1/user` payload."""
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "role": claims.get("role"),
+        "aud": claims.get("aud"),
+        "app_metadata": claims.get("app_metadata", {}),
+        "user_metadata": claims.get("user_metadata", {}),
+        "session_id": claims.get("session_id"),
+        "exp": claims.get("exp"),
+    }
+
+
+async def verify_token_locally(token: str) -> dict:
+    """
+    Verify a Supabase access token without calling Supabase.
+
+    Args:
+        token: Raw JWT
+
+    Returns:
+        User data built from the token claims
+
+    Raises:
+        JWTError: If the token is malformed, expired or badly signed
+        LocalVerificationUnavailable: If no key is available for the token
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise JWTError(f"Unsupported signing algorithm: {algorithm}")
+
+    if algorithm == "HS256":
+        if not settings.SUPABASE_JWT_SECRET:
+            raise LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not configured")
+        key = settings.SUPABASE_JWT_SECRET
+    else:
+        key = await jwks_cache.get_key(header.get("kid"))
+        if key is None:
+            raise LocalVerificationUnavailable(f"No JWKS key for kid={header.get('kid')}")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=settings.SUPABASE_JWT_AUDIENCE,
+        options={"require_exp": True, "require_sub": True, "require_aud": True},
+    )
+    return _user_from_claims(claims)
+
+
+async def verify_token_remotely(token: str) -> dict:
+    """
+    Verify a token by asking Supabase Auth for the user it belongs to.
+
+    Args:
+        token: Raw JWT
+
+    Returns:
+        User data from Supabase Auth
+
+    Raises:
+        HTTPException: If Supabase rejects the token or is unreachable
+    """
+    try:
+        response = await get_http_client().get(
+            f"{settings.SUPABASE_URL}/auth/v1/user",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "apikey": settings.SUPABASE_ANON_KEY
+            }
+        )
+    except httpx.RequestError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Supabase auth unavailable: {exc}"
+        ) from exc
+
+    if response.status_code != 200:
+        raise _unauthorized()
+
+    return response.json()
+
+
+async def _verify_uncached(token: str) -> dict:
+    """Verify a token locally or remotely according to AUTH_VERIFY_MODE."""
+    if settings.AUTH_VERIFY_MODE == "local":
+        try:
+            return await verify_token_locally(token)
+        except JWTError as exc:
+            # A definitive answer (bad signature, expired, wrong audience) -
+            # asking Supabase would not change it.
+            raise _unauthorized() from exc
+        except LocalVerificationUnavailable as exc:
+            if not settings.AUTH_REMOTE_FALLBACK:
+                logger.error(f"Local token verification unavailable: {exc}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Token verification unavailable"
+                ) from exc
+            logger.debug(f"Falling back to remote token verification: {exc}")
+
+    return await verify_token_remotely(token)
+
+
+async def user_from_token(token: str) -> dict:
+    """
+    Verify a raw access token through the token cache.
+    For callers outside FastAPI dependencies (e.g. middleware).
+
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    return await token_cache.get_or_verify(token, _verify_uncached)
+
 
 async def verify_supabase_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
     Verify Supabase JWT and return user info.
-    
+
     Args:
         credentials: Bearer token from Authorization header
-        
+
     Returns:
-        User data from Supabase Auth
-        
+        User data (from the token claims, or from Supabase Auth on fallback)
+
     Raises:
         HTTPException: If token is invalid or expired
     """
-    token = credentials.credentials
-    
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                f"{settings.SUPABASE_URL}/auth/v1/user",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "apikey": settings.SUPABASE_ANON_KEY
-                }
-            )
-    except httpx.RequestError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Supabase auth unavailable: {exc}"
-        ) from exc
-    
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    return response.json()
+    return await user_from_token(credentials.credentials)
 
 
 async def get_current_user_id(
@@ -58,10 +387,10 @@ async def get_current_user_id(
 ) -> str:
     """
     Extract user ID from verified Supabase token.
-    
+
     Args:
         user: Verified user data from Supabase
-        
+
     Returns:
         User UUID as string
     """
@@ -73,10 +402,10 @@ async def get_current_user(
 ) -> dict:
     """
     Get full user data from verified Supabase token.
-    
+
     Args:
         user: Verified user data from Supabase
-        
+
     Returns:
         Complete user object with id, email, etc.
     """
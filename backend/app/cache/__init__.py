@@ -0,0 +1,165 @@
+"""
+Response cache.
+
+Per-user read results (stats, streak, summary, profile, dashboard entries)
+are cached under keys like `<namespace>:<user_id>:v<data_version>:<args>`.
+Writes bump the user's data version (see `app.services.version_service`),
+so stale entries are never read again and simply age out. The backend is
+chosen by CACHE_BACKEND:
+- "memory": bounded in-process LRU+TTL cache (one per worker process)
+- "redis": shared Redis cache for multi-worker deployments
+
+Versioned entries are not added to the per-user key index: nothing needs
+to find them again, and indexing every version would grow the index for
+as long as the user stays active. `invalidate_user` remains for dropping
+a user's unversioned entries explicitly.
+"""
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.cache.base import CacheBackend
+from app.cache.memory import MemoryCacheBackend, TTLCache
+from app.config import settings
+from app.services.version_service import get_data_version
+
+_MISS = object()
+
+_backend: Optional[CacheBackend] = None
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the backend selected by the CACHE_* settings."""
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("CACHE_BACKEND=redis requires REDIS_URL")
+        try:
+            from app.cache.redis_backend import RedisCacheBackend
+        except ImportError as exc:
+            raise RuntimeError(
+                "The Redis cache backend needs the optional dependencies: "
+                "pip install '.[redis]'"
+            ) from exc
+        return RedisCacheBackend.from_url(
+            settings.REDIS_URL,
+            default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+            max_ttl=max(
+                settings.CACHE_DEFAULT_TTL_SECONDS,
+                settings.CACHE_PROFILE_TTL_SECONDS,
+                settings.ANALYSIS_CACHE_TTL_SECONDS
+            ),
+            key_prefix=settings.CACHE_KEY_PREFIX,
+            timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS
+        )
+    return MemoryCacheBackend(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS
+    )
+
+
+def get_cache() -> CacheBackend:
+    """Return the active backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        _backend = create_cache_backend()
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Swap the active backend (e.g. a fakeredis-backed one in scripts)."""
+    global _backend
+    _backend = backend
+
+
+async def init_cache() -> CacheBackend:
+    """Create the backend (called on application startup)."""
+    return get_cache()
+
+
+async def close_cache() -> None:
+    """Close the backend's connections (called on shutdown)."""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+def make_key(namespace: str, user_id: Optional[str], *parts: Any) -> str:
+    """Build a cache key: `<namespace>:<user_id>[:<part>...]`."""
+    return ":".join([namespace, str(user_id), *(str(p) for p in parts)])
+
+
+def cached(
+    namespace: str,
+    ttl: Optional[float] = None,
+    key_args: Iterable[str] = (),
+    user_arg: str = "user_id",
+    versioned: bool = True,
+    db_arg: str = "db"
+):
+    """
+    Cache an async function's result per user and selected arguments.
+
+    Works on FastAPI endpoints: the wrapper keeps the original signature, so
+    dependencies (like the DB session) are still injected, and arguments
+    not listed in `key_args` do not affect the key. Results must be
+    JSON-compatible (dicts, lists, pydantic models) for the Redis backend.
+
+    Args:
+        namespace: Key prefix, e.g. "insights:stats"
+        ttl: Time to live in seconds (cache default if None)
+        key_args: Names of arguments that distinguish results
+        user_arg: Name of the argument holding the user id
+        versioned: Include the user's data version in the key (one
+            primary-key lookup on the `db_arg` session per call). Only
+            unversioned entries are indexed for `invalidate_user`.
+        db_arg: Name of the argument holding the AsyncSession
+    """
+    key_args = tuple(key_args)
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            user_id = bound.arguments.get(user_arg)
+            parts = [bound.arguments[name] for name in key_args]
+            if versioned:
+                version = await get_data_version(bound.arguments[db_arg], user_id)
+                parts.insert(0, f"v{version}")
+            key = make_key(namespace, user_id, *parts)
+
+            backend = get_cache()
+            value = await backend.get(key, _MISS)
+            if value is not _MISS:
+                return value
+            value = await func(*args, **kwargs)
+            index_user = None if versioned or user_id is None else str(user_id)
+            await backend.set(key, value, ttl=ttl, user_id=index_user)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_user(user_id: str, prefixes: Optional[Iterable[str]] = None) -> int:
+    """Drop a user's cached entries (optionally only under `prefixes`)."""
+    return await get_cache().invalidate_user(str(user_id), prefixes)
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "TTLCache",
+    "cached",
+    "close_cache",
+    "create_cache_backend",
+    "get_cache",
+    "init_cache",
+    "invalidate_user",
+    "make_key",
+    "set_cache_backend",
+]
@@ -0,0 +1,55 @@
+"""
+Cache backend interface.
+
+Backends store JSON-compatible values under string keys with a TTL, and keep
+a per-user key index so a user's entries can be invalidated together.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+
+
+class CacheBackend(ABC):
+    """Async key/value cache used by `app.cache`."""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for `key`, or `default` if missing or expired."""
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Store `value` for `ttl` seconds, indexed under `user_id` if given."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Remove one key. Returns True if it was present."""
+
+    @abstractmethod
+    async def invalidate_user(
+        self,
+        user_id: str,
+        prefixes: Optional[Iterable[str]] = None
+    ) -> int:
+        """Remove a user's entries (optionally only under `prefixes`)."""
+
+    @abstractmethod
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Remove every key starting with `prefix`."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+
+    async def close(self) -> None:
+        """Release connections (called on shutdown)."""
@@ -0,0 +1,199 @@
+"""
+In-process cache backend.
+
+A bounded LRU cache with per-entry TTLs on a monotonic clock. Each user's
+keys are indexed so all of a user's entries can be dropped after a write
+without scanning the cache. Every worker process has its own copy; use the
+Redis backend when running more than one worker.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.cache.base import CacheBackend
+
+# Expired entries are swept at most this often (seconds)
+SWEEP_INTERVAL = 30.0
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    Reads refresh an entry's LRU position; inserts beyond `max_entries`
+    evict the least recently used entry. Expired entries are dropped when
+    read and by a periodic sweep on writes, so they do not pile up.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        # key -> (value, expiry, user_id)
+        self._entries: OrderedDict[str, Tuple[Any, float, Optional[str]]] = OrderedDict()
+        self._user_keys: Dict[str, Set[str]] = {}
+        self._last_sweep = clock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, _, user_id = self._entries.pop(key)
+        if user_id is not None:
+            keys = self._user_keys.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_keys[user_id]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if missing/expired."""
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        if self._clock() >= item[1]:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """
+        Store `value` under `key` for `ttl` seconds (default TTL if None).
+
+        Args:
+            key: Cache key
+            value: Value to store (shared by reference - do not mutate)
+            ttl: Time to live in seconds
+            user_id: Owner of the entry, for `invalidate_user`
+        """
+        now = self._clock()
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.purge_expired()
+
+        if key in self._entries:
+            self._remove(key)
+        expiry = now + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = (value, expiry, user_id)
+        if user_id is not None:
+            self._user_keys.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove one key. Returns True if it was present."""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Remove every key starting with `prefix`. Returns the count removed."""
+        keys = [k for k in self._entries if k.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def invalidate_user(self, user_id: str, prefixes: Optional[Iterable[str]] = None) -> int:
+        """
+        Remove a user's entries, optionally only those under `prefixes`.
+
+        Returns:
+            Number of entries removed
+        """
+        keys = list(self._user_keys.get(str(user_id), ()))
+        if prefixes is not None:
+            prefixes = tuple(prefixes)
+            keys = [k for k in keys if k.startswith(prefixes)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries. Returns the count removed."""
+        now = self._clock()
+        self._last_sweep = now
+        expired = [k for k, (_, expiry, _) in self._entries.items() if now >= expiry]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._user_keys.clear()
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """`CacheBackend` over an in-process `TTLCache`. Values are stored as-is."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.cache = TTLCache(max_entries=max_entries, default_ttl=default_ttl)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(key, default)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        self.cache.set(key, value, ttl=ttl, user_id=user_id)
+
+    async def delete(self, key: str) -> bool:
+        return self.cache.delete(key)
+
+    async def invalidate_user(
+        self,
+        user_id: str,
+        prefixes: Optional[Iterable[str]] = None
+    ) -> int:
+        return self.cache.invalidate_user(user_id, prefixes)
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        return self.cache.invalidate_prefix(prefix)
+
+    async def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self.cache.stats()}
@@ -0,0 +1,190 @@
+"""
+Redis cache backend, shared by every worker process.
+
+Values are stored as orjson-encoded JSON. Entries written with a `user_id`
+(unversioned ones, see `app.cache.cached`) are listed in a per-user Redis
+set, so `invalidate_user` in one worker drops the entries every worker
+reads. Any Redis-protocol server works, and so does an in-memory stand-in
+such as `fakeredis.aioredis.FakeRedis` passed as the client.
+
+Cache errors never fail a request: reads degrade to misses, and failed
+writes or invalidations are logged. Stale data then lasts at most the
+entry TTL.
+
+Requires the optional dependencies: `pip install '.[redis]'`.
+"""
+import logging
+from typing import Any, Iterable, List, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.cache.base import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Keys deleted per UNLINK when scanning by prefix
+_DELETE_BATCH = 500
+
+
+def _encode_default(value: Any) -> Any:
+    """orjson fallback for pydantic models."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    `CacheBackend` on Redis.
+
+    Entry TTLs are capped at `max_ttl`. Each user index is refreshed to
+    `max_ttl` on every write, so an index always outlives the entries it
+    lists.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: Redis,
+        default_ttl: float,
+        max_ttl: float,
+        key_prefix: str = "sakina:cache:"
+    ):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.max_ttl = max(max_ttl, default_ttl)
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(
+        cls,
+        url: str,
+        default_ttl: float,
+        max_ttl: float,
+        key_prefix: str = "sakina:cache:",
+        timeout: float = 0.5
+    ) -> "RedisCacheBackend":
+        client = Redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            health_check_interval=30
+        )
+        return cls(client, default_ttl=default_ttl, max_ttl=max_ttl, key_prefix=key_prefix)
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _user_index(self, user_id: str) -> str:
+        return f"{self.key_prefix}__user__:{user_id}"
+
+    def _error(self, action: str, exc: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Redis cache {action} failed: {exc}")
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = await self.client.get(self._key(key))
+        except RedisError as exc:
+            self._error("get", exc)
+            self.misses += 1
+            return default
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return orjson.loads(raw)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        ttl = min(self.default_ttl if ttl is None else ttl, self.max_ttl)
+        if ttl <= 0:
+            return
+        payload = orjson.dumps(value, default=_encode_default)
+        full_key = self._key(key)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(full_key, payload, px=int(ttl * 1000))
+                if user_id is not None:
+                    index = self._user_index(user_id)
+                    pipe.sadd(index, full_key)
+                    pipe.expire(index, int(self.max_ttl) + 1)
+                await pipe.execute()
+        except RedisError as exc:
+            self._error("set", exc)
+
+    async def delete(self, key: str) -> bool:
+        try:
+            return bool(await self.client.unlink(self._key(key)))
+        except RedisError as exc:
+            self._error("delete", exc)
+            return False
+
+    async def invalidate_user(
+        self,
+        user_id: str,
+        prefixes: Optional[Iterable[str]] = None
+    ) -> int:
+        index = self._user_index(str(user_id))
+        try:
+            keys: List[bytes] = list(await self.client.smembers(index))
+            if prefixes is not None:
+                full_prefixes = tuple(self._key(p).encode() for p in prefixes)
+                keys = [k for k in keys if k.startswith(full_prefixes)]
+            if not keys:
+                return 0
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*keys)
+                pipe.srem(index, *keys)
+                await pipe.execute()
+            return len(keys)
+        except RedisError as exc:
+            self._error("invalidate_user", exc)
+            return 0
+
+    async def _unlink_matching(self, pattern: str) -> int:
+        removed = 0
+        batch: List[bytes] = []
+        async for key in self.client.scan_iter(match=pattern, count=_DELETE_BATCH):
+            batch.append(key)
+            if len(batch) >= _DELETE_BATCH:
+                removed += await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            removed += await self.client.unlink(*batch)
+        return removed
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        escaped = "".join(f"\\{c}" if c in "*?[]\\" else c for c in self._key(prefix))
+        try:
+            return await self._unlink_matching(f"{escaped}*")
+        except RedisError as exc:
+            self._error("invalidate_prefix", exc)
+            return 0
+
+    async def clear(self) -> None:
+        await self.invalidate_prefix("")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
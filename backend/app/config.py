@@ -14,11 +14,113 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
 
+    # Auth verification
+    # "local" verifies JWTs in-process (HS256 secret or JWKS keys),
+    # "remote" asks Supabase Auth for every token.
+    AUTH_VERIFY_MODE: str = "local"
+    AUTH_REMOTE_FALLBACK: bool = True
+    SUPABASE_JWT_SECRET: Optional[str] = None
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_TTL_SECONDS: int = 600
+
+    # Verified-token cache
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_MAX_TTL_SECONDS: int = 3600
+    AUTH_CACHE_NEGATIVE_TTL_SECONDS: int = 10
+
     # Database (Supabase PostgreSQL)
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
     # Gemini AI
     GEMINI_API_KEY: str
+    # Concurrent calls in flight per process, in total and per call type
+    GEMINI_MAX_CONCURRENCY: int = 16
+    GEMINI_CONCURRENCY_ANALYSIS: int = 8
+    GEMINI_CONCURRENCY_NUDGE: int = 4
+    GEMINI_CONCURRENCY_INSIGHTS: int = 4
+    GEMINI_CONCURRENCY_VOICE: int = 4
+    # Quota per process (divide the project quota across processes)
+    GEMINI_REQUESTS_PER_MINUTE: int = 1000
+    GEMINI_TOKENS_PER_MINUTE: int = 1000000
+    GEMINI_OUTPUT_TOKEN_ESTIMATE: int = 500
+    # Shed non-background calls with this many calls queued ahead
+    GEMINI_SHED_QUEUE_DEPTH_FREE: int = 20
+    GEMINI_SHED_QUEUE_DEPTH_PREMIUM: int = 50
+    # Per-attempt deadlines, retries of transient errors, circuit breaker
+    GEMINI_TIMEOUT_ANALYSIS_SECONDS: float = 20.0
+    GEMINI_TIMEOUT_NUDGE_SECONDS: float = 15.0
+    GEMINI_TIMEOUT_INSIGHTS_SECONDS: float = 30.0
+    GEMINI_TIMEOUT_VOICE_SECONDS: float = 45.0
+    GEMINI_MAX_RETRIES: int = 2
+    GEMINI_RETRY_BASE_SECONDS: float = 0.5
+    GEMINI_RETRY_MAX_SECONDS: float = 4.0
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = 5
+    GEMINI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Local pre-screen for text analysis (app/services/local_analyzer.py).
+    # Results at or above the confidence threshold and at or below the
+    # stress score are used without calling Gemini. Shorter entries than
+    # LOCAL_ANALYSIS_MIN_WORDS always go to Gemini.
+    LOCAL_ANALYSIS_ENABLED: bool = True
+    LOCAL_ANALYSIS_CONFIDENCE_THRESHOLD: float = 0.8
+    LOCAL_ANALYSIS_MAX_STRESS_SCORE: int = 40
+    LOCAL_ANALYSIS_MIN_WORDS: int = 8
+
+    # Outbound HTTP (shared client for Supabase calls)
+    HTTP_HTTP2: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 5.0
+
+    # Nudges (stale-while-revalidate)
+    NUDGE_FRESHNESS_SECONDS: int = 900
+
+    # Dashboard
+    DASHBOARD_SECTION_TIMEOUT_SECONDS: float = 3.0
+
+    # Journal analysis queue (analysis_jobs table)
+    # API processes run a worker unless ANALYSIS_WORKER_IN_PROCESS is off;
+    # standalone workers run with `python -m app.worker`.
+    ANALYSIS_WORKER_IN_PROCESS: bool = True
+    ANALYSIS_WORKER_CONCURRENCY: int = 8
+    ANALYSIS_POLL_INTERVAL_SECONDS: float = 2.0
+    ANALYSIS_VISIBILITY_TIMEOUT_SECONDS: int = 120
+    ANALYSIS_MAX_ATTEMPTS: int = 5
+    ANALYSIS_RETRY_BASE_SECONDS: float = 5.0
+    ANALYSIS_RETRY_MAX_SECONDS: float = 900.0
+    # Entries per batched Gemini prompt (1 disables batching), and how long
+    # the first entry of a batch waits for others
+    ANALYSIS_BATCH_SIZE: int = 8
+    ANALYSIS_BATCH_WINDOW_MS: float = 250.0
+
+    # Response cache (per-user reads: stats, streak, summary, profile)
+    # "memory" is per worker process; "redis" is shared by all workers
+    # (needs REDIS_URL and the `redis` extra).
+    CACHE_BACKEND: str = "memory"
+    REDIS_URL: Optional[str] = None
+    CACHE_KEY_PREFIX: str = "sakina:cache:"
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_DEFAULT_TTL_SECONDS: int = 60
+    CACHE_PROFILE_TTL_SECONDS: int = 300
+    # Gemini text analyses by content hash (shared across users)
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+
+    # Push events (GET /api/events, Server-Sent Events)
+    # "memory" reaches clients of this process only; "redis" fans events out
+    # across API processes and standalone workers (needs REDIS_URL and the
+    # `redis` extra). A client falling EVENTS_QUEUE_SIZE events behind gets
+    # `resync` instead of its backlog.
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_CHANNEL: str = "sakina:events"
+    EVENTS_QUEUE_SIZE: int = 64
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_MAX_CONNECTIONS_PER_USER: int = 5
 
     # CORS
     FRONTEND_URL: str = "http://localhost:5173"
@@ -1,24 +1,62 @@
 """
 Database configuration and session management.
 Connects to Supabase PostgreSQL using SQLAlchemy.
+
+Request handlers use the async engine (asyncpg) through `get_async_db` so
+queries never block the event loop. The sync engine is kept for scripts
+and migrations. It does not pool connections, so API workers, which never
+use it, hold no Postgres connections beyond the async pool.
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
 
-# Create SQLAlchemy engine with connection pooling
+# Sync engine for scripts and migrations: connections are opened on use and
+# closed on release (DB_POOL_SIZE / DB_MAX_OVERFLOW size the async pool only)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before use
-    pool_size=5,
-    max_overflow=10,
+    poolclass=NullPool,
     echo=False  # Set to True for SQL debugging
 )
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> URL:
+    """
+    Convert the configured (sync) DATABASE_URL to an asyncpg URL.
+    asyncpg takes `ssl` instead of libpq's `sslmode`.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(query=query)
+
+
+# Async engine used by the API routers
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    echo=False
+)
+
+# Async session factory. Objects stay usable after commit so handlers can
+# return them without triggering (unsupported) implicit lazy loads.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -33,3 +71,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency that provides an async database session.
+    Ensures proper cleanup after request completion.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
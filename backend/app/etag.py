@@ -0,0 +1,169 @@
+"""
+Conditional GET (ETag / If-None-Match / 304) for read endpoints.
+
+ETags are derived from the user's data version (see
+`app.services.version_service`), not from the response body. They can
+therefore be computed before the endpoint runs, from one token-cache lookup
+and one primary-key query. A request whose If-None-Match matches is
+answered with 304 without running any of the endpoint's queries.
+
+Besides the version, an ETag covers the path, the query string and the
+inputs a response depends on beyond stored data:
+- the user's local date, for day-windowed stats and streaks
+- the current minute, for rolling "last N hours" windows
+- the stored nudge decision and whether it is stale, for the dashboard
+
+A stale nudge is refreshed in the background even when the dashboard is
+answered with 304, since the endpoint that would schedule it does not run.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth import user_from_token
+from app.database import AsyncSessionLocal
+from app.models.nudge import NudgeState
+from app.models.user import User
+from app.services.daily_stats_service import DEFAULT_TIMEZONE, local_day
+from app.services.nudge_service import nudge_is_stale, schedule_nudge_refresh
+from app.services.version_service import make_etag
+
+logger = logging.getLogger(__name__)
+
+# Always revalidate (cheap with ETags), so writes show up immediately
+REVALIDATE = "private, no-cache"
+# Summary data that may be reused for a minute before revalidating
+SHORT_LIVED = "private, max-age=60"
+
+
+@dataclass(frozen=True)
+class ConditionalRule:
+    """Which GET paths get ETags, and what else their responses depend on."""
+    pattern: re.Pattern
+    cache_control: str = REVALIDATE
+    window: Optional[str] = None  # "day" or "minute"
+    nudge: bool = False
+
+
+@dataclass(frozen=True)
+class ComputedETag:
+    value: str
+    user_id: str
+    nudge_stale: bool = False
+
+
+RULES = (
+    ConditionalRule(re.compile(r"^/api/journal/?$")),
+    ConditionalRule(re.compile(r"^/api/journal/[0-9a-fA-F-]{36}$")),
+    ConditionalRule(re.compile(r"^/api/insights/(stats|streak)$"), SHORT_LIVED, window="day"),
+    ConditionalRule(re.compile(r"^/api/insights/[^/]+$"), window="day"),
+    ConditionalRule(re.compile(r"^/api/intervention/recent$"), window="minute"),
+    ConditionalRule(re.compile(r"^/api/intervention/?$")),
+    ConditionalRule(re.compile(r"^/api/dashboard/summary$"), SHORT_LIVED, window="day", nudge=True),
+    ConditionalRule(re.compile(r"^/api/user/profile$")),
+)
+
+
+def match_rule(path: str) -> Optional[ConditionalRule]:
+    return next((rule for rule in RULES if rule.pattern.match(path)), None)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against `etag`. `*` is not
+    honoured: only a tag the client actually received earns a 304.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """
+    Adds ETags to matching GET responses and answers matching
+    If-None-Match requests with 304.
+
+    Must be added before CORSMiddleware so CORS headers are also applied to
+    the 304 responses produced here. Responses the endpoint marks
+    `Cache-Control: no-store` (e.g. a partial dashboard) get no ETag.
+    """
+
+    async def _user_id(self, request: Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            user = await user_from_token(token)
+        except HTTPException:
+            # Let the endpoint produce the auth error
+            return None
+        return user["id"]
+
+    async def compute_etag(self, request: Request, rule: ConditionalRule) -> Optional[ComputedETag]:
+        user_id = await self._user_id(request)
+        if user_id is None:
+            return None
+
+        user_uuid = UUID(user_id)
+        columns = [
+            User.data_version,
+            local_day(func.coalesce(User.timezone, DEFAULT_TIMEZONE), func.now()).label("today"),
+        ]
+        if rule.nudge:
+            for column in (NudgeState.computed_at, NudgeState.stale):
+                columns.append(
+                    select(column).where(NudgeState.user_id == user_uuid)
+                    .scalar_subquery().label(f"nudge_{column.key}")
+                )
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(*columns).where(User.id == user_uuid))
+                row = result.first()
+        except SQLAlchemyError as exc:
+            logger.warning(f"ETag lookup failed, serving without ETag: {exc}")
+            return None
+        if row is None:
+            return None
+
+        parts = [request.url.path, sorted(request.query_params.multi_items())]
+        if rule.window == "day":
+            parts.append(row.today)
+        elif rule.window == "minute":
+            parts.append(int(time.time() // 60))
+        nudge_stale = False
+        if rule.nudge:
+            # Ageing past NUDGE_FRESHNESS_SECONDS changes the tag too
+            nudge_stale = nudge_is_stale(row.nudge_computed_at, row.nudge_stale)
+            parts += [row.nudge_computed_at, nudge_stale]
+        return ComputedETag(make_etag(user_id, row.data_version, *parts), user_id, nudge_stale)
+
+    async def dispatch(self, request: Request, call_next):
+        rule = match_rule(request.url.path) if request.method == "GET" else None
+        computed = await self.compute_etag(request, rule) if rule else None
+        if computed is None:
+            return await call_next(request)
+
+        etag = computed.value
+        headers = {
+            "ETag": etag,
+            "Cache-Control": rule.cache_control,
+            "Vary": "Authorization",
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            if computed.nudge_stale:
+                schedule_nudge_refresh(computed.user_id)
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200 and "no-store" not in response.headers.get("cache-control", ""):
+            response.headers.update(headers)
+        return response
@@ -0,0 +1,134 @@
+"""
+Push events for connected clients.
+
+Clients hold `GET /api/events` open (Server-Sent Events) and receive their
+own user's events instead of polling:
+- `entry_analyzed`: a queued journal analysis was stored
+- `nudge_available`: a fresh nudge decision says to nudge
+- `stats_changed`: the user's data version was bumped
+- `resync`: events were dropped (slow client, lost Redis connection); the
+  client should refetch everything it shows
+
+Services call `queue_event` inside their transaction. Events are published
+only after that transaction commits, and discarded on rollback, so a
+client never refetches before the change is visible. The bus is chosen by
+EVENTS_BACKEND:
+- "memory": in-process fan-out (one API process, in-process worker)
+- "redis": Redis pub/sub across API processes and standalone workers
+"""
+import logging
+from typing import Any, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.events.bus import RESYNC_EVENT, EventBus, Subscription, TooManyConnections
+
+logger = logging.getLogger(__name__)
+
+ENTRY_ANALYZED = "entry_analyzed"
+NUDGE_AVAILABLE = "nudge_available"
+STATS_CHANGED = "stats_changed"
+
+# Session.info key holding events that wait for the commit
+_PENDING_KEY = "pending_events"
+
+_bus: Optional[EventBus] = None
+
+
+def create_event_bus() -> EventBus:
+    """Build the bus selected by the EVENTS_* settings."""
+    options = dict(
+        queue_size=settings.EVENTS_QUEUE_SIZE,
+        max_connections_per_user=settings.EVENTS_MAX_CONNECTIONS_PER_USER
+    )
+    if settings.EVENTS_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("EVENTS_BACKEND=redis requires REDIS_URL")
+        try:
+            from app.events.redis_backend import RedisEventBus
+        except ImportError as exc:
+            raise RuntimeError(
+                "The Redis event backend needs the optional dependencies: "
+                "pip install '.[redis]'"
+            ) from exc
+        return RedisEventBus.from_url(settings.REDIS_URL, channel=settings.EVENTS_CHANNEL, **options)
+    return EventBus(**options)
+
+
+def get_event_bus() -> EventBus:
+    """Return the active bus, creating it on first use."""
+    global _bus
+    if _bus is None:
+        _bus = create_event_bus()
+    return _bus
+
+
+def set_event_bus(bus: EventBus) -> None:
+    """Swap the active bus (e.g. a fakeredis-backed one in scripts)."""
+    global _bus
+    _bus = bus
+
+
+async def init_events() -> EventBus:
+    """Create and start the bus (called on startup)."""
+    bus = get_event_bus()
+    await bus.start()
+    return bus
+
+
+async def close_events() -> None:
+    """Stop the bus (called on shutdown)."""
+    global _bus
+    if _bus is not None:
+        await _bus.close()
+        _bus = None
+
+
+def publish(user_id: str, event: str, data: Any = None) -> None:
+    """Publish an event right away (not tied to a transaction)."""
+    get_event_bus().publish(str(user_id), event, data)
+
+
+def queue_event(db: AsyncSession, user_id: str, event: str, data: Any = None) -> None:
+    """Publish an event once the session's current transaction commits."""
+    db.info.setdefault(_PENDING_KEY, []).append((str(user_id), event, data))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    bus = get_event_bus()
+    for user_id, event, data in pending:
+        try:
+            bus.publish(user_id, event, data)
+        except Exception as e:
+            # The commit already happened; never fail the request over it
+            logger.error(f"Publishing {event} for user {user_id} failed: {e}")
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = [
+    "ENTRY_ANALYZED",
+    "EventBus",
+    "NUDGE_AVAILABLE",
+    "RESYNC_EVENT",
+    "STATS_CHANGED",
+    "Subscription",
+    "TooManyConnections",
+    "close_events",
+    "create_event_bus",
+    "get_event_bus",
+    "init_events",
+    "publish",
+    "queue_event",
+    "set_event_bus",
+]
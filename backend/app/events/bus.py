@@ -0,0 +1,149 @@
+"""
+In-process event bus.
+
+Each connected client holds a `Subscription` with a bounded queue.
+`publish` never blocks: a subscriber that falls `queue_size` events behind
+(a slow or stalled connection) has its backlog dropped and replaced by a
+single `resync` event, telling the client to refetch instead of replaying
+every change it missed. One stalled client therefore costs at most
+`queue_size` events of memory and never holds up writers or other clients.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sent in place of a dropped backlog
+RESYNC_EVENT = "resync"
+
+Event = Tuple[str, Any]
+
+
+class TooManyConnections(Exception):
+    """Raised when a user already has the maximum number of subscriptions."""
+
+
+class Subscription:
+    """One client's stream of events for a user."""
+
+    def __init__(self, bus: "EventBus", user_id: str, queue_size: int):
+        self.bus = bus
+        self.user_id = user_id
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.dropped = 0
+
+    def put(self, event: str, data: Any) -> bool:
+        """
+        Enqueue an event without blocking.
+
+        Returns:
+            False if the backlog was full and replaced by a `resync` event
+        """
+        try:
+            self._queue.put_nowait((event, data))
+            return True
+        except asyncio.QueueFull:
+            pass
+        while not self._queue.empty():
+            event, _ = self._queue.get_nowait()
+            # An earlier `resync` is replaced, not lost
+            if event != RESYNC_EVENT:
+                self.dropped += 1
+        # The event that overflowed is lost too; `resync` covers it
+        self.dropped += 1
+        self._queue.put_nowait((RESYNC_EVENT, {"dropped": self.dropped}))
+        return False
+
+    async def get(self) -> Event:
+        """Wait for the next `(event, data)` pair."""
+        return await self._queue.get()
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBus:
+    """
+    Per-user fan-out to the subscriptions of this process.
+
+    `publish` delivers locally; backends that span processes override it
+    and call `deliver` for events arriving from other processes.
+    """
+
+    name = "memory"
+
+    def __init__(self, queue_size: int = 64, max_connections_per_user: int = 0):
+        self.queue_size = queue_size
+        self.max_connections_per_user = max_connections_per_user
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """
+        Register a subscription for the user's events.
+
+        Raises:
+            TooManyConnections: The user is at max_connections_per_user
+        """
+        user_id = str(user_id)
+        subscribers = self._subscribers.setdefault(user_id, set())
+        if self.max_connections_per_user and len(subscribers) >= self.max_connections_per_user:
+            raise TooManyConnections(f"{len(subscribers)} event streams already open")
+        subscription = Subscription(self, user_id, self.queue_size)
+        subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def connections(self, user_id: str) -> int:
+        return len(self._subscribers.get(str(user_id), ()))
+
+    def publish(self, user_id: str, event: str, data: Any = None) -> None:
+        """Send an event to every subscription of the user. Never blocks."""
+        self.published += 1
+        self.deliver(str(user_id), event, data)
+
+    def deliver(self, user_id: str, event: str, data: Any) -> None:
+        """Hand an event to this process's subscriptions for the user."""
+        for subscription in tuple(self._subscribers.get(user_id, ())):
+            self.delivered += 1
+            if not subscription.put(event, data):
+                self.overflows += 1
+                logger.info(f"Event backlog of a slow client of user {user_id} dropped")
+
+    def broadcast(self, event: str, data: Any = None) -> None:
+        """Send an event to every local subscription (e.g. `resync` after a gap)."""
+        for user_id in tuple(self._subscribers):
+            self.deliver(user_id, event, data)
+
+    async def start(self) -> None:
+        """Start background work (cross-process backends)."""
+
+    async def close(self) -> None:
+        """Stop background work and release connections."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "users": len(self._subscribers),
+            "connections": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
@@ -0,0 +1,153 @@
+"""
+Redis event bus, spanning every API process and standalone worker.
+
+Events are PUBLISHed as orjson-encoded `{"u": user_id, "e": event, "d":
+data}` messages on one channel. Every process subscribes to it and hands
+each message to its own subscriptions for that user, so an analysis
+finished by `python -m app.worker` reaches a client connected to any API
+process. A process receives its own events back the same way.
+
+`publish` stays non-blocking: messages go through a bounded outbox that a
+background task drains. Redis errors never fail the write that produced
+an event. Events published while the connection is down are lost, so once
+the subscription is re-established every local client is sent `resync`.
+
+Requires the optional dependencies: `pip install '.[redis]'`.
+"""
+import asyncio
+import logging
+from typing import Any, Dict
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.events.bus import RESYNC_EVENT, EventBus
+
+logger = logging.getLogger(__name__)
+
+# Messages waiting to be published before new ones are dropped
+OUTBOX_SIZE = 10000
+# Delay before resubscribing after a lost connection (seconds)
+RECONNECT_DELAY = 1.0
+
+
+class RedisEventBus(EventBus):
+    """`EventBus` fanned out through Redis pub/sub."""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: Redis,
+        channel: str = "sakina:events",
+        queue_size: int = 64,
+        max_connections_per_user: int = 0
+    ):
+        super().__init__(queue_size=queue_size, max_connections_per_user=max_connections_per_user)
+        self.client = client
+        self.channel = channel
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self._tasks: list[asyncio.Task] = []
+        self.received = 0
+        self.errors = 0
+        self.outbox_dropped = 0
+
+    @classmethod
+    def from_url(
+        cls,
+        url: str,
+        channel: str = "sakina:events",
+        queue_size: int = 64,
+        max_connections_per_user: int = 0
+    ) -> "RedisEventBus":
+        client = Redis.from_url(url, health_check_interval=30)
+        return cls(
+            client,
+            channel=channel,
+            queue_size=queue_size,
+            max_connections_per_user=max_connections_per_user
+        )
+
+    def publish(self, user_id: str, event: str, data: Any = None) -> None:
+        self.published += 1
+        message = orjson.dumps({"u": str(user_id), "e": event, "d": data})
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.outbox_dropped += 1
+            logger.warning("Redis event outbox full, event dropped")
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        subscribed = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._receive_loop(subscribed)),
+        ]
+        # Do not miss events published right after startup
+        try:
+            await asyncio.wait_for(subscribed.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Redis event subscription not ready yet, continuing")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.client.aclose()
+
+    async def _send_loop(self) -> None:
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self.client.publish(self.channel, message)
+            except RedisError as exc:
+                self.errors += 1
+                logger.warning(f"Redis event publish failed: {exc}")
+
+    async def _receive_loop(self, subscribed: asyncio.Event) -> None:
+        reconnecting = False
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                subscribed.set()
+                if reconnecting:
+                    # Events sent while disconnected are gone; clients refetch
+                    self.broadcast(RESYNC_EVENT, {"reason": "reconnected"})
+                    reconnecting = False
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._on_message(message["data"])
+            except RedisError as exc:
+                self.errors += 1
+                reconnecting = True
+                logger.warning(f"Redis event subscription lost, reconnecting: {exc}")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except RedisError:
+                    pass
+
+    def _on_message(self, raw: bytes) -> None:
+        try:
+            message = orjson.loads(raw)
+            user_id, event, data = message["u"], message["e"], message.get("d")
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event message")
+            return
+        self.received += 1
+        self.deliver(user_id, event, data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "received": self.received,
+            "errors": self.errors,
+            "outbox": self._outbox.qsize(),
+            "outbox_dropped": self.outbox_dropped,
+        }
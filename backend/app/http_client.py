@@ -0,0 +1,60 @@
+"""
+Shared outbound HTTP client.
+
+One pooled `httpx.AsyncClient` lives for the lifetime of the application so
+Supabase calls reuse keep-alive (and HTTP/2) connections instead of paying a
+new TCP + TLS handshake per request. It is opened and closed by the
+`lifespan` handler in `app.main`.
+"""
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled client from the HTTP_* settings."""
+    return httpx.AsyncClient(
+        http2=settings.HTTP_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Open the shared client (called on application startup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client.
+
+    Created lazily when used outside the application lifespan
+    (scripts, one-off tasks).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
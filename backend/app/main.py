@@ -9,9 +9,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import engine, Base
-from app.database import engine, Base
-from app.routers import journal, nudge, insights, intervention, user, dashboard
+from app.cache import get_cache, init_cache, close_cache
+from app.database import engine, Base, AsyncSessionLocal
+from app.etag import ConditionalGetMiddleware
+from app.events import close_events, get_event_bus, init_events
+from app.http_client import init_http_client, close_http_client
+from app.routers import journal, nudge, insights, intervention, user, dashboard, events
+from app.services.gemini_limiter import gemini_limiter
+from app.services.gemini_scheduler import gemini_scheduler
+from app.services.gemini_service import call_stats as gemini_call_stats
+from app.services.analysis_queue import (
+    get_analysis_worker,
+    queue_stats,
+    start_analysis_worker,
+    stop_analysis_worker,
+)
 
 
 @asynccontextmanager
@@ -23,8 +35,22 @@ async def lifespan(app: FastAPI):
     # Startup: Tables already exist from Supabase migration
     # Uncomment below line only for local SQLite development:
     # Base.metadata.create_all(bind=engine)
+
+    # Pooled keep-alive client for outbound Supabase calls
+    await init_http_client()
+    # Response cache (in-process or shared Redis)
+    await init_cache()
+    # Push events for connected clients (in-process or Redis pub/sub)
+    await init_events()
+    # Journal analysis worker (can also run standalone: python -m app.worker)
+    if settings.ANALYSIS_WORKER_IN_PROCESS:
+        await start_analysis_worker()
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: finish in-flight analyses, then close pooled connections
+    await stop_analysis_worker()
+    await close_events()
+    await close_cache()
+    await close_http_client()
 
 
 # Create FastAPI application
@@ -38,6 +64,7 @@ app = FastAPI(
     - **Proactive Nudges**: Intelligent wellness interventions based on patterns
     - **Weekly Insights**: Trend analysis and personalized recommendations
     - **Intervention Logging**: Track completed wellness exercises
+    - **Live Updates**: Server-Sent Events for finished analyses, nudges and stats
     
     ## Authentication
     All endpoints require a valid Supabase JWT token in the Authorization header.
@@ -46,6 +73,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Conditional GET (ETag / If-None-Match / 304). Added before CORS so CORS
+# stays the outer layer and 304 responses still carry CORS headers.
+app.add_middleware(ConditionalGetMiddleware)
+
 # CORS middleware for React frontend
 import logging
 
@@ -76,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 import traceback
@@ -132,22 +164,11 @@ app.include_router(
     tags=["Dashboard"]
 )
 
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# Middleware
-# ═══════════════════════════════════════════════════════════════════════════════
-
-@app.middleware("http")
-async def add_cache_headers(request: Request, call_next):
-    response = await call_next(request)
-    
-    # Cache static dashboard data for 60 seconds (client-side)
-    if request.url.path in ["/api/insights/stats", "/api/insights/streak", "/api/dashboard/summary"]:
-        # Only cache successful GET requests
-        if request.method == "GET" and response.status_code == 200:
-            response.headers["Cache-Control"] = "private, max-age=60"
-    
-    return response
+app.include_router(
+    events.router,
+    prefix="/api/events",
+    tags=["Events"]
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -166,6 +187,50 @@ async def health_check():
     }
 
 
+@app.get("/health/cache", tags=["Health"])
+async def cache_stats():
+    """
+    Response cache counters (backend, hits, misses, evictions).
+    """
+    return get_cache().stats()
+
+
+@app.get("/health/events", tags=["Health"])
+async def event_stats():
+    """
+    Push event counters (open streams, published and delivered events,
+    slow-client overflows).
+    """
+    return get_event_bus().stats()
+
+
+@app.get("/health/gemini", tags=["Health"])
+async def gemini_stats():
+    """
+    Gemini concurrency (in-flight calls, queue depth and wait times per
+    call type and overall), rate-limit scheduling (queued calls per lane,
+    shed calls, remaining quota), and circuit breaker state with retry and
+    timeout counts.
+    """
+    return {
+        **gemini_limiter.stats(),
+        "scheduler": gemini_scheduler.stats(),
+        "calls": gemini_call_stats(),
+    }
+
+
+@app.get("/health/analysis-queue", tags=["Health"])
+async def analysis_queue_stats():
+    """
+    Analysis job counts by status, queue lag, and this process's worker.
+    """
+    async with AsyncSessionLocal() as db:
+        stats = await queue_stats(db)
+    worker = get_analysis_worker()
+    stats["worker"] = worker.stats() if worker else None
+    return stats
+
+
 @app.get("/", tags=["Health"])
 async def root():
     """
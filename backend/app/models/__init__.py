@@ -2,5 +2,8 @@
 from app.models.user import User
 from app.models.journal import JournalEntry
 from app.models.intervention import InterventionLog
+from app.models.nudge import NudgeState
+from app.models.daily_stats import UserDailyStats
+from app.models.analysis_job import AnalysisJob
 
-__all__ = ["User", "JournalEntry", "InterventionLog"]
+__all__ = ["User", "JournalEntry", "InterventionLog", "NudgeState", "UserDailyStats", "AnalysisJob"]
@@ -0,0 +1,56 @@
+"""
+AnalysisJob model - durable queue of pending journal entry analyses.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Enum, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    """Lifecycle of an analysis job. Finished jobs are deleted."""
+    pending = "pending"
+    running = "running"
+    dead = "dead"
+
+
+class AnalysisJob(Base):
+    """
+    One queued analysis of a journal entry.
+    Claimed by workers with FOR UPDATE SKIP LOCKED and leased until
+    `locked_until`; see `app.services.analysis_queue`.
+    """
+    __tablename__ = "analysis_jobs"
+    __table_args__ = {"schema": "public"}
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        server_default=text("gen_random_uuid()")
+    )
+    entry_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.journal_entries.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    status = Column(Enum(JobStatus, native_enum=False, length=20), nullable=False, default=JobStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, server_default=text("now()"), nullable=False)
+
+    # Lease held by the worker running the job
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=text("now()"), nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<AnalysisJob {self.id} entry={self.entry_id} status={self.status}>"
@@ -0,0 +1,41 @@
+"""
+UserDailyStats model - per-user daily activity rollup.
+"""
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class UserDailyStats(Base):
+    """
+    Aggregated journal and intervention activity for one user on one
+    calendar day (in the user's timezone).
+    Updated in the same transaction as the writes it summarizes, so stats
+    and streak reads touch a handful of small rows instead of raw history.
+    """
+    __tablename__ = "user_daily_stats"
+    __table_args__ = {"schema": "public"}
+
+    # Composite primary key
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+
+    # Journal entries
+    entry_count = Column(Integer, nullable=False, default=0)
+    stress_sum = Column(Integer, nullable=False, default=0)
+    stress_count = Column(Integer, nullable=False, default=0)
+    high_stress_count = Column(Integer, nullable=False, default=0)  # stress_score > 70
+    mood_counts = Column(JSONB, nullable=False, server_default=text("'{}'"))
+
+    # Interventions
+    intervention_count = Column(Integer, nullable=False, default=0)
+    completed_interventions = Column(Integer, nullable=False, default=0)
+    calm_seconds = Column(Integer, nullable=False, default=0)
+    last_intervention_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<UserDailyStats {self.user_id} {self.day} entries={self.entry_count}>"
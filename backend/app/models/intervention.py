@@ -40,7 +40,7 @@ class InterventionLog(Base):
     )
     
     # Intervention details
-    intervention_type = Column(Enum(InterventionType), nullable=False)
+    intervention_type = Column(Enum(InterventionType, native_enum=False), nullable=False)
     subtype = Column(String(50), nullable=True)  # e.g., "box-breathing", "4-7-8"
     trigger_reason = Column(String(100), nullable=True)  # Why nudge was shown
     
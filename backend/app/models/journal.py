@@ -3,7 +3,7 @@ JournalEntry model - stores user journal entries with AI analysis.
 """
 from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Enum, text
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from app.database import Base
 import enum
 
@@ -53,9 +53,9 @@ class JournalEntry(Base):
     )
     
     # Entry content
-    entry_type = Column(Enum(EntryType), default=EntryType.text)
+    entry_type = Column(Enum(EntryType, native_enum=False), default=EntryType.text)
     content = Column(Text, nullable=False)
-    mood = Column(Enum(MoodType), nullable=True)  # Optional - AI will detect if not provided
+    mood = Column(Enum(MoodType, native_enum=False), nullable=True)  # Optional - AI will detect if not provided
     
     # AI Analysis results (populated after creation)
     stress_score = Column(Integer, nullable=True)  # 0-100
@@ -65,6 +65,9 @@ class JournalEntry(Base):
     supportive_message = Column(Text, nullable=True)
     analyzed_at = Column(DateTime, nullable=True)
     
+    # Truncated content, only loaded by list queries in preview mode
+    content_preview = query_expression()
+    
     # Timestamps
     created_at = Column(DateTime, server_default=text("now()"), index=True)
     
@@ -0,0 +1,33 @@
+"""
+NudgeState model - last computed nudge decision per user.
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Boolean, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class NudgeState(Base):
+    """
+    Cached nudge decision for a user.
+    Served immediately by the dashboard and refreshed in the background
+    when it ages past the freshness window or new data arrives.
+    """
+    __tablename__ = "nudge_decisions"
+    __table_args__ = {"schema": "public"}
+
+    # One row per user
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # NudgeDecision payload
+    decision = Column(JSONB, nullable=False)
+
+    # Freshness
+    computed_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+    stale = Column(Boolean, default=False, nullable=False)
+
+    def __repr__(self):
+        return f"<NudgeState {self.user_id} stale={self.stale}>"
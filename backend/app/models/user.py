@@ -2,7 +2,7 @@
 User model - syncs with Supabase Auth.
 Stores user preferences and settings.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Enum, text
+from sqlalchemy import Column, String, DateTime, Boolean, BigInteger, Enum, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -37,11 +37,15 @@ class User(Base):
 
     # Preferences
     locale = Column(String(5), default="en")  # en, ar
+    timezone = Column(String(64), default="UTC")  # IANA name, e.g. "Asia/Riyadh"
     theme = Column(String(10), default="light")  # light, dark, system
-    subscription = Column(Enum(SubscriptionTier), default=SubscriptionTier.free)
+    subscription = Column(Enum(SubscriptionTier, native_enum=False), default=SubscriptionTier.free)
     nudge_enabled = Column(Boolean, default=True)
     daily_reminder = Column(Boolean, default=False)
     
+    # Bumped on every write to the user's data (cache keys, ETags)
+    data_version = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    
     # Timestamps
     created_at = Column(DateTime, server_default=text("now()"))
     updated_at = Column(DateTime, server_default=text("now()"))
@@ -0,0 +1,104 @@
+"""
+Keyset (cursor) pagination for newest-first lists.
+
+Lists are ordered by `(created_at DESC, id DESC)`. A cursor is an opaque
+token encoding the `(created_at, id)` of the last row on a page. The next
+page starts strictly after it, so deep pages cost the same as the first
+(an index range scan on `(user_id, created_at)` instead of skipping OFFSET
+rows), and rows inserted between requests never shift a page.
+
+List bodies stay plain JSON arrays; the cursor for the next page is sent in
+the `X-Next-Cursor` response header (absent on the last page).
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, desc, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque cursor for the row `(created_at, row_id)`."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor from `encode_cursor`.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def paginate(
+    query: Select,
+    model,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None
+) -> Select:
+    """
+    Order `query` newest first and apply a page window.
+
+    With a cursor, rows after it are selected and `skip` is ignored;
+    otherwise `skip` is used as an OFFSET (kept for older clients). One
+    extra row is fetched so `page_with_cursor` can tell if more remain.
+
+    Args:
+        query: Select over `model`, already filtered to one user
+        model: Mapped class with `created_at` and `id` columns
+        limit: Page size
+        skip: Legacy offset
+        cursor: Cursor from the previous page's X-Next-Cursor
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # `created_at <= x` keeps this an index range scan; the OR only
+        # filters rows sharing the boundary timestamp.
+        query = query.where(
+            model.created_at <= created_at,
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            )
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(desc(model.created_at), desc(model.id)).limit(limit + 1)
+
+
+def page_with_cursor(rows: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    """
+    Split the `limit + 1` rows fetched by `paginate` into the page and the
+    cursor for the next one (None on the last page).
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    if not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page's cursor to the client."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,55 +1,107 @@
 """
 Dashboard API Router - Combined data endpoints to reduce network round trips.
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from uuid import UUID
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Optional, Tuple
 import asyncio
+import logging
 
-from app.database import get_db
+from app.cache import cached
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.auth import get_current_user_id
-from app.routers.journal import get_journal_entries
-from app.routers.nudge import check_for_nudge
-from app.routers.insights import get_stats, get_journaling_streak
-from app.schemas.schemas import JournalEntryResponse
+from app.routers.journal import (
+    MAX_PREVIEW_CHARS,
+    list_journal_entries,
+    parse_fields,
+    to_list_items,
+)
+from app.services.nudge_service import get_cached_nudge
+from app.routers.insights import get_stats, get_journaling_streak
+from app.schemas.schemas import JournalEntryResponse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+async def _run_section(fetch: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    """
+    Run one dashboard section on its own session with a deadline.
+    A session cannot run queries concurrently, so each section gets one.
+    Failures are logged by the caller, which knows the section's name.
+    """
+    async with AsyncSessionLocal() as db:
+        return await asyncio.wait_for(
+            fetch(db),
+            timeout=settings.DASHBOARD_SECTION_TIMEOUT_SECONDS
+        )
+
+
+@cached("dashboard:entries", key_args=("fields", "preview"))
+async def _recent_entries(
+    db: AsyncSession,
+    user_id: str,
+    fields: Optional[Tuple[str, ...]] = None,
+    preview: Optional[int] = None
+) -> list:
+    entries_raw, _ = await list_journal_entries(
+        db, user_id, limit=5, fields=fields, preview=preview
+    )
+    if fields is None and preview is None:
+        return [JournalEntryResponse.model_validate(entry) for entry in entries_raw]
+    return to_list_items(entries_raw, fields, preview)
+
+
 @router.get("/summary")
 async def get_dashboard_summary(
-    db: Session = Depends(get_db),
+    response: Response,
+    fields: Optional[str] = None,
+    preview: Optional[int] = Query(None, ge=1, le=MAX_PREVIEW_CHARS),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Get all dashboard data in a single request.
     Reduces 4 separate API calls to 1.
+
+    Sections are fetched concurrently, so latency is that of the slowest
+    section. The nudge is the last stored decision (see `computed_at` and
+    `stale`); a stale one is refreshed in the background. A section that
+    fails or exceeds its timeout is returned as null and listed in
+    `failed_sections` instead of failing the request; such a partial
+    response is marked `no-store`.
+
+    `fields` and `preview` trim the recent entries as on `/api/journal/`.
     """
-    # Note: In a true async database setup, we could run these queries in parallel.
-    # With synchronous SQLAlchemy, they run sequentially but we save HTTP overhead.
+    selected_fields = parse_fields(fields)
     # We reuse the existing logic from other routers to ensure consistency.
-    
-    # 1. Get recent entries (limit 5)
-    entries_raw = await get_journal_entries(
-        skip=0, 
-        limit=5, 
-        mood=None, 
-        db=db, 
-        user_id=user_id
-    )
-    entries = [JournalEntryResponse.model_validate(entry) for entry in entries_raw]
-    
-    # 2. Check for nudge
-    nudge = await check_for_nudge(db=db, user_id=user_id)
-    
-    # 3. Get insights stats (7 days)
-    stats = await get_stats(days=7, db=db, user_id=user_id)
-    
-    # 4. Get streak
-    streak = await get_journaling_streak(db=db, user_id=user_id)
-    
-    return {
-        "entries": entries,
-        "nudge": nudge,
-        "stats": stats,
-        "streak": streak
+    sections = {
+        "entries": lambda db: _recent_entries(db, user_id, selected_fields, preview),
+        "nudge": lambda db: get_cached_nudge(db, user_id),
+        "stats": lambda db: get_stats(days=7, db=db, user_id=user_id),
+        "streak": lambda db: get_journaling_streak(db=db, user_id=user_id),
     }
+
+    results = await asyncio.gather(
+        *(_run_section(fetch) for fetch in sections.values()),
+        return_exceptions=True
+    )
+
+    summary = {}
+    failed_sections = []
+    for name, result in zip(sections, results):
+        if isinstance(result, BaseException):
+            reason = "timeout" if isinstance(result, asyncio.TimeoutError) else repr(result)
+            logger.warning(f"Dashboard section '{name}' failed for user {user_id}: {reason}")
+            failed_sections.append(name)
+            summary[name] = None
+        else:
+            summary[name] = result
+
+    summary["partial"] = bool(failed_sections)
+    summary["failed_sections"] = failed_sections
+    if failed_sections:
+        # Do not let clients (or ETag revalidation) keep a partial result
+        response.headers["Cache-Control"] = "no-store"
+    return summary
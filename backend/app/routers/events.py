@@ -0,0 +1,61 @@
+"""
+Events API Router - pushes the user's events to connected clients.
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.background import BackgroundTask
+
+from app.auth import get_current_user_id
+from app.config import settings
+from app.events import TooManyConnections, get_event_bus
+from app.sse import event_stream, sse_comment, sse_event
+
+router = APIRouter()
+
+
+@router.get("")
+async def stream_events(
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Stream the user's events (Server-Sent Events) instead of polling.
+
+    Sends `ready` once subscribed, then `entry_analyzed`, `nudge_available`
+    and `stats_changed` as they happen, with a comment heartbeat every
+    EVENTS_HEARTBEAT_SECONDS. `resync` means events were dropped (the
+    client fell behind) and everything shown should be refetched. No
+    database connection is held while the stream is open.
+
+    Raises:
+        HTTPException 429: The user already has
+            EVENTS_MAX_CONNECTIONS_PER_USER streams open
+    """
+    # Subscribe before the response starts, so the limit check and the
+    # registration are one step and a rejection can still be a 429
+    try:
+        subscription = get_event_bus().subscribe(user_id)
+    except TooManyConnections as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc)
+        ) from exc
+
+    async def events():
+        with subscription:
+            yield sse_event("ready", {"heartbeat_seconds": settings.EVENTS_HEARTBEAT_SECONDS})
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield sse_comment()
+                    continue
+                yield sse_event(event, data)
+
+    async def release():
+        # Also runs when the stream never started (idempotent)
+        subscription.close()
+
+    return event_stream(events(), background=BackgroundTask(release))
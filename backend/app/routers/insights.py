@@ -2,124 +2,114 @@
 Insights API Router - Weekly wellness pattern analysis.
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import JSON, Integer, Select, cast, desc, func, select, true
 from uuid import UUID
 from datetime import datetime, timedelta
+from typing import Tuple
 
-from app.database import get_db
+from app.cache import cached
+from app.database import get_async_db
 from app.auth import get_current_user_id
 from app.models.journal import JournalEntry
-from app.models.intervention import InterventionLog
+from app.models.daily_stats import UserDailyStats
 from app.schemas.schemas import InsightsRequest, StressPattern
-from app.services.gemini_service import generate_weekly_insights
+from app.services.gemini_scheduler import user_tier
+from app.services.gemini_service import generate_weekly_insights, stream_weekly_insights
+from app.sse import event_stream, sse_event
+from app.services.daily_stats_service import local_today
+from app.services.streak_service import streak_query, streak_from_row
 
 router = APIRouter()
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Aggregate Queries
+# Stats are read from the `user_daily_stats` rollup: one small row per
+# active day, so a period costs at most `days` rows whatever the history.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _period_stats_query(user_id: str, days: int) -> Select:
+    """
+    Single-row statement with entry, mood and intervention aggregates
+    for the last `days` calendar days (in the user's timezone, today included).
+    """
+    user_uuid = UUID(user_id)
+    in_period = (
+        UserDailyStats.user_id == user_uuid,
+        UserDailyStats.day > local_today(user_uuid) - days
+    )
+
+    totals = select(
+        func.coalesce(func.sum(UserDailyStats.entry_count), 0).label("entry_count"),
+        func.coalesce(func.sum(UserDailyStats.stress_sum), 0).label("stress_sum"),
+        func.coalesce(func.sum(UserDailyStats.stress_count), 0).label("stress_count"),
+        func.coalesce(func.sum(UserDailyStats.intervention_count), 0).label("intervention_count"),
+        func.coalesce(
+            func.sum(UserDailyStats.completed_interventions), 0
+        ).label("completed_interventions"),
+        func.coalesce(func.sum(UserDailyStats.calm_seconds), 0).label("calm_seconds"),
+    ).where(*in_period).subquery("totals")
+
+    day_moods = func.jsonb_each_text(UserDailyStats.mood_counts).table_valued(
+        "key", "value"
+    ).render_derived("day_moods")
+    mood_count = func.sum(cast(day_moods.c.value, Integer))
+    moods = select(
+        day_moods.c.key.label("mood"),
+        mood_count.label("mood_count"),
+    ).select_from(UserDailyStats).join(day_moods, true()).where(
+        *in_period
+    ).group_by(day_moods.c.key).having(mood_count > 0).subquery("moods")
+
+    mood_distribution = select(
+        func.json_object_agg(moods.c.mood, moods.c.mood_count, type_=JSON)
+    ).scalar_subquery()
+
+    return select(
+        totals,
+        mood_distribution.label("mood_distribution"),
+    )
+
+
+def _stats_from_row(row, days: int) -> dict:
+    avg_stress = row.stress_sum / row.stress_count if row.stress_count else None
+    return {
+        "period_days": days,
+        "entry_count": row.entry_count,
+        "avg_stress_score": round(avg_stress, 1) if avg_stress is not None else None,
+        "mood_distribution": row.mood_distribution or {},
+        "intervention_count": row.intervention_count,
+        "completed_interventions": row.completed_interventions,
+        "total_calm_minutes": round(row.calm_seconds / 60, 1)
+    }
+
+
 @router.get("/summary")
+@cached("insights:summary", key_args=("days",))
 async def get_insights_summary(
     days: int = 7,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Get combined insights data (stats + streak) in a single request.
     This is the fast path - AI insights load separately.
     
-    Reduces 2 API calls to 1 for faster initial page load.
+    Reduces 2 API calls to 1 for faster initial page load, and runs as
+    a single database statement.
     """
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    # Get entries
-    entries = db.query(JournalEntry).filter(
-        JournalEntry.user_id == UUID(user_id),
-        JournalEntry.created_at >= since
-    ).all()
-    
-    # Get interventions
-    interventions = db.query(InterventionLog).filter(
-        InterventionLog.user_id == UUID(user_id),
-        InterventionLog.created_at >= since
-    ).all()
-    
-    # Calculate stats
-    stress_scores = [e.stress_score for e in entries if e.stress_score is not None]
-    avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else None
-    
-    # Mood distribution
-    mood_counts = {}
-    for entry in entries:
-        if entry.mood:
-            mood = entry.mood.value
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
-    
-    # Intervention stats
-    completed_interventions = sum(1 for i in interventions if i.completed)
-    total_intervention_time = sum(i.duration_seconds for i in interventions if i.completed)
-    
-    # Get streak data (optimized query)
-    entry_dates_query = db.query(
-        func.date(JournalEntry.created_at)
-    ).filter(
-        JournalEntry.user_id == UUID(user_id)
-    ).distinct().order_by(
-        desc(func.date(JournalEntry.created_at))
-    ).limit(90).all()
-    
-    current_streak = 0
-    longest_streak = 0
-    
-    if entry_dates_query:
-        entry_dates = [d[0] for d in entry_dates_query]
-        today = datetime.utcnow().date()
-        last_entry_date = entry_dates[0]
-        
-        # Current streak
-        is_active = (last_entry_date == today) or (last_entry_date == today - timedelta(days=1))
-        if is_active:
-            current_streak = 1
-            previous_date = last_entry_date
-            for date in entry_dates[1:]:
-                if date == previous_date - timedelta(days=1):
-                    current_streak += 1
-                    previous_date = date
-                else:
-                    break
-        
-        # Longest streak
-        longest_streak = 1
-        running = 1
-        prev_date = entry_dates[0]
-        for date in entry_dates[1:]:
-            if date == prev_date - timedelta(days=1):
-                running += 1
-            else:
-                longest_streak = max(longest_streak, running)
-                running = 1
-            prev_date = date
-        longest_streak = max(longest_streak, running)
-    
-    # Total entries
-    total_entries = db.query(JournalEntry).filter(
-        JournalEntry.user_id == UUID(user_id)
-    ).count()
-    
+    stats = _period_stats_query(user_id, days).subquery("stats")
+    streak = streak_query(user_id).subquery("streak")
+
+    result = await db.execute(
+        select(stats, streak).select_from(stats.join(streak, true()))
+    )
+    row = result.one()
+
     return {
-        "stats": {
-            "period_days": days,
-            "entry_count": len(entries),
-            "avg_stress_score": round(avg_stress, 1) if avg_stress is not None else None,
-            "mood_distribution": mood_counts,
-            "intervention_count": len(interventions),
-            "completed_interventions": completed_interventions,
-            "total_calm_minutes": round(total_intervention_time / 60, 1)
-        },
-        "streak": {
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "total_entries": total_entries
-        }
+        "stats": _stats_from_row(row, days),
+        "streak": streak_from_row(row)
     }
 
 
@@ -133,8 +123,10 @@ def _build_period_summary(entries: list, days: int) -> str:
     for entry in entries:
         day = entry.created_at.strftime("%A")
         themes = ", ".join(entry.key_themes[:3]) if entry.key_themes else "none identified"
+        # Entries still waiting for analysis may have no mood yet
+        mood = entry.mood.value if entry.mood else "N/A"
         summary_parts.append(
-            f"- {day}: Mood={entry.mood.value}, Stress={entry.stress_score or 'N/A'}, Themes={themes}"
+            f"- {day}: Mood={mood}, Stress={entry.stress_score or 'N/A'}, Themes={themes}"
         )
     
     return "\n".join(summary_parts)
@@ -143,7 +135,7 @@ def _build_period_summary(entries: list, days: int) -> str:
 @router.post("/weekly", response_model=StressPattern)
 async def get_weekly_insights(
     request: InsightsRequest = InsightsRequest(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -154,37 +146,88 @@ async def get_weekly_insights(
     - Common themes
     - Personalized recommendations
     """
-    # Get entries from the past N days
-    since = datetime.utcnow() - timedelta(days=request.days)
-    
-    entries = db.query(JournalEntry).filter(
-        JournalEntry.user_id == UUID(user_id),
-        JournalEntry.created_at >= since
-    ).order_by(desc(JournalEntry.created_at)).all()
-    
-    # Calculate stats
-    stress_scores = [e.stress_score for e in entries if e.stress_score is not None]
-    avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else 50.0
-    entry_count = len(entries)
+    entries_summary, entry_count, avg_stress = await _load_period(db, user_id, request.days)
     
     # If no entries, return default response
-    period_name = "month" if request.days > 7 else "week"
     if entry_count == 0:
-        return StressPattern(
-            trend="stable",
-            avg_stress_score=0,
-            frequent_themes=[],
-            recommendation="Start journaling to track your wellness patterns.",
-            weekly_summary=f"No journal entries yet this {period_name}. Take a moment to check in with yourself.",
-            entry_count=0
-        )
-    
-    # Build summary for AI
-    entries_summary = _build_period_summary(entries, request.days)
+        return _empty_pattern(request.days)
     
     # Generate insights with AI
-    result = await generate_weekly_insights(entries_summary, entry_count, avg_stress, days=request.days)
+    tier = await user_tier(db, user_id)
+    # Return the connection to the pool before waiting on Gemini
+    await db.close()
+    result = await generate_weekly_insights(
+        entries_summary, entry_count, avg_stress, days=request.days, tier=tier
+    )
+    return _pattern(result, entry_count, avg_stress)
+
+
+@router.post("/weekly/stream")
+async def stream_insights(
+    request: InsightsRequest = InsightsRequest(),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Streaming variant of `/weekly` (Server-Sent Events).
+
+    Sends `delta` events (`{"text": ...}`) with pieces of the summary as
+    Gemini writes it, then one `result` event with the full `StressPattern`.
+    The result is final; its summary replaces the deltas.
+    """
+    entries_summary, entry_count, avg_stress = await _load_period(db, user_id, request.days)
+    tier = await user_tier(db, user_id)
+    # Return the connection to the pool before the stream starts
+    await db.close()
+
+    async def events():
+        if entry_count == 0:
+            pattern = _empty_pattern(request.days)
+            yield sse_event("delta", {"text": pattern.weekly_summary})
+            yield sse_event("result", pattern.model_dump(mode="json"))
+            return
+        async for kind, value in stream_weekly_insights(
+            entries_summary, entry_count, avg_stress, days=request.days, tier=tier
+        ):
+            if kind == "delta":
+                yield sse_event("delta", {"text": value})
+            else:
+                yield sse_event("result", _pattern(value, entry_count, avg_stress).model_dump(mode="json"))
+
+    return event_stream(events())
+
+
+async def _load_period(db: AsyncSession, user_id: str, days: int) -> Tuple[str, int, float]:
+    """Entry summary, entry count and average stress for the past `days` days."""
+    since = datetime.utcnow() - timedelta(days=days)
     
+    result = await db.execute(
+        select(JournalEntry).where(
+            JournalEntry.user_id == UUID(user_id),
+            JournalEntry.created_at >= since
+        ).order_by(desc(JournalEntry.created_at))
+    )
+    entries = result.scalars().all()
+    
+    # Calculate stats
+    stress_scores = [e.stress_score for e in entries if e.stress_score is not None]
+    avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else 50.0
+    return _build_period_summary(entries, days), len(entries), avg_stress
+
+
+def _empty_pattern(days: int) -> StressPattern:
+    period_name = "month" if days > 7 else "week"
+    return StressPattern(
+        trend="stable",
+        avg_stress_score=0,
+        frequent_themes=[],
+        recommendation="Start journaling to track your wellness patterns.",
+        weekly_summary=f"No journal entries yet this {period_name}. Take a moment to check in with yourself.",
+        entry_count=0
+    )
+
+
+def _pattern(result: dict, entry_count: int, avg_stress: float) -> StressPattern:
     return StressPattern(
         trend=result["trend"],
         avg_stress_score=round(avg_stress, 1),
@@ -196,9 +239,10 @@ async def get_weekly_insights(
 
 
 @router.get("/stats")
+@cached("insights:stats", key_args=("days",))
 async def get_stats(
     days: int = 7,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -210,48 +254,14 @@ async def get_stats(
     - Mood distribution
     - Intervention count
     """
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    # Get entries
-    entries = db.query(JournalEntry).filter(
-        JournalEntry.user_id == UUID(user_id),
-        JournalEntry.created_at >= since
-    ).all()
-    
-    # Get interventions
-    interventions = db.query(InterventionLog).filter(
-        InterventionLog.user_id == UUID(user_id),
-        InterventionLog.created_at >= since
-    ).all()
-    
-    # Calculate stats
-    stress_scores = [e.stress_score for e in entries if e.stress_score is not None]
-    avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else None
-    
-    # Mood distribution
-    mood_counts = {}
-    for entry in entries:
-        mood = entry.mood.value
-        mood_counts[mood] = mood_counts.get(mood, 0) + 1
-    
-    # Intervention stats
-    completed_interventions = sum(1 for i in interventions if i.completed)
-    total_intervention_time = sum(i.duration_seconds for i in interventions if i.completed)
-    
-    return {
-        "period_days": days,
-        "entry_count": len(entries),
-        "avg_stress_score": round(avg_stress, 1) if avg_stress is not None else None,
-        "mood_distribution": mood_counts,
-        "intervention_count": len(interventions),
-        "completed_interventions": completed_interventions,
-        "total_calm_minutes": round(total_intervention_time / 60, 1)
-    }
+    result = await db.execute(_period_stats_query(user_id, days))
+    return _stats_from_row(result.one(), days)
 
 
 @router.get("/streak")
+@cached("insights:streak")
 async def get_journaling_streak(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -261,72 +271,8 @@ async def get_journaling_streak(
     - Current streak (consecutive days with entries)
     - Longest streak ever
     - Total entries
-    """
-    # Optimize: Only fetch unique dates from the last 90 days
-    # This avoids fetching all entry content
-    from sqlalchemy import func
-    
-    # Get unique dates with entries (optimized query)
-    entry_dates_query = db.query(
-        func.date(JournalEntry.created_at)
-    ).filter(
-        JournalEntry.user_id == UUID(user_id)
-    ).distinct().order_by(
-        desc(func.date(JournalEntry.created_at))
-    ).limit(90).all()  # Only need recent history for current streak
-    
-    if not entry_dates_query:
-        # Check if there are any entries at all for total count
-        total_count = db.query(JournalEntry).filter(
-            JournalEntry.user_id == UUID(user_id)
-        ).count()
-        
-        return {
-            "current_streak": 0,
-            "longest_streak": 0,
-            "total_entries": total_count
-        }
-    
-    # Convert result tuples to date objects
-    entry_dates = [d[0] for d in entry_dates_query]
-    
-    # Calculate streaks
-    today = datetime.utcnow().date()
-    last_entry_date = entry_dates[0]
-
-    # Current streak only counts if the most recent entry is today or yesterday
-    current_streak = 0
-    is_active = (last_entry_date == today) or (last_entry_date == today - timedelta(days=1))
-    if is_active:
-        current_streak = 1
-        previous_date = last_entry_date
-        for date in entry_dates[1:]:
-            if date == previous_date - timedelta(days=1):
-                current_streak += 1
-                previous_date = date
-            else:
-                break
-
-    # Longest streak across the available history
-    longest_streak = 1
-    running = 1
-    prev_date = entry_dates[0]
-    for date in entry_dates[1:]:
-        if date == prev_date - timedelta(days=1):
-            running += 1
-        else:
-            longest_streak = max(longest_streak, running)
-            running = 1
-        prev_date = date
-    longest_streak = max(longest_streak, running)
-                
-    # Get total count separately
-    total_count = db.query(JournalEntry).filter(
-        JournalEntry.user_id == UUID(user_id)
-    ).count()
 
-    return {
-        "current_streak": current_streak,
-        "longest_streak": longest_streak,
-        "total_entries": total_count
-    }
+    Days are counted in the user's timezone over their full history.
+    """
+    result = await db.execute(streak_query(user_id))
+    return streak_from_row(result.one())
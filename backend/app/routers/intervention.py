@@ -1,17 +1,21 @@
 """
 Intervention API Router - Log completed wellness exercises.
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
 from uuid import UUID
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import get_current_user_id
 from app.models.intervention import InterventionLog, InterventionType
+from app.pagination import paginate, page_with_cursor, set_next_cursor
 from app.schemas.schemas import InterventionLogCreate, InterventionLogResponse
+from app.services.daily_stats_service import record_intervention
+from app.services.nudge_service import mark_nudge_stale, schedule_nudge_refresh
+from app.services.version_service import bump_data_version
 
 router = APIRouter()
 
@@ -19,7 +23,7 @@ router = APIRouter()
 @router.post("/", response_model=InterventionLogResponse)
 async def log_intervention(
     log: InterventionLogCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -35,28 +39,34 @@ async def log_intervention(
     )
     
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    await record_intervention(db, db_log)
+    await mark_nudge_stale(db, user_id)
+    await bump_data_version(db, user_id)
+    await db.commit()
+    await db.refresh(db_log)
     
+    schedule_nudge_refresh(user_id)
     return db_log
 
 
 @router.get("/", response_model=List[InterventionLogResponse])
 async def get_interventions(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Get user's intervention history.
+    Get user's intervention history, newest first.
+
+    Paginate with `cursor` (from the X-Next-Cursor header) or `skip`.
     """
-    logs = db.query(InterventionLog).filter(
-        InterventionLog.user_id == UUID(user_id)
-    ).order_by(desc(InterventionLog.created_at))\
-     .offset(skip)\
-     .limit(limit)\
-     .all()
+    query = select(InterventionLog).where(InterventionLog.user_id == UUID(user_id))
+    result = await db.execute(paginate(query, InterventionLog, limit, skip=skip, cursor=cursor))
+    logs, next_cursor = page_with_cursor(result.scalars().all(), limit)
+    set_next_cursor(response, next_cursor)
     
     return logs
 
@@ -64,7 +74,7 @@ async def get_interventions(
 @router.get("/recent")
 async def get_recent_interventions(
     hours: int = 24,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -72,10 +82,13 @@ async def get_recent_interventions(
     """
     since = datetime.utcnow() - timedelta(hours=hours)
     
-    logs = db.query(InterventionLog).filter(
-        InterventionLog.user_id == UUID(user_id),
-        InterventionLog.created_at >= since
-    ).order_by(desc(InterventionLog.created_at)).all()
+    result = await db.execute(
+        select(InterventionLog).where(
+            InterventionLog.user_id == UUID(user_id),
+            InterventionLog.created_at >= since
+        ).order_by(desc(InterventionLog.created_at))
+    )
+    logs = result.scalars().all()
     
     completed = [l for l in logs if l.completed]
     total_time = sum(l.duration_seconds for l in completed)
@@ -1,84 +1,60 @@
 """
 Journal API Router - CRUD operations for journal entries with AI analysis.
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import load_only, with_expression
 from uuid import UUID
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from app.database import get_db, SessionLocal
+from app.database import get_async_db
 from app.auth import get_current_user_id
 from app.models.journal import JournalEntry, MoodType, EntryType
+from app.pagination import paginate, page_with_cursor, set_next_cursor
 from app.schemas.schemas import (
     JournalEntryCreate,
     VoiceJournalEntryCreate,  # Added
     JournalEntryResponse,
+    JournalEntryListItem,
     AnalyzeRequest,
     JournalAnalysis
 )
-from app.services.gemini_service import analyze_journal_entry, analyze_voice_journal
+from app.services.analysis_queue import enqueue_analysis, notify_analysis_worker
+from app.services.gemini_scheduler import user_tier
+from app.services.gemini_service import (
+    analyze_journal_entry,
+    analyze_voice_journal,
+    stream_journal_analysis,
+)
+from app.services.daily_stats_service import record_entry
+from app.services.nudge_service import mark_nudge_stale, schedule_nudge_refresh
+from app.services.version_service import bump_data_version
+from app.sse import event_stream, sse_event
 import base64
 
 router = APIRouter()
 
-
-async def _analyze_and_update_entry(entry_id: UUID):
-    """
-    Background task to analyze journal entry with AI and update the record.
-    Also sets mood if not provided by user.
-    """
-    try:
-        db = SessionLocal()
-        try:
-            entry = db.query(JournalEntry).filter(JournalEntry.id == entry_id).first()
-            if not entry:
-                return
-        
-            # Run AI analysis - pass mood value if present, else None
-            current_mood = entry.mood.value if entry.mood else None
-            analysis = await analyze_journal_entry(entry.content, current_mood)
-        
-            # Update entry with analysis results
-            entry.stress_score = analysis["stress_score"]
-            entry.emotional_tone = analysis["emotional_tone"]
-            entry.key_themes = analysis["key_themes"]
-            entry.suggested_intervention = analysis["suggested_intervention"]
-            entry.supportive_message = analysis["supportive_message"]
-            entry.analyzed_at = datetime.utcnow()
-            
-            # If mood wasn't provided by user, set it from AI detection
-            if entry.mood is None and analysis.get("detected_mood"):
-                detected_mood_str = analysis["detected_mood"]
-                # Match to MoodType enum (case-insensitive)
-                mood_enum = next(
-                    (m for m in MoodType if m.value.lower() == detected_mood_str.lower()), 
-                    MoodType.Okay  # Default fallback
-                )
-                entry.mood = mood_enum
-        
-            db.commit()
-        finally:
-            db.close()
-    except Exception as e:
-        # Log error but don't fail - analysis is non-critical
-        print(f"Analysis background task error: {e}")
+# Fields a list request may select with `fields=`. `id` and `created_at` are
+# always returned: they identify the entry and make up the page cursor.
+LIST_FIELDS = tuple(JournalEntryResponse.model_fields)
+ALWAYS_LISTED = ("id", "created_at")
+MAX_PREVIEW_CHARS = 5000
 
 
 @router.post("/", response_model=JournalEntryResponse)
 async def create_journal_entry(
     entry: JournalEntryCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Create a new journal entry.
     
     Mood is optional - if not provided, AI will detect it during analysis.
-    AI analysis is triggered in the background and will be available
-    when fetching the entry later.
+    AI analysis is queued (see `app.services.analysis_queue`) and will be
+    available when fetching the entry later.
     """
     # Create new entry - mood can be None
     db_entry = JournalEntry(
@@ -89,19 +65,23 @@ async def create_journal_entry(
     )
     
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
-    
-    # Trigger AI analysis in background (non-blocking)
-    background_tasks.add_task(_analyze_and_update_entry, db_entry.id)
+    await record_entry(db, db_entry)
+    await db.flush()
+    # Queued in the same transaction, so the analysis survives restarts
+    await enqueue_analysis(db, db_entry)
+    await mark_nudge_stale(db, user_id)
+    await bump_data_version(db, user_id)
+    await db.commit()
+    await db.refresh(db_entry)
     
+    notify_analysis_worker()
     return db_entry
 
 
 @router.post("/voice", response_model=JournalEntryResponse)
 async def create_voice_journal_entry(
     entry: VoiceJournalEntryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
@@ -121,7 +101,11 @@ async def create_voice_journal_entry(
         
         # Analyze with Gemini (Audio -> Text + Analysis)
         # We do this synchronously (await) so we can save the transcript
-        analysis = await analyze_voice_journal(audio_bytes, entry.audio_mime_type)
+        tier = await user_tier(db, user_id)
+        # Return the connection to the pool while Gemini works; the insert
+        # below checks out a new one
+        await db.close()
+        analysis = await analyze_voice_journal(audio_bytes, entry.audio_mime_type, tier=tier)
         
         # Determine mood (User provided > AI detected > Okay)
         mood_str = entry.mood or analysis.get("detected_mood", "Okay")
@@ -149,9 +133,13 @@ async def create_voice_journal_entry(
         )
         
         db.add(db_entry)
-        db.commit()
-        db.refresh(db_entry)
+        await record_entry(db, db_entry)
+        await mark_nudge_stale(db, user_id)
+        await bump_data_version(db, user_id)
+        await db.commit()
+        await db.refresh(db_entry)
         
+        schedule_nudge_refresh(user_id)
         return db_entry
         
     except Exception as e:
@@ -159,22 +147,95 @@ async def create_voice_journal_entry(
         raise HTTPException(status_code=500, detail=f"Failed to process voice entry: {str(e)}")
 
 
-@router.get("/", response_model=List[JournalEntryResponse])
-async def get_journal_entries(
-    skip: int = 0,
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated `fields=` value.
+
+    Returns:
+        The selected field names (always including `ALWAYS_LISTED`), or
+        None when every field is wanted
+
+    Raises:
+        HTTPException: 400 for unknown field names
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(LIST_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys([*ALWAYS_LISTED, *names]))
+
+
+def _project(query: Select, fields: Optional[Sequence[str]], preview: Optional[int]) -> Select:
+    """
+    Load only the selected columns; in preview mode load the first
+    `preview` characters of `content` instead of the whole text.
+    """
+    if fields is None and preview is None:
+        return query
+    names = fields or LIST_FIELDS
+    columns = [
+        getattr(JournalEntry, name) for name in names
+        if not (name == "content" and preview is not None)
+    ]
+    query = query.options(load_only(*columns))
+    if preview is not None and "content" in names:
+        query = query.options(with_expression(
+            JournalEntry.content_preview,
+            func.left(JournalEntry.content, preview)
+        ))
+    return query
+
+
+def to_list_items(
+    entries: Sequence[JournalEntry],
+    fields: Optional[Sequence[str]] = None,
+    preview: Optional[int] = None
+) -> List[Any]:
+    """
+    Serialize entries loaded by `list_journal_entries`.
+
+    Full entries are returned as-is. Projected ones become dicts holding
+    only the loaded fields, since reading a deferred column would trigger
+    a lazy load.
+    """
+    if fields is None and preview is None:
+        return list(entries)
+    names = fields or LIST_FIELDS
+    items: List[Dict[str, Any]] = []
+    for entry in entries:
+        item = {name: getattr(entry, name) for name in names if name != "content"}
+        if "content" in names:
+            item["content"] = entry.content_preview if preview is not None else entry.content
+        items.append(item)
+    return items
+
+
+async def list_journal_entries(
+    db: AsyncSession,
+    user_id: str,
     limit: int = 20,
-    mood: str = None,
-    db: Session = Depends(get_db),
-    user_id: str = Depends(get_current_user_id)
-):
+    skip: int = 0,
+    mood: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    preview: Optional[int] = None
+) -> Tuple[List[JournalEntry], Optional[str]]:
     """
-    Get user's journal entries with optional mood filter.
-    
-    Entries are returned in reverse chronological order.
+    One page of the user's journal entries, newest first.
+
+    Args:
+        fields: Columns to load (from `parse_fields`); None loads all
+        preview: Load only this many characters of `content`
+
+    Returns:
+        The entries and the cursor for the next page (None on the last page)
     """
-    query = db.query(JournalEntry).filter(
+    query = select(JournalEntry).where(
         JournalEntry.user_id == UUID(user_id)
     )
+    query = _project(query, fields, preview)
     
     # Optional mood filter
     if mood and mood != "all":
@@ -182,31 +243,66 @@ async def get_journal_entries(
         mood_enum = next((m for m in MoodType if m.value.lower() == mood.lower()), None)
         
         if mood_enum:
-            query = query.filter(JournalEntry.mood == mood_enum)
+            query = query.where(JournalEntry.mood == mood_enum)
         else:
             # If invalid mood provided, return empty list (or raise 400)
             # Returning empty list implies "no entries match this filter"
-            return []
+            return [], None
     
-    entries = query.order_by(desc(JournalEntry.created_at))\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    result = await db.execute(paginate(query, JournalEntry, limit, skip=skip, cursor=cursor))
+    return page_with_cursor(result.scalars().all(), limit)
+
+
+@router.get(
+    "/",
+    response_model=List[JournalEntryListItem],
+    response_model_exclude_unset=True
+)
+async def get_journal_entries(
+    response: Response,
+    skip: int = 0,
+    limit: int = 20,
+    mood: str = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    preview: Optional[int] = Query(None, ge=1, le=MAX_PREVIEW_CHARS),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get user's journal entries with optional mood filter.
     
-    return entries
+    Entries are returned in reverse chronological order. Pass the
+    X-Next-Cursor header of one page as `cursor` to get the next; `skip`
+    still works for older clients but gets slower on deep pages.
+
+    List views can shrink the response with `fields=id,mood,content`
+    (only those columns are read from the database) and `preview=N`
+    (`content` holds at most the first N characters).
+    """
+    selected = parse_fields(fields)
+    entries, next_cursor = await list_journal_entries(
+        db, user_id, limit=limit, skip=skip, mood=mood, cursor=cursor,
+        fields=selected, preview=preview
+    )
+    set_next_cursor(response, next_cursor)
+    return to_list_items(entries, selected, preview)
 
 
 @router.get("/{entry_id}", response_model=JournalEntryResponse)
 async def get_journal_entry(
     entry_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """Get a specific journal entry by ID."""
-    entry = db.query(JournalEntry).filter(
-        JournalEntry.id == entry_id,
-        JournalEntry.user_id == UUID(user_id)
-    ).first()
+    result = await db.execute(
+        select(JournalEntry).where(
+            JournalEntry.id == entry_id,
+            JournalEntry.user_id == UUID(user_id)
+        )
+    )
+    entry = result.scalars().first()
     
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
@@ -217,20 +313,26 @@ async def get_journal_entry(
 @router.delete("/{entry_id}")
 async def delete_journal_entry(
     entry_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """Delete a journal entry."""
-    entry = db.query(JournalEntry).filter(
-        JournalEntry.id == entry_id,
-        JournalEntry.user_id == UUID(user_id)
-    ).first()
+    result = await db.execute(
+        select(JournalEntry).where(
+            JournalEntry.id == entry_id,
+            JournalEntry.user_id == UUID(user_id)
+        )
+    )
+    entry = result.scalars().first()
     
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     
-    db.delete(entry)
-    db.commit()
+    await record_entry(db, entry, sign=-1)
+    await db.delete(entry)
+    await mark_nudge_stale(db, user_id)
+    await bump_data_version(db, user_id)
+    await db.commit()
     
     return {"message": "Entry deleted successfully"}
 
@@ -238,12 +340,45 @@ async def delete_journal_entry(
 @router.post("/analyze", response_model=JournalAnalysis)
 async def analyze_text(
     request: AnalyzeRequest,
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Directly analyze text content without creating a journal entry.
     
-    Useful for real-time analysis or preview before saving.
+    Useful for real-time analysis or preview before saving. Served in the
+    interactive lane, ahead of background analyses.
     """
-    result = await analyze_journal_entry(request.content, request.mood)
+    tier = await user_tier(db, user_id)
+    # Return the connection to the pool before waiting on Gemini
+    await db.close()
+    result = await analyze_journal_entry(request.content, request.mood, tier=tier)
     return JournalAnalysis(**result)
+
+
+@router.post("/analyze/stream")
+async def analyze_text_stream(
+    request: AnalyzeRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Streaming variant of `/analyze` (Server-Sent Events).
+
+    Sends `delta` events (`{"text": ...}`) with pieces of the supportive
+    message as Gemini writes it, then one `result` event with the full
+    `JournalAnalysis`. The result is final: if analysis falls back after
+    deltas were sent, its message replaces them.
+    """
+    tier = await user_tier(db, user_id)
+    # Return the connection to the pool before the stream starts
+    await db.close()
+
+    async def events():
+        async for kind, value in stream_journal_analysis(request.content, request.mood, tier=tier):
+            if kind == "delta":
+                yield sse_event("delta", {"text": value})
+            else:
+                yield sse_event("result", JournalAnalysis(**value).model_dump(mode="json"))
+
+    return event_stream(events())
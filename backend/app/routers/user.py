@@ -1,38 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import cached
+from app.database import get_async_db
 from app.auth import get_current_user_id, get_current_user
 from app.models.user import User
 from app.schemas.schemas import UserResponse, UserOnboardingRequest, UserPreferencesUpdate
+from app.services.daily_stats_service import rebuild_daily_stats
+from app.services.version_service import bump_data_version
+from app.config import settings
 from uuid import UUID
 
 router = APIRouter()
 
 @router.get("/profile", response_model=UserResponse)
+@cached("user:profile", ttl=settings.CACHE_PROFILE_TTL_SECONDS)
 async def get_user_profile(
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user profile.
     """
-    print(f"DEBUG: get_user_profile called for user_id: {user_id}")
-    try:
-        user = db.query(User).filter(User.id == UUID(user_id)).first()
-        print(f"DEBUG: DB query result: {user}")
-        if not user:
-            print("DEBUG: User not found in DB")
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except Exception as e:
-        print(f"DEBUG: Error in get_user_profile: {e}")
-        raise e
+    user = await db.get(User, UUID(user_id))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserResponse.model_validate(user)
 
 @router.put("/profile", response_model=UserResponse)
 async def update_user_profile(
     profile_data: UserOnboardingRequest,
     user_data: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user profile with onboarding data. Creates user if not exists.
@@ -40,7 +38,7 @@ async def update_user_profile(
     user_id = UUID(user_data["id"])
     email = user_data["email"]
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         # Create new user
@@ -57,28 +55,40 @@ async def update_user_profile(
     user.occupation = profile_data.occupation
     user.wearable_connected = profile_data.wearable_connected
     
-    db.commit()
-    db.refresh(user)
+    # Flush first so a newly created user row exists to bump
+    await db.flush()
+    await bump_data_version(db, str(user_id))
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.patch("/preferences", response_model=UserResponse)
 async def update_user_preferences(
     preferences: UserPreferencesUpdate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user preferences (partial update).
     """
-    user = db.query(User).filter(User.id == UUID(user_id)).first()
+    user = await db.get(User, UUID(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Update only provided fields
     update_data = preferences.model_dump(exclude_unset=True)
+    timezone_changed = (
+        "timezone" in update_data and update_data["timezone"] != user.timezone
+    )
     for key, value in update_data.items():
         setattr(user, key, value)
-        
-    db.commit()
-    db.refresh(user)
+    
+    if timezone_changed:
+        # Daily rollup rows are bucketed by local day - re-bucket them
+        await db.flush()
+        await rebuild_daily_stats(db, user_id)
+    
+    await bump_data_version(db, user_id)
+    await db.commit()
+    await db.refresh(user)
     return user
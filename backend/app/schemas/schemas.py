@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Literal
 from datetime import datetime
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -96,6 +97,30 @@ class JournalEntryResponse(BaseModel):
         from_attributes = True
 
 
+class JournalEntryListItem(BaseModel):
+    """
+    Journal entry in a list response.
+    With `fields=` or `preview=` only the selected fields are present;
+    `id` and `created_at` always are.
+    """
+    id: UUID
+    created_at: datetime
+    user_id: Optional[UUID] = None
+    entry_type: Optional[EntryTypeLiteral] = None
+    content: Optional[str] = None
+    mood: Optional[MoodLiteral] = None
+    
+    stress_score: Optional[int] = None
+    emotional_tone: Optional[str] = None
+    key_themes: Optional[List[str]] = None
+    suggested_intervention: Optional[str] = None
+    supportive_message: Optional[str] = None
+    analyzed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Nudge Schemas
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -114,6 +139,10 @@ class NudgeDecision(BaseModel):
     context: str = ""
     priority: PriorityLiteral = "medium"
 
+    # Freshness of a cached decision (set by the dashboard's stale-while-revalidate path)
+    computed_at: Optional[datetime] = None
+    stale: bool = False
+
     @field_validator('nudge_type', mode='before')
     @classmethod
     def validate_nudge_type(cls, v):
@@ -186,6 +215,18 @@ class UserPreferencesUpdate(BaseModel):
     theme: Optional[Literal["light", "dark", "system"]] = None
     nudge_enabled: Optional[bool] = None
     daily_reminder: Optional[bool] = None
+    timezone: Optional[str] = Field(None, max_length=64)
+
+    @field_validator('timezone')
+    @classmethod
+    def validate_timezone(cls, v):
+        if v is None:
+            return None
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {v}")
+        return v
 
 
 class UserOnboardingRequest(BaseModel):
@@ -208,6 +249,7 @@ class UserResponse(BaseModel):
     wearable_connected: bool = False
     
     locale: str
+    timezone: str = "UTC"
     theme: str
     subscription: str
     nudge_enabled: bool
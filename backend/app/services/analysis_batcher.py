@@ -0,0 +1,149 @@
+"""
+Analysis Batcher - groups queued analyses into multi-entry Gemini calls.
+
+Sending one prompt per entry repeats the whole analysis preamble each
+time. The worker passes every claimed entry to `AnalysisBatcher.analyze`.
+Entries that the pre-screen (local analyzer, analysis cache) cannot answer
+wait until ANALYSIS_BATCH_SIZE of them are collected, or until
+ANALYSIS_BATCH_WINDOW_MS has passed since the first one arrived. They are
+then sent together as one `BATCH_ANALYSIS_PROMPT` call, and each caller
+gets its own entry's result. Jobs therefore still complete, retry and
+dead-letter one by one.
+
+Batches are kept per user: journals are private, so a prompt only ever
+holds entries of one user (a backlog after an outage or an import) and
+is scheduled under that user's tier.
+
+- Malformed response (not a JSON array): each entry is analyzed on its own
+- Entries missing from an otherwise valid response: those entries are
+  analyzed on their own
+- Gemini errors (timeouts, open breaker, shed calls): raised to every
+  caller in the batch; their jobs retry with backoff
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.models.journal import JournalEntry
+from app.services.gemini_scheduler import Lane
+from app.services.gemini_service import (
+    BatchItem,
+    analyze_journal_entries,
+    analyze_with_gemini,
+    prescreen_analysis,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    item: BatchItem
+    tier: str
+    future: asyncio.Future
+
+
+class AnalysisBatcher:
+    """Collects escalated entries and analyzes them in batches."""
+
+    def __init__(self, max_size: Optional[int] = None, window_ms: Optional[float] = None):
+        self.max_size = max(1, max_size or settings.ANALYSIS_BATCH_SIZE)
+        self.window = (window_ms if window_ms is not None else settings.ANALYSIS_BATCH_WINDOW_MS) / 1000
+        self._pending: Dict[str, List[_Pending]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batches: Set[asyncio.Task] = set()
+        self.flushed = 0
+        self.malformed = 0
+        self.fallback_entries = 0
+
+    async def analyze(self, entry: JournalEntry, tier: str) -> dict:
+        """
+        Analyze an entry, batched with others when Gemini is needed.
+
+        Raises:
+            Exception: Gemini errors, so the job can be retried
+        """
+        mood = entry.mood.value if entry.mood else None
+        local, ready = await prescreen_analysis(entry.content, mood)
+        if ready is not None:
+            return ready
+
+        item = BatchItem(key=str(entry.id), content=entry.content, mood=mood, local=local)
+        if self.max_size == 1:
+            return await analyze_with_gemini(item.content, item.mood, item.local, Lane.background, tier)
+
+        user_id = str(entry.user_id)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(user_id, [])
+        pending.append(_Pending(item, tier, future))
+        if len(pending) >= self.max_size:
+            self._flush(user_id)
+        elif user_id not in self._timers:
+            self._timers[user_id] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, user_id
+            )
+        return await future
+
+    def _flush(self, user_id: str) -> None:
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(user_id, [])
+        if not batch:
+            return
+        self.flushed += 1
+        task = asyncio.create_task(self._run(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        # Callers that gave up (job timeout, shutdown) cancelled their future
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+        results = {}
+        if len(batch) > 1:
+            try:
+                # One user's entries, so one tier; take the latest lookup
+                results = await analyze_journal_entries(
+                    [pending.item for pending in batch], Lane.background, batch[-1].tier
+                )
+            except ValueError as e:
+                self.malformed += 1
+                logger.warning(f"Malformed batch analysis of {len(batch)} entries, analyzing each: {e}")
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                return
+
+        missing = [pending for pending in batch if pending.item.key not in results]
+        if len(batch) > 1:
+            self.fallback_entries += len(missing)
+        for pending in batch:
+            if pending.item.key in results and not pending.future.done():
+                pending.future.set_result(results[pending.item.key])
+        await asyncio.gather(*(self._analyze_one(pending) for pending in missing))
+
+    async def _analyze_one(self, pending: _Pending) -> None:
+        item = pending.item
+        try:
+            result = await analyze_with_gemini(item.content, item.mood, item.local, Lane.background, pending.tier)
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            return
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_size": self.max_size,
+            "window_ms": round(self.window * 1000),
+            "waiting": sum(len(batch) for batch in self._pending.values()),
+            "flushed": self.flushed,
+            "malformed": self.malformed,
+            "fallback_entries": self.fallback_entries,
+        }
@@ -0,0 +1,74 @@
+"""
+Analysis Cache - reuses Gemini analyses of the same journal text.
+
+Results are stored in the response cache (see `app.cache`) under
+`analysis:<prompt version>:<sha256>`. The hash covers the normalized
+content and mood. Text that differs only in case, Unicode form or
+whitespace maps to the same entry. A new prompt or model gets a new
+prompt version, so old results are never read and simply expire.
+
+The key does not depend on the user, so the same text gets the same
+analysis whoever writes it. A preview from `/api/journal/analyze` is
+reused when the entry is saved and the queued analysis runs. Entries
+expire after ANALYSIS_CACHE_TTL_SECONDS. With the memory backend each
+process has its own cache. Standalone workers (`python -m app.worker`)
+see the API's previews only with the Redis backend.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+from app.cache import get_cache
+from app.config import settings
+
+NAMESPACE = "analysis"
+
+_WHITESPACE = re.compile(r"\s+")
+_counters = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def normalize_content(content: str) -> str:
+    """NFKC-normalize, case-fold and collapse whitespace."""
+    content = unicodedata.normalize("NFKC", content).casefold()
+    return _WHITESPACE.sub(" ", content).strip()
+
+
+def analysis_cache_key(content: str, mood: Optional[str], prompt_version: str) -> str:
+    """Cache key for analyzing `content` with `mood` under `prompt_version`."""
+    digest = hashlib.sha256(
+        f"{mood or ''}\x00{normalize_content(content)}".encode("utf-8")
+    ).hexdigest()
+    return f"{NAMESPACE}:{prompt_version}:{digest}"
+
+
+async def get_cached_analysis(content: str, mood: Optional[str], prompt_version: str) -> Optional[dict]:
+    """Return the cached analysis for this text, or None."""
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+    value = await get_cache().get(analysis_cache_key(content, mood, prompt_version))
+    if value is None:
+        _counters["misses"] += 1
+        return None
+    _counters["hits"] += 1
+    return dict(value)
+
+
+async def store_analysis(content: str, mood: Optional[str], prompt_version: str, analysis: dict) -> None:
+    """Cache a Gemini analysis of this text (not fallbacks: they would hide a recovery)."""
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return
+    await get_cache().set(
+        analysis_cache_key(content, mood, prompt_version),
+        analysis,
+        ttl=settings.ANALYSIS_CACHE_TTL_SECONDS
+    )
+    _counters["stores"] += 1
+
+
+def analysis_cache_stats() -> dict:
+    lookups = _counters["hits"] + _counters["misses"]
+    return {
+        **_counters,
+        "hit_ratio": round(_counters["hits"] / lookups, 3) if lookups else None,
+    }
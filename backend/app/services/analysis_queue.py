@@ -0,0 +1,346 @@
+"""
+Analysis Queue - durable Postgres-backed queue for journal analysis.
+
+Creating an entry inserts an `analysis_jobs` row in the same transaction,
+so queued work survives restarts and deploys. Workers claim due jobs with
+`FOR UPDATE SKIP LOCKED`, so any number of them (in API processes or
+standalone, see `app.worker`) can share the queue without double-claiming.
+
+A claimed job is leased for ANALYSIS_VISIBILITY_TIMEOUT_SECONDS. If its
+worker dies, the lease expires and another worker claims the job again. A
+successful job is deleted in the same transaction that stores the
+analysis, and only while the worker still holds the lease. A failed job is
+retried with exponential backoff, and dead-lettered (status `dead`) once
+it has used max_attempts. A dead-lettered entry gets the local analyzer's
+result in the same transaction, so it never stays pending.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+from datetime import timedelta
+from typing import List, Optional, Set
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.analysis_job import AnalysisJob, JobStatus
+from app.models.journal import JournalEntry
+from app.services.analysis_batcher import AnalysisBatcher
+from app.services.analysis_service import apply_analysis, load_entry_for_analysis
+from app.services.local_analyzer import analyze_locally
+from app.services.nudge_service import schedule_nudge_refresh
+
+logger = logging.getLogger(__name__)
+
+# Longest error message kept on a job row
+_MAX_ERROR_CHARS = 1000
+
+# Worker started by the API process (if enabled), woken on new jobs
+_worker: Optional["AnalysisWorker"] = None
+_worker_task: Optional[asyncio.Task] = None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Queue Operations
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def enqueue_analysis(db: AsyncSession, entry: JournalEntry) -> None:
+    """
+    Queue analysis of a flushed entry inside the caller's transaction.
+    A no-op if the entry already has a queued or running job.
+    """
+    await db.execute(
+        insert(AnalysisJob)
+        .values(
+            entry_id=entry.id,
+            user_id=entry.user_id,
+            status=JobStatus.pending,
+            max_attempts=settings.ANALYSIS_MAX_ATTEMPTS
+        )
+        .on_conflict_do_nothing(
+            index_elements=[AnalysisJob.entry_id],
+            # Must match the partial index predicate literally
+            index_where=text("status IN ('pending', 'running')")
+        )
+    )
+
+
+def notify_analysis_worker() -> None:
+    """Wake this process's worker after a commit that queued jobs."""
+    if _worker is not None:
+        _worker.notify()
+
+
+async def claim_jobs(limit: int, worker_id: str) -> List[AnalysisJob]:
+    """
+    Lease up to `limit` due jobs to `worker_id`.
+
+    Due jobs are pending ones past `run_after` and running ones whose lease
+    expired. Rows locked by concurrent claims are skipped, not waited on.
+    """
+    now = func.now()
+    due = (
+        select(AnalysisJob.id)
+        .where(or_(
+            and_(AnalysisJob.status == JobStatus.pending, AnalysisJob.run_after <= now),
+            and_(AnalysisJob.status == JobStatus.running, AnalysisJob.locked_until < now)
+        ))
+        .order_by(AnalysisJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id.in_(due.scalar_subquery()))
+            .values(
+                status=JobStatus.running,
+                attempts=AnalysisJob.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=settings.ANALYSIS_VISIBILITY_TIMEOUT_SECONDS)
+            )
+            .returning(AnalysisJob)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = list(result.scalars().all())
+        await db.commit()
+    return jobs
+
+
+async def complete_job(db: AsyncSession, job: AnalysisJob, worker_id: str) -> bool:
+    """
+    Delete a finished job inside the caller's transaction.
+
+    Returns:
+        False if the worker lost the lease (the job expired and was claimed
+        again), in which case the caller should roll back
+    """
+    result = await db.execute(
+        delete(AnalysisJob).where(
+            AnalysisJob.id == job.id,
+            AnalysisJob.locked_by == worker_id,
+            AnalysisJob.status == JobStatus.running
+        )
+    )
+    return result.rowcount == 1
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before retry number `attempts`: exponential, capped, jittered."""
+    delay = min(
+        settings.ANALYSIS_RETRY_MAX_SECONDS,
+        settings.ANALYSIS_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def fail_job(job: AnalysisJob, worker_id: str, error: str) -> None:
+    """
+    Schedule a retry for a failed job, or dead-letter it if out of attempts.
+    Dead-lettering stores the local (fallback) analysis of the entry in the
+    same transaction.
+    """
+    dead = job.attempts >= job.max_attempts
+    if dead:
+        values = {"status": JobStatus.dead, "finished_at": func.now()}
+        logger.error(f"Analysis job {job.id} dead-lettered after {job.attempts} attempts: {error}")
+    else:
+        delay = retry_delay(job.attempts)
+        values = {"status": JobStatus.pending, "run_after": func.now() + timedelta(seconds=delay)}
+        logger.warning(f"Analysis job {job.id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {error}")
+
+    loaded = await load_entry_for_analysis(job.entry_id) if dead else None
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job.id, AnalysisJob.locked_by == worker_id)
+            .values(locked_by=None, locked_until=None, last_error=error[:_MAX_ERROR_CHARS], **values)
+        )
+        applied = False
+        if loaded is not None and result.rowcount == 1:
+            entry, _ = loaded
+            fallback = analyze_locally(entry.content, entry.mood.value if entry.mood else None).result
+            applied = await apply_analysis(db, entry, fallback)
+        await db.commit()
+    if applied:
+        schedule_nudge_refresh(str(entry.user_id))
+
+
+async def queue_stats(db: AsyncSession) -> dict:
+    """Job counts by status, plus the age of the oldest due job."""
+    result = await db.execute(
+        select(AnalysisJob.status, func.count()).group_by(AnalysisJob.status)
+    )
+    counts = {status.value: 0 for status in JobStatus}
+    counts.update({status.value: count for status, count in result.all()})
+
+    oldest = await db.execute(
+        select(func.extract("epoch", func.now() - func.min(AnalysisJob.run_after)))
+        .where(AnalysisJob.status == JobStatus.pending, AnalysisJob.run_after <= func.now())
+    )
+    lag = oldest.scalar()
+    return {**counts, "oldest_due_seconds": round(float(lag), 1) if lag is not None else None}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Worker
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class AnalysisWorker:
+    """
+    Claims and runs analysis jobs, at most `concurrency` at a time.
+
+    Polls every `poll_interval` seconds, and immediately when `notify` is
+    called or a job finishes. Gemini calls go through an `AnalysisBatcher`
+    of up to `batch_size` entries, so batches are never larger than
+    `concurrency`.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.concurrency = max(1, concurrency or settings.ANALYSIS_WORKER_CONCURRENCY)
+        self.poll_interval = poll_interval or settings.ANALYSIS_POLL_INTERVAL_SECONDS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.batcher = AnalysisBatcher(batch_size)
+        self._active: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until `stop` is called."""
+        logger.info(f"Analysis worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping:
+            self._wake.clear()
+            free = self.concurrency - len(self._active)
+            if free > 0:
+                try:
+                    jobs = await claim_jobs(free, self.worker_id)
+                except Exception as e:
+                    logger.error(f"Analysis worker {self.worker_id} claim failed: {e}")
+                    jobs = []
+                for job in jobs:
+                    task = asyncio.create_task(self._run_job(job))
+                    self._active.add(task)
+                    task.add_done_callback(self._on_job_done)
+                if len(jobs) == free:
+                    # Slots were filled; more may be due
+                    continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        if self._active:
+            # Let `stop` finish or cancel in-flight jobs
+            await asyncio.wait(self._active)
+
+    def _on_job_done(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self._wake.set()
+
+    async def _run_job(self, job: AnalysisJob) -> None:
+        if job.attempts > job.max_attempts:
+            # Claimed again after its lease expired on the final attempt
+            await fail_job(job, self.worker_id, job.last_error or "Visibility timeout exceeded")
+            self.failed += 1
+            return
+        try:
+            user_id = await asyncio.wait_for(
+                self._analyze(job),
+                timeout=settings.ANALYSIS_VISIBILITY_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            self.failed += 1
+            reason = "Timed out" if isinstance(e, asyncio.TimeoutError) else repr(e)
+            try:
+                await fail_job(job, self.worker_id, reason)
+            except Exception as exc:
+                # The lease expires and the job is claimed again
+                logger.error(f"Could not record failure of analysis job {job.id}: {exc}")
+            return
+        self.completed += 1
+        if user_id is not None:
+            schedule_nudge_refresh(user_id)
+
+    async def _analyze(self, job: AnalysisJob) -> Optional[str]:
+        """
+        Analyze the job's entry, then store the result and delete the job in
+        one transaction. No connection is held while Gemini runs.
+
+        Returns:
+            The user id if an analysis was stored
+        """
+        loaded = await load_entry_for_analysis(job.entry_id)
+        entry, analysis = None, None
+        if loaded is not None:
+            entry, tier = loaded
+            analysis = await self.batcher.analyze(entry, tier)
+
+        async with AsyncSessionLocal() as db:
+            applied = analysis is not None and await apply_analysis(db, entry, analysis)
+            if not await complete_job(db, job, self.worker_id):
+                logger.warning(f"Analysis job {job.id} lost its lease, discarding result")
+                await db.rollback()
+                return None
+            await db.commit()
+        return str(entry.user_id) if applied else None
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop claiming and wait up to `timeout` seconds for running jobs.
+        Jobs still running are cancelled; their leases expire and another
+        worker picks them up.
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._active:
+            _, pending = await asyncio.wait(self._active, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        logger.info(f"Analysis worker {self.worker_id} stopped")
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "active": len(self._active),
+            "completed": self.completed,
+            "failed": self.failed,
+            "batcher": self.batcher.stats(),
+        }
+
+
+async def start_analysis_worker() -> AnalysisWorker:
+    """Start a worker in this process (called on application startup)."""
+    global _worker, _worker_task
+    _worker = AnalysisWorker()
+    _worker_task = asyncio.create_task(_worker.run())
+    return _worker
+
+
+async def stop_analysis_worker() -> None:
+    """Stop this process's worker (called on shutdown)."""
+    global _worker, _worker_task
+    if _worker is not None:
+        await _worker.stop()
+        await _worker_task
+        _worker, _worker_task = None, None
+
+
+def get_analysis_worker() -> Optional[AnalysisWorker]:
+    return _worker
@@ -0,0 +1,108 @@
+"""
+Analysis Service - applies AI analysis results to journal entries.
+
+Run by the analysis queue workers (see `app.services.analysis_queue`) in
+three steps, so no pooled connection is held during the Gemini call:
+1. `load_entry_for_analysis` reads the entry and releases its connection
+2. the worker's `app.services.analysis_batcher.AnalysisBatcher` calls
+   Gemini, batching entries of the same user
+3. `apply_analysis` writes the results with one targeted UPDATE that only
+   matches a still-unanalyzed entry; the owner's clients are sent
+   `entry_analyzed` when it commits
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.events import ENTRY_ANALYZED, queue_event
+from app.models.journal import JournalEntry, MoodType
+from app.services.daily_stats_service import record_entry
+from app.services.gemini_scheduler import user_tier
+from app.services.nudge_service import mark_nudge_stale
+from app.services.version_service import bump_data_version
+
+
+async def load_entry_for_analysis(entry_id: UUID) -> Optional[Tuple[JournalEntry, str]]:
+    """
+    Read an entry and its owner's subscription tier on a short-lived session.
+
+    Returns:
+        The detached entry and tier, or None if the entry was deleted or is
+        already analyzed
+    """
+    async with AsyncSessionLocal() as db:
+        entry = await db.get(JournalEntry, entry_id)
+        if entry is None or entry.is_analyzed:
+            return None
+        tier = await user_tier(db, entry.user_id)
+    return entry, tier
+
+
+async def apply_analysis(db: AsyncSession, entry: JournalEntry, analysis: dict) -> bool:
+    """
+    Stage the analysis results on `db` without committing, so the caller
+    commits them together with its own bookkeeping (e.g. completing the
+    queue job). Also sets mood if not provided by user.
+
+    Args:
+        entry: Entry as read by `load_entry_for_analysis`
+        analysis: Gemini (or local fallback) analysis of the entry
+
+    Returns:
+        False if the entry was deleted or analyzed in the meantime (nothing
+        is written)
+    """
+    mood = entry.mood
+    if mood is None and analysis.get("detected_mood"):
+        detected_mood_str = analysis["detected_mood"]
+        # Match to MoodType enum (case-insensitive)
+        mood = next(
+            (m for m in MoodType if m.value.lower() == detected_mood_str.lower()),
+            MoodType.Okay  # Default fallback
+        )
+
+    values = {
+        "stress_score": analysis["stress_score"],
+        "emotional_tone": analysis["emotional_tone"],
+        "key_themes": analysis["key_themes"],
+        "suggested_intervention": analysis["suggested_intervention"],
+        "supportive_message": analysis["supportive_message"],
+        "analyzed_at": datetime.utcnow(),
+        "mood": mood,
+    }
+    result = await db.execute(
+        update(JournalEntry)
+        .where(JournalEntry.id == entry.id, JournalEntry.analyzed_at.is_(None))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+
+    # Swap the entry's pre-analysis contribution in the daily rollup
+    # for the analyzed one (stress score, detected mood). Unanalyzed
+    # entries are never edited, so `entry` still holds the stored values.
+    analyzed = JournalEntry(
+        id=entry.id,
+        user_id=entry.user_id,
+        created_at=entry.created_at,
+        stress_score=values["stress_score"],
+        mood=mood
+    )
+    await record_entry(db, entry, sign=-1)
+    await record_entry(db, analyzed)
+
+    # New analysis changes the nudge picture
+    user_id = str(entry.user_id)
+    await mark_nudge_stale(db, user_id)
+    await bump_data_version(db, user_id)
+    queue_event(db, user_id, ENTRY_ANALYZED, {
+        "entry_id": str(entry.id),
+        "stress_score": values["stress_score"],
+        "analyzed_at": values["analyzed_at"].isoformat(),
+    })
+    return True
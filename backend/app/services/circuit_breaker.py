@@ -0,0 +1,103 @@
+"""
+Circuit breaker for calls to an unreliable dependency (Gemini).
+
+- closed: calls go through. After `failure_threshold` consecutive failures
+  the breaker trips to open.
+- open: calls are rejected at once with `CircuitOpen` for `reset_seconds`.
+  Callers then serve their fallback instead of waiting on requests that
+  are likely to fail.
+- half_open: after the cooldown one trial call (the probe) is let
+  through. Its success closes the breaker; its failure opens it again.
+  Calls that started before the breaker opened may finish meanwhile, but
+  only the probe decides, and only the probe ends the probe.
+"""
+import time
+from typing import Callable
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """
+        Check whether a call may proceed.
+
+        Returns:
+            True if the call is the half-open probe. Pass it on to
+            `record_success`, `record_failure` or `release`.
+
+        Raises:
+            CircuitOpen: The breaker is open, or half-open with its probe
+                already in flight
+        """
+        if self.state == self.OPEN:
+            if self._clock() - self._opened_at < self.reset_seconds:
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} circuit open")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} circuit half-open, probe in flight")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, probe: bool = False) -> None:
+        if probe:
+            self._probe_in_flight = False
+        elif self.state == self.HALF_OPEN:
+            return
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self, probe: bool = False) -> None:
+        if probe:
+            self._probe_in_flight = False
+        elif self.state == self.HALF_OPEN:
+            return
+        self.consecutive_failures += 1
+        if probe or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+    def release(self, probe: bool = False) -> None:
+        """End a call that neither succeeded nor failed (e.g. cancelled)."""
+        if probe:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,254 @@
+"""
+Daily Stats Service - maintains the `user_daily_stats` rollup.
+
+Every journal or intervention write adds its contribution to the row for
+the user's local calendar day, inside the caller's transaction. Stats,
+streak and nudge-status reads then aggregate a few small rows instead of
+rescanning raw history.
+
+Entries contribute with a sign: +1 when created, -1 when deleted. Analysis
+retracts the entry's old contribution and adds the new one, so stress and
+mood totals follow the analyzed values.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    TIMESTAMP, Date, Integer, String, and_, case, cast, delete, func, literal, select
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.daily_stats import UserDailyStats
+from app.models.intervention import InterventionLog
+from app.models.journal import JournalEntry
+from app.models.user import User
+
+DEFAULT_TIMEZONE = "UTC"
+
+# Entries above this stress score count as high stress
+HIGH_STRESS_THRESHOLD = 70
+
+_COUNTER_COLUMNS = (
+    "entry_count", "stress_sum", "stress_count", "high_stress_count",
+    "intervention_count", "completed_interventions", "calm_seconds",
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Local Days
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def user_timezone(user_id: UUID) -> ColumnElement:
+    """SQL expression for the user's IANA timezone (UTC if unset)."""
+    return func.coalesce(
+        select(User.timezone).where(User.id == user_id).scalar_subquery(),
+        DEFAULT_TIMEZONE
+    )
+
+
+def local_day(tz: ColumnElement, timestamp: ColumnElement) -> ColumnElement:
+    """SQL expression for the calendar day of `timestamp` in `tz`."""
+    return cast(func.timezone(tz, timestamp), Date)
+
+
+def local_today(user_id: UUID) -> ColumnElement:
+    """SQL expression for the current calendar day in the user's timezone."""
+    return local_day(user_timezone(user_id), func.now())
+
+
+def _timestamp(value: Optional[datetime]) -> ColumnElement:
+    """Bind a stored (naive UTC or aware) timestamp; None means now()."""
+    if value is None:
+        return func.now()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return literal(value, TIMESTAMP(timezone=True))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Write Path
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def _add_to_day(
+    db: AsyncSession,
+    user_id: UUID,
+    created_at: Optional[datetime],
+    deltas: dict,
+    mood: Optional[str] = None,
+    last_intervention_at: Optional[ColumnElement] = None
+) -> None:
+    """Upsert the day's row, adding `deltas` to its counters."""
+    table = UserDailyStats.__table__
+    mood_delta = deltas.get("entry_count", 0)
+
+    stmt = insert(UserDailyStats).values(
+        user_id=user_id,
+        day=local_day(user_timezone(user_id), _timestamp(created_at)),
+        mood_counts={mood: mood_delta} if mood else {},
+        last_intervention_at=last_intervention_at,
+        **{column: deltas.get(column, 0) for column in _COUNTER_COLUMNS}
+    )
+
+    set_ = {column: table.c[column] + stmt.excluded[column] for column in deltas}
+    if mood:
+        # Add to the mood's count; drop the key once it reaches zero
+        mood_key = cast(literal(mood), String)
+        mood_count = func.coalesce(
+            cast(table.c.mood_counts.op("->>")(mood_key), Integer), 0
+        ) + mood_delta
+        set_["mood_counts"] = case(
+            (mood_count == 0, table.c.mood_counts.op("-")(mood_key)),
+            else_=table.c.mood_counts.op("||")(func.jsonb_build_object(mood_key, mood_count))
+        )
+    if last_intervention_at is not None:
+        set_["last_intervention_at"] = func.greatest(
+            table.c.last_intervention_at, stmt.excluded.last_intervention_at
+        )
+
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_=set_
+    ))
+
+
+async def record_entry(db: AsyncSession, entry: JournalEntry, sign: int = 1) -> None:
+    """
+    Add (sign=1) or retract (sign=-1) a journal entry's contribution.
+
+    Call with sign=1 when creating the entry, before the first flush
+    (created_at then resolves to now(), matching the column default), and
+    with sign=-1 before deleting it or changing its analysis.
+    """
+    stress = entry.stress_score
+    deltas = {"entry_count": sign}
+    if stress is not None:
+        deltas["stress_sum"] = sign * stress
+        deltas["stress_count"] = sign
+        if stress > HIGH_STRESS_THRESHOLD:
+            deltas["high_stress_count"] = sign
+
+    mood = entry.mood.value if entry.mood else None
+    await _add_to_day(db, entry.user_id, entry.created_at, deltas, mood=mood)
+
+
+async def record_intervention(db: AsyncSession, log: InterventionLog) -> None:
+    """Add a newly logged intervention to today's row (before the first flush)."""
+    deltas = {"intervention_count": 1}
+    if log.completed:
+        deltas["completed_interventions"] = 1
+        deltas["calm_seconds"] = log.duration_seconds
+
+    await _add_to_day(
+        db,
+        log.user_id,
+        log.created_at,
+        deltas,
+        last_intervention_at=_timestamp(log.created_at)
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Backfill
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def rebuild_daily_stats(db: AsyncSession, user_id: Optional[str] = None) -> None:
+    """
+    Recompute rollup rows from raw journal entries and interventions.
+
+    Used for the initial backfill and after a user changes timezone.
+    Does not commit.
+
+    Args:
+        db: Database session
+        user_id: Rebuild only this user; all users when None
+    """
+    table = UserDailyStats.__table__
+    tz = func.coalesce(User.timezone, DEFAULT_TIMEZONE)
+    user_filter = [User.id == UUID(user_id)] if user_id else []
+
+    clear = delete(UserDailyStats)
+    if user_id:
+        clear = clear.where(UserDailyStats.user_id == UUID(user_id))
+    await db.execute(clear)
+
+    # Journal entries, with the mood histogram aggregated per day
+    entry_day = local_day(tz, JournalEntry.created_at).label("day")
+    entries_by_day = select(
+        JournalEntry.user_id,
+        entry_day,
+        func.count().label("entry_count"),
+        func.coalesce(func.sum(JournalEntry.stress_score), 0).label("stress_sum"),
+        func.count(JournalEntry.stress_score).label("stress_count"),
+        func.count().filter(
+            JournalEntry.stress_score > HIGH_STRESS_THRESHOLD
+        ).label("high_stress_count"),
+    ).join(User, User.id == JournalEntry.user_id).where(
+        *user_filter
+    ).group_by(JournalEntry.user_id, entry_day).subquery("entries_by_day")
+
+    per_mood = select(
+        JournalEntry.user_id,
+        entry_day,
+        JournalEntry.mood,
+        func.count().label("mood_count"),
+    ).join(User, User.id == JournalEntry.user_id).where(
+        JournalEntry.mood.isnot(None), *user_filter
+    ).group_by(JournalEntry.user_id, entry_day, JournalEntry.mood).subquery("per_mood")
+
+    moods_by_day = select(
+        per_mood.c.user_id,
+        per_mood.c.day,
+        func.jsonb_object_agg(per_mood.c.mood, per_mood.c.mood_count).label("mood_counts"),
+    ).group_by(per_mood.c.user_id, per_mood.c.day).subquery("moods_by_day")
+
+    entries = select(
+        entries_by_day.c.user_id,
+        entries_by_day.c.day,
+        entries_by_day.c.entry_count,
+        entries_by_day.c.stress_sum,
+        entries_by_day.c.stress_count,
+        entries_by_day.c.high_stress_count,
+        func.coalesce(moods_by_day.c.mood_counts, cast(literal("{}"), JSONB)),
+    ).select_from(entries_by_day.outerjoin(
+        moods_by_day,
+        and_(
+            moods_by_day.c.user_id == entries_by_day.c.user_id,
+            moods_by_day.c.day == entries_by_day.c.day
+        )
+    ))
+
+    await db.execute(insert(UserDailyStats).from_select(
+        ["user_id", "day", "entry_count", "stress_sum", "stress_count",
+         "high_stress_count", "mood_counts"],
+        entries
+    ))
+
+    # Interventions, merged into the same day rows
+    log_day = local_day(tz, InterventionLog.created_at).label("day")
+    interventions = select(
+        InterventionLog.user_id,
+        log_day,
+        func.count(),
+        func.count().filter(InterventionLog.completed),
+        func.coalesce(func.sum(InterventionLog.duration_seconds).filter(InterventionLog.completed), 0),
+        func.max(InterventionLog.created_at),
+    ).join(User, User.id == InterventionLog.user_id).where(
+        *user_filter
+    ).group_by(InterventionLog.user_id, log_day)
+
+    stmt = insert(UserDailyStats).from_select(
+        ["user_id", "day", "intervention_count", "completed_interventions",
+         "calm_seconds", "last_intervention_at"],
+        interventions
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("intervention_count", "completed_interventions",
+                           "calm_seconds", "last_intervention_at")
+        }
+    ))
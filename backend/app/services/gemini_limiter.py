@@ -0,0 +1,112 @@
+"""
+Gemini Limiter - bounds concurrent Gemini calls.
+
+Every call holds a slot in its call type's gate (analysis, nudge, insights,
+voice) and one in a global gate shared by all types. One type can therefore
+never use all of the global capacity, and the total stays bounded no matter
+how many requests and workers are waiting. Each gate reports its queue
+depth and wait times.
+"""
+import asyncio
+import enum
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from app.config import settings
+
+# Wait-time samples kept per gate for percentiles
+_WAIT_SAMPLES = 1000
+
+
+class CallType(str, enum.Enum):
+    """Kinds of Gemini calls, each with its own concurrency limit."""
+    analysis = "analysis"
+    nudge = "nudge"
+    insights = "insights"
+    voice = "voice"
+
+
+class ConcurrencyGate:
+    """Semaphore with queue-depth and wait-time metrics."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.max_wait_ms = 0.0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold one slot for the duration of the block; yields the wait in ms."""
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.acquired += 1
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._waits.append(wait_ms)
+        self.in_flight += 1
+        try:
+            yield wait_ms
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(p: float):
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))], 2)
+
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "wait_ms_p50": percentile(0.5),
+            "wait_ms_p99": percentile(0.99),
+            "wait_ms_max": round(self.max_wait_ms, 2),
+        }
+
+
+class GeminiLimiter:
+    """Per-call-type gates plus one global gate."""
+
+    def __init__(self, global_limit: int, limits: Dict[CallType, int]):
+        self.global_gate = ConcurrencyGate("global", global_limit)
+        self.gates = {call_type: ConcurrencyGate(call_type.value, limit) for call_type, limit in limits.items()}
+
+    @asynccontextmanager
+    async def acquire(self, call_type: CallType) -> AsyncIterator[None]:
+        """Wait for a slot of `call_type` and a global slot."""
+        async with self.gates[call_type].slot():
+            async with self.global_gate.slot():
+                yield
+
+    def stats(self) -> dict:
+        return {
+            "global": self.global_gate.stats(),
+            **{call_type.value: gate.stats() for call_type, gate in self.gates.items()},
+        }
+
+
+gemini_limiter = GeminiLimiter(
+    settings.GEMINI_MAX_CONCURRENCY,
+    {
+        CallType.analysis: settings.GEMINI_CONCURRENCY_ANALYSIS,
+        CallType.nudge: settings.GEMINI_CONCURRENCY_NUDGE,
+        CallType.insights: settings.GEMINI_CONCURRENCY_INSIGHTS,
+        CallType.voice: settings.GEMINI_CONCURRENCY_VOICE,
+    }
+)
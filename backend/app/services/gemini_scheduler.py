@@ -0,0 +1,215 @@
+"""
+Gemini Scheduler - rate limits and prioritizes outbound Gemini calls.
+
+Our Gemini quota (requests and tokens per minute) caps throughput. Calls
+are admitted by two token buckets, one for requests per minute and one for
+tokens per minute. When the buckets run dry, callers wait in priority
+order:
+- by lane first: interactive (voice, analysis previews), then standard
+  (insights, on-demand nudge checks), then background (queued analyses,
+  nudge refreshes)
+- then premium users before free ones
+- then arrival order
+
+A call that would queue behind too many others is shed at once with
+`GeminiOverloaded`. The service functions turn that into their fallback
+result, and queued analyses retry it later. Background calls are never
+shed: they already run from a durable queue.
+
+Buckets are per process. With several processes, divide the quota
+between them.
+"""
+import asyncio
+import enum
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import SubscriptionTier, User
+
+
+class Lane(enum.IntEnum):
+    """Priority lanes; lower values are served first."""
+    interactive = 0
+    standard = 1
+    background = 2
+
+
+class GeminiOverloaded(Exception):
+    """Raised when a call is shed because too many calls are queued ahead of it."""
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of quota."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def clamp(self, amount: float) -> float:
+        """Largest cost a single call may be charged (one full bucket)."""
+        return min(amount, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill()
+        missing = amount - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Consume tokens; may go negative when correcting an estimate."""
+        self._refill()
+        self.tokens -= amount
+
+
+@dataclass(order=True)
+class _Waiter:
+    key: tuple
+    tokens: float = field(compare=False)
+    wake: asyncio.Event = field(compare=False, default_factory=asyncio.Event)
+
+
+def estimate_tokens(contents: Any) -> int:
+    """
+    Rough token count of a request: ~4 characters per text token, ~64
+    bytes per audio token (compressed speech), plus the expected response.
+    """
+    parts = contents if isinstance(contents, list) else [contents]
+    total = 0
+    for part in parts:
+        if isinstance(part, str):
+            total += len(part) // 4
+        elif isinstance(part, dict) and isinstance(part.get("data"), (bytes, bytearray)):
+            total += len(part["data"]) // 64
+    return total + settings.GEMINI_OUTPUT_TOKEN_ESTIMATE
+
+
+class GeminiScheduler:
+    """Admits Gemini calls within the request and token quotas, by priority."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        shed_depth: Dict[str, int],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.shed_depth = shed_depth
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+
+    def _ahead_of(self, key: tuple) -> int:
+        return sum(1 for waiter in self._queue if waiter.key < key)
+
+    def _wake_head(self) -> None:
+        if self._queue:
+            self._queue[0].wake.set()
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+
+    async def admit(self, contents: Any, lane: Lane, tier: str = SubscriptionTier.free.value) -> int:
+        """
+        Wait until the call may go out, charging its estimated tokens.
+
+        Returns:
+            The tokens charged (pass to `settle` with the actual usage)
+
+        Raises:
+            GeminiOverloaded: Too many calls are queued ahead of this one
+        """
+        premium = tier == SubscriptionTier.premium.value
+        key = (int(lane), 0 if premium else 1, next(self._sequence))
+
+        if lane != Lane.background:
+            limit = self.shed_depth[SubscriptionTier.premium.value if premium else SubscriptionTier.free.value]
+            if self._ahead_of(key) >= limit:
+                label = f"{lane.name}:{tier}"
+                self.shed[label] = self.shed.get(label, 0) + 1
+                raise GeminiOverloaded(f"Gemini queue full ({limit} calls ahead)")
+
+        cost = self.tokens.clamp(estimate_tokens(contents))
+        waiter = _Waiter(key, cost)
+        heapq.heappush(self._queue, waiter)
+        # A new head must re-check the buckets; a displaced head steps back
+        self._wake_head()
+        try:
+            while True:
+                if self._queue[0] is waiter:
+                    delay = max(self.requests.wait_time(1), self.tokens.wait_time(cost))
+                    if delay == 0:
+                        heapq.heappop(self._queue)
+                        self.requests.take(1)
+                        self.tokens.take(cost)
+                        self.admitted += 1
+                        self._wake_head()
+                        return cost
+                else:
+                    delay = None
+                waiter.wake.clear()
+                try:
+                    await asyncio.wait_for(waiter.wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelled (e.g. request timeout): give up the place in line
+            was_head = self._queue and self._queue[0] is waiter
+            self._remove(waiter)
+            if was_head:
+                self._wake_head()
+            raise
+
+    def settle(self, charged: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if actual is not None:
+            self.tokens.take(actual - charged)
+
+    def stats(self) -> dict:
+        depth = {lane.name: 0 for lane in Lane}
+        for waiter in self._queue:
+            depth[Lane(waiter.key[0]).name] += 1
+        return {
+            "queued": depth,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens),
+        }
+
+
+async def user_tier(db: AsyncSession, user_id: str) -> str:
+    """The user's subscription tier ("free" if unknown)."""
+    result = await db.execute(select(User.subscription).where(User.id == UUID(str(user_id))))
+    tier = result.scalar()
+    return tier.value if tier else SubscriptionTier.free.value
+
+
+gemini_scheduler = GeminiScheduler(
+    settings.GEMINI_REQUESTS_PER_MINUTE,
+    settings.GEMINI_TOKENS_PER_MINUTE,
+    {
+        SubscriptionTier.free.value: settings.GEMINI_SHED_QUEUE_DEPTH_FREE,
+        SubscriptionTier.premium.value: settings.GEMINI_SHED_QUEUE_DEPTH_PREMIUM,
+    }
+)
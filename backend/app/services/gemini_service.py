@@ -2,11 +2,22 @@
 Gemini AI Service - handles all interactions with Google's Gemini API.
 """
 import google.generativeai as genai
-import json
+from google.api_core import exceptions as google_exceptions
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from app.config import settings
+from app.models.user import SubscriptionTier
+from app.services.analysis_cache import analysis_cache_stats, get_cached_analysis, store_analysis
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.gemini_limiter import CallType, gemini_limiter
+from app.services.gemini_scheduler import Lane, gemini_scheduler
+from app.services.local_analyzer import LocalAnalysis, analyze_locally
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,6 +28,42 @@ genai.configure(api_key=settings.GEMINI_API_KEY)
 # Initialize model
 model = genai.GenerativeModel("gemini-2.5-flash")
 
+# Deadline for one Gemini attempt, per call type
+CALL_TIMEOUTS = {
+    CallType.analysis: settings.GEMINI_TIMEOUT_ANALYSIS_SECONDS,
+    CallType.nudge: settings.GEMINI_TIMEOUT_NUDGE_SECONDS,
+    CallType.insights: settings.GEMINI_TIMEOUT_INSIGHTS_SECONDS,
+    CallType.voice: settings.GEMINI_TIMEOUT_VOICE_SECONDS,
+}
+
+# Timeouts, throttling and server-side failures; worth another attempt
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+)
+
+# Opens after repeated retryable failures; calls then fall back at once
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+    settings.GEMINI_BREAKER_RESET_SECONDS
+)
+_call_counters = {"attempts": 0, "retries": 0, "timeouts": 0}
+# Text analyses answered by the local analyzer vs. escalated to Gemini
+_prescreen_counters = {"screened": 0, "answered_locally": 0, "escalated": 0}
+# Gemini analysis calls (one entry or a batch) and the entries and tokens they covered
+_analysis_usage = {
+    "single": {"calls": 0, "entries": 0, "tokens": 0},
+    "batch": {"calls": 0, "entries": 0, "tokens": 0},
+}
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Prompts
@@ -42,6 +89,26 @@ Analyze this journal entry and provide insights:
 **IMPORTANT:** Respond ONLY with valid JSON in this EXACT format (no markdown, no extra text):
 {{"stress_score": <number 0-100>, "emotional_tone": "<1-2 words>", "key_themes": ["<theme1>", "<theme2>"], "suggested_intervention": "<breathing|grounding|reflection|null>", "supportive_message": "<warm supportive message>", "detected_mood": "<one of the mood options>"}}"""
 
+BATCH_ANALYSIS_PROMPT = """You are Sakina, a warm and supportive wellness companion for young professionals.
+Your role is to analyze journal entries with empathy and provide emotional support.
+
+Analyze each of these journal entries by the same person on its own and provide insights:
+
+**Journal Entries (JSON):** {entries}
+
+Each entry has an "id", its "content" and the user's self-reported "mood" (null if not provided - please detect from the journal content).
+
+**Instructions:** For each entry:
+1. Assess the stress level (0-100, where 0 is completely calm and 100 is extremely stressed)
+2. Identify the emotional tone in 1-2 words
+3. Extract 2-3 key themes or concerns
+4. Suggest an appropriate intervention if stress is elevated
+5. Write a warm, supportive message (1-2 sentences, NO clinical language)
+6. Determine the user's mood based on the entry content (choose from: Stressed, Anxious, Tired, Okay, Calm, Energized, Grateful, Focused, Happy, Exhausted, Frustrated)
+
+**IMPORTANT:** Respond ONLY with a valid JSON array holding one object per entry, in this EXACT format (no markdown, no extra text):
+[{{"id": "<entry id>", "stress_score": <number 0-100>, "emotional_tone": "<1-2 words>", "key_themes": ["<theme1>", "<theme2>"], "suggested_intervention": "<breathing|grounding|reflection|null>", "supportive_message": "<warm supportive message>", "detected_mood": "<one of the mood options>"}}]"""
+
 NUDGE_PROMPT = """You are Sakina, a proactive wellness companion. Based on the user's recent journal patterns, 
 decide if they need a gentle intervention nudge.
 
@@ -74,64 +141,374 @@ INSIGHTS_PROMPT = """You are Sakina, analyzing a user's wellness patterns over t
 {{"trend": "<improving|stable|declining>", "frequent_themes": ["<theme1>", "<theme2>"], "recommendation": "<one actionable recommendation>", "weekly_summary": "<2-3 sentences summarizing their {period_name} warmly>"}}
 """
 
+# Appended to prompts whose response is streamed, so the text shown to the
+# user is generated first
+STREAM_FIELD_FIRST = """
+
+Write the "{field}" field FIRST in the JSON object, before all other fields."""
+
+
+# Part of every analysis cache key: editing the prompt or switching models
+# retires previously cached analyses
+ANALYSIS_PROMPT_VERSION = hashlib.sha256(
+    f"{model.model_name}\n{ANALYSIS_PROMPT}\n{BATCH_ANALYSIS_PROMPT}".encode("utf-8")
+).hexdigest()[:12]
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Service Functions
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def analyze_journal_entry(content: str, mood: Optional[str] = None) -> dict:
+async def _attempt(call_type: CallType, contents: Any, lane: Lane, tier: str):
+    """
+    One Gemini request through the SDK's async API.
+
+    Waits for rate-limit quota in its priority lane (see
+    `app.services.gemini_scheduler`), then for a concurrency slot for
+    `call_type` (see `app.services.gemini_limiter`). The request itself
+    has the call type's deadline; retries are left to `_generate`.
+    """
+    timeout = CALL_TIMEOUTS[call_type]
+    charged = await gemini_scheduler.admit(contents, lane, tier)
+    async with gemini_limiter.acquire(call_type):
+        _call_counters["attempts"] += 1
+        response = await asyncio.wait_for(
+            model.generate_content_async(
+                contents,
+                request_options={"retry": None, "timeout": timeout}
+            ),
+            timeout=timeout
+        )
+    usage = getattr(response, "usage_metadata", None)
+    gemini_scheduler.settle(charged, getattr(usage, "total_token_count", None))
+    return response
+
+
+def _retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt + 1`."""
+    cap = min(settings.GEMINI_RETRY_MAX_SECONDS, settings.GEMINI_RETRY_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+async def _generate(
+    call_type: CallType,
+    contents: Any,
+    lane: Lane,
+    tier: str = SubscriptionTier.free.value
+):
+    """
+    Call Gemini with a deadline per attempt, up to GEMINI_MAX_RETRIES
+    jittered retries of transient errors, and a circuit breaker.
+
+    Raises:
+        CircuitOpen: Gemini is failing; callers return their fallback at once
+        GeminiOverloaded: The call was shed; callers return their fallback
+    """
+    for attempt in range(settings.GEMINI_MAX_RETRIES + 1):
+        probe = gemini_breaker.before_call()
+        try:
+            response = await _attempt(call_type, contents, lane, tier)
+        except RETRYABLE_ERRORS as e:
+            gemini_breaker.record_failure(probe)
+            if isinstance(e, asyncio.TimeoutError):
+                _call_counters["timeouts"] += 1
+            if attempt == settings.GEMINI_MAX_RETRIES:
+                raise
+            _call_counters["retries"] += 1
+            logger.warning(f"Gemini {call_type.value} attempt {attempt + 1} failed, retrying: {e!r}")
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        except BaseException:
+            # Shed, cancelled or rejected (e.g. a bad request): not an outage
+            gemini_breaker.release(probe)
+            raise
+        gemini_breaker.record_success(probe)
+        return response
+
+
+def _record_usage(kind: str, entries: int, response: Any) -> None:
+    usage = _analysis_usage[kind]
+    metadata = getattr(response, "usage_metadata", None)
+    usage["calls"] += 1
+    usage["entries"] += entries
+    usage["tokens"] += getattr(metadata, "total_token_count", None) or 0
+
+
+async def _stream(call_type: CallType, contents: Any, lane: Lane, tier: str) -> AsyncIterator[str]:
+    """
+    Stream the text of one Gemini response as it is generated.
+
+    Scheduling, concurrency and the circuit breaker work as for `_generate`.
+    The concurrency slot is held until the stream ends, and the call type's
+    deadline covers the whole stream. There are no retries: part of the
+    text may already have been shown.
+
+    Raises:
+        CircuitOpen: Gemini is failing
+        GeminiOverloaded: The call was shed
+    """
+    probe = gemini_breaker.before_call()
+    timeout = CALL_TIMEOUTS[call_type]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        charged = await gemini_scheduler.admit(contents, lane, tier)
+        async with gemini_limiter.acquire(call_type):
+            _call_counters["attempts"] += 1
+            response = await asyncio.wait_for(
+                model.generate_content_async(
+                    contents,
+                    stream=True,
+                    request_options={"retry": None, "timeout": timeout}
+                ),
+                timeout=timeout
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    yield chunk.text
+        usage = getattr(response, "usage_metadata", None)
+        gemini_scheduler.settle(charged, getattr(usage, "total_token_count", None))
+    except RETRYABLE_ERRORS as e:
+        gemini_breaker.record_failure(probe)
+        if isinstance(e, asyncio.TimeoutError):
+            _call_counters["timeouts"] += 1
+        raise
+    except BaseException:
+        # Shed, rejected, or the client went away mid-stream
+        gemini_breaker.release(probe)
+        raise
+    gemini_breaker.record_success(probe)
+
+
+def call_stats() -> dict:
+    """
+    Breaker state, attempt, retry and timeout counters, pre-screen and
+    cache counters, and entries and tokens per analysis call.
+    """
+    screened = _prescreen_counters["screened"]
+    prescreen = {
+        **_prescreen_counters,
+        "avoided_ratio": round(_prescreen_counters["answered_locally"] / screened, 3) if screened else None,
+    }
+    analysis_usage = {
+        kind: {
+            **usage,
+            "entries_per_call": round(usage["entries"] / usage["calls"], 2) if usage["calls"] else None,
+            "tokens_per_entry": round(usage["tokens"] / usage["entries"]) if usage["entries"] else None,
+        }
+        for kind, usage in _analysis_usage.items()
+    }
+    return {
+        "breaker": gemini_breaker.stats(),
+        **_call_counters,
+        "prescreen": prescreen,
+        "analysis_cache": analysis_cache_stats(),
+        "analysis_usage": analysis_usage,
+    }
+
+
+async def prescreen_analysis(content: str, mood: Optional[str]) -> Tuple[LocalAnalysis, Optional[dict]]:
+    """
+    Run the steps that avoid a Gemini call: the local analyzer, then the
+    analysis cache.
+
+    Returns:
+        The local analysis, and the final result if Gemini is not needed
+    """
+    local = analyze_locally(content, mood)
+    if settings.LOCAL_ANALYSIS_ENABLED:
+        _prescreen_counters["screened"] += 1
+        if local.decisive:
+            _prescreen_counters["answered_locally"] += 1
+            return local, local.result
+        _prescreen_counters["escalated"] += 1
+    return local, await get_cached_analysis(content, mood, ANALYSIS_PROMPT_VERSION)
+
+
+async def _finish_analysis(content: str, mood: Optional[str], result: dict, local: LocalAnalysis) -> dict:
+    """Complete a parsed Gemini analysis and cache it."""
+    # Fill missing fields from the local analysis
+    for field, value in local.result.items():
+        result.setdefault(field, value)
+
+    # Clamp stress score to valid range
+    result["stress_score"] = max(0, min(100, result["stress_score"]))
+
+    await store_analysis(content, mood, ANALYSIS_PROMPT_VERSION, result)
+    return result
+
+
+def _analysis_prompt(content: str, mood: Optional[str]) -> str:
+    # Build mood context for prompt
+    if mood:
+        mood_context = f"**User's self-reported mood:** {mood}"
+    else:
+        mood_context = "**User's mood:** Not provided - please detect from the journal content"
+    return ANALYSIS_PROMPT.format(content=content, mood_context=mood_context)
+
+
+async def analyze_with_gemini(
+    content: str,
+    mood: Optional[str],
+    local: LocalAnalysis,
+    lane: Lane,
+    tier: str
+) -> dict:
+    """
+    Analyze one entry with `ANALYSIS_PROMPT`, skipping the pre-screen.
+    Errors propagate.
+    """
+    prompt = _analysis_prompt(content, mood)
+    response = await _generate(CallType.analysis, prompt, lane, tier)
+    _record_usage("single", 1, response)
+
+    # Parse JSON from response
+    result = _parse_json_response(response.text)
+    return await _finish_analysis(content, mood, result, local)
+
+
+async def analyze_journal_entry(
+    content: str,
+    mood: Optional[str] = None,
+    strict: bool = False,
+    lane: Lane = Lane.interactive,
+    tier: str = SubscriptionTier.free.value
+) -> dict:
     """
     Analyze a journal entry for stress signals and emotional tone.
+
+    The local analyzer screens the entry first; a confident, low-stress
+    result is returned without calling Gemini. Next, a cached Gemini
+    analysis of the same text and mood is reused (see
+    `app.services.analysis_cache`). The local result is also the fallback
+    when Gemini fails.
     
     Args:
         content: Journal entry text
         mood: User's self-reported mood (optional - AI will detect if not provided)
+        strict: Raise on errors instead of returning the fallback analysis
+            (queued jobs use this to retry later)
+        lane: Scheduling priority (background for queued analyses)
+        tier: User's subscription tier
         
     Returns:
         Analysis results with stress_score, emotional_tone, key_themes, detected_mood, etc.
     """
+    local, ready = await prescreen_analysis(content, mood)
+    if ready is not None:
+        return ready
+
     try:
-        # Build mood context for prompt
-        if mood:
-            mood_context = f"**User's self-reported mood:** {mood}"
-        else:
-            mood_context = "**User's mood:** Not provided - please detect from the journal content"
-        
-        prompt = ANALYSIS_PROMPT.format(content=content, mood_context=mood_context)
-        response = await asyncio.to_thread(model.generate_content, prompt)
-        
-        # Parse JSON from response
-        result = _parse_json_response(response.text)
-        
-        # Validate required fields
-        result.setdefault("stress_score", 50)
-        result.setdefault("emotional_tone", mood or "neutral")
-        result.setdefault("key_themes", [])
-        result.setdefault("suggested_intervention", None)
-        result.setdefault("supportive_message", "Thank you for sharing. I'm here with you.")
-        result.setdefault("detected_mood", mood or "Okay")  # Default to Okay if not detected
-        
-        # Clamp stress score to valid range
-        result["stress_score"] = max(0, min(100, result["stress_score"]))
-        
-        return result
-        
+        return await analyze_with_gemini(content, mood, local, lane, tier)
     except Exception as e:
         logger.error(f"Gemini analysis error: {e}")
-        # Return fallback response on error
-        return {
-            "stress_score": 50,
-            "emotional_tone": mood or "neutral",
-            "key_themes": [],
-            "suggested_intervention": None,
-            "supportive_message": "Thank you for sharing. I'm here with you.",
-            "detected_mood": mood or "Okay"
-        }
+        if strict:
+            raise
+        # Fall back to the local analysis on error
+        return local.result
+
+
+async def stream_journal_analysis(
+    content: str,
+    mood: Optional[str] = None,
+    tier: str = SubscriptionTier.free.value
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of `analyze_journal_entry` (interactive lane).
+
+    Yields:
+        ("delta", text) for each new piece of the supportive message, as
+        Gemini writes it, then ("result", analysis) once the whole response
+        is parsed. The result is final: if Gemini fails mid-stream, it is the
+        local fallback, whose message replaces the deltas already sent.
+    """
+    local, ready = await prescreen_analysis(content, mood)
+    if ready is not None:
+        yield "delta", ready["supportive_message"]
+        yield "result", ready
+        return
+
+    message = _FieldStreamer("supportive_message")
+    try:
+        prompt = _analysis_prompt(content, mood) + STREAM_FIELD_FIRST.format(field="supportive_message")
+        async for chunk in _stream(CallType.analysis, prompt, Lane.interactive, tier):
+            delta = message.feed(chunk)
+            if delta:
+                yield "delta", delta
+        result = await _finish_analysis(content, mood, _parse_json_response(message.text), local)
+    except Exception as e:
+        logger.error(f"Gemini streaming analysis error: {e}")
+        result = local.result
+    yield "result", result
+
+
+@dataclass
+class BatchItem:
+    """One entry of a batched analysis, keyed by `key` in the prompt."""
+    key: str
+    content: str
+    mood: Optional[str]
+    local: LocalAnalysis
+
+
+async def analyze_journal_entries(
+    items: List[BatchItem],
+    lane: Lane = Lane.background,
+    tier: str = SubscriptionTier.free.value
+) -> Dict[str, dict]:
+    """
+    Analyze several entries with one Gemini call (`BATCH_ANALYSIS_PROMPT`).
+
+    Call `prescreen_analysis` on each entry first. Results are completed
+    and cached like those of `analyze_journal_entry`. Journals are private:
+    never mix entries of different users in one call.
+
+    Args:
+        items: One user's entries to analyze, with unique keys
+        lane: Scheduling priority
+        tier: Subscription tier to schedule the call under
+
+    Returns:
+        Results by item key. Items missing from the response, or answered
+        with an invalid object, are left out.
+
+    Raises:
+        ValueError: The response is not a JSON array
+        Exception: Gemini errors, as raised by `_generate`
+    """
+    entries = [{"id": item.key, "content": item.content, "mood": item.mood} for item in items]
+    prompt = BATCH_ANALYSIS_PROMPT.format(entries=json.dumps(entries, ensure_ascii=False))
+    response = await _generate(CallType.analysis, prompt, lane, tier)
+
+    by_key = {item.key: item for item in items}
+    results: Dict[str, dict] = {}
+    try:
+        parsed = _parse_json_response(response.text)
+        if not isinstance(parsed, list):
+            raise ValueError(f"Expected a JSON array of analyses, got {type(parsed).__name__}")
+        for result in parsed:
+            if not isinstance(result, dict):
+                continue
+            item = by_key.get(str(result.pop("id", "")))
+            score = result.get("stress_score")
+            if item is None or item.key in results or isinstance(score, bool) or not isinstance(score, (int, float)):
+                continue
+            results[item.key] = await _finish_analysis(item.content, item.mood, result, item.local)
+    finally:
+        _record_usage("batch", len(results), response)
+    return results
 
 
 async def generate_nudge_decision(
     entries_summary: str,
-    last_nudge_time: Optional[str] = None
+    last_nudge_time: Optional[str] = None,
+    lane: Lane = Lane.background,
+    tier: str = SubscriptionTier.free.value
 ) -> dict:
     """
     Decide whether to show a proactive nudge based on journal patterns.
@@ -139,6 +516,8 @@ async def generate_nudge_decision(
     Args:
         entries_summary: Summary of recent journal entries
         last_nudge_time: When the last nudge was shown
+        lane: Scheduling priority (standard when a user is waiting)
+        tier: User's subscription tier
         
     Returns:
         Nudge decision with should_nudge, message, nudge_type, etc.
@@ -146,7 +525,7 @@ async def generate_nudge_decision(
     try:
         last_nudge = last_nudge_time or "Never"
         prompt = NUDGE_PROMPT.format(summary=entries_summary, last_nudge=last_nudge)
-        response = await asyncio.to_thread(model.generate_content, prompt)
+        response = await _generate(CallType.nudge, prompt, lane, tier)
         
         result = _parse_json_response(response.text)
         
@@ -174,7 +553,8 @@ async def generate_weekly_insights(
     entries_summary: str,
     entry_count: int,
     avg_stress: float,
-    days: int = 7
+    days: int = 7,
+    tier: str = SubscriptionTier.free.value
 ) -> dict:
     """
     Generate wellness insights from journal entries for a given period.
@@ -184,39 +564,153 @@ async def generate_weekly_insights(
         entry_count: Number of entries in the period
         avg_stress: Average stress score
         days: Number of days in the period
+        tier: User's subscription tier
         
     Returns:
         Pattern analysis with trend, themes, recommendation, summary
     """
     try:
-        period_name = "month" if days > 7 else "week"
-        prompt = INSIGHTS_PROMPT.format(
-            period_name=period_name,
-            entries_summary=entries_summary,
-            entry_count=entry_count,
-            avg_stress=round(avg_stress, 1)
-        )
-        response = await asyncio.to_thread(model.generate_content, prompt)
+        prompt = _insights_prompt(entries_summary, entry_count, avg_stress, days)
+        response = await _generate(CallType.insights, prompt, Lane.standard, tier)
         
         result = _parse_json_response(response.text)
         
         # Validate required fields
-        result.setdefault("trend", "stable")
-        result.setdefault("frequent_themes", [])
-        result.setdefault("recommendation", "Keep journaling regularly to track your wellness.")
-        result.setdefault("weekly_summary", f"Thank you for staying connected with your emotions this {period_name}.")
+        for field, value in _insights_fallback(days).items():
+            result.setdefault(field, value)
         
         return result
         
     except Exception as e:
         logger.error(f"Gemini insights error: {e}")
-        period_name = "month" if days > 7 else "week"
-        return {
-            "trend": "stable",
-            "frequent_themes": [],
-            "recommendation": "Keep journaling regularly to track your wellness.",
-            "weekly_summary": f"Thank you for staying connected with your emotions this {period_name}."
-        }
+        return _insights_fallback(days)
+
+
+async def stream_weekly_insights(
+    entries_summary: str,
+    entry_count: int,
+    avg_stress: float,
+    days: int = 7,
+    tier: str = SubscriptionTier.free.value
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of `generate_weekly_insights`.
+
+    Yields:
+        ("delta", text) for each new piece of the summary, then
+        ("result", insights). As with `stream_journal_analysis`, the result
+        is final and may be the fallback after deltas were sent.
+    """
+    summary = _FieldStreamer("weekly_summary")
+    try:
+        prompt = (
+            _insights_prompt(entries_summary, entry_count, avg_stress, days)
+            + STREAM_FIELD_FIRST.format(field="weekly_summary")
+        )
+        async for chunk in _stream(CallType.insights, prompt, Lane.standard, tier):
+            delta = summary.feed(chunk)
+            if delta:
+                yield "delta", delta
+        result = _parse_json_response(summary.text)
+        for field, value in _insights_fallback(days).items():
+            result.setdefault(field, value)
+    except Exception as e:
+        logger.error(f"Gemini streaming insights error: {e}")
+        result = _insights_fallback(days)
+    yield "result", result
+
+
+def _insights_prompt(entries_summary: str, entry_count: int, avg_stress: float, days: int) -> str:
+    return INSIGHTS_PROMPT.format(
+        period_name="month" if days > 7 else "week",
+        entries_summary=entries_summary,
+        entry_count=entry_count,
+        avg_stress=round(avg_stress, 1)
+    )
+
+
+def _insights_fallback(days: int) -> dict:
+    period_name = "month" if days > 7 else "week"
+    return {
+        "trend": "stable",
+        "frequent_themes": [],
+        "recommendation": "Keep journaling regularly to track your wellness.",
+        "weekly_summary": f"Thank you for staying connected with your emotions this {period_name}."
+    }
+
+
+class _FieldStreamer:
+    """
+    Extracts one string field of a JSON object while the object is still
+    being generated, so its text can be shown before the JSON is complete.
+    """
+
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of the response; returns the field text it completed."""
+        self._buffer += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buf, i = self._buffer, self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch == "\\":
+                # Wait for the rest of an escape split across chunks
+                if i + 1 >= len(buf):
+                    break
+                escape = buf[i + 1]
+                if escape == "u":
+                    try:
+                        code = int(buf[i + 2:i + 6], 16) if i + 6 <= len(buf) else None
+                    except ValueError:
+                        code = 0xFFFD
+                    if code is None:
+                        break
+                    width = 6
+                    if 0xD800 <= code < 0xDC00:
+                        # Emoji and other astral characters arrive as a surrogate pair
+                        if i + 12 > len(buf):
+                            break
+                        try:
+                            low = int(buf[i + 8:i + 12], 16)
+                        except ValueError:
+                            low = 0
+                        if buf[i + 6:i + 8] == "\\u" and 0xDC00 <= low < 0xE000:
+                            code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                            width = 12
+                    out.append(chr(code))
+                    i += width
+                    continue
+                out.append(self._ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            out.append(ch)
+            i += 1
+        self._pos = i
+        return "".join(out)
 
 
 def _parse_json_response(text: str) -> dict:
@@ -246,13 +740,18 @@ def _parse_json_response(text: str) -> dict:
         raise ValueError(f"Failed to parse AI response as JSON: {e}")
 
 
-async def analyze_voice_journal(audio_bytes: bytes, mime_type: str = "audio/webm") -> dict:
+async def analyze_voice_journal(
+    audio_bytes: bytes,
+    mime_type: str = "audio/webm",
+    tier: str = SubscriptionTier.free.value
+) -> dict:
     """
     Analyze a voice journal entry: transcribe and extract insights.
     
     Args:
         audio_bytes: Raw audio data
         mime_type: Mime type of the audio (e.g., audio/webm, audio/mp3)
+        tier: User's subscription tier
         
     Returns:
         Dict containing transcript and analysis results
@@ -277,15 +776,17 @@ async def analyze_voice_journal(audio_bytes: bytes, mime_type: str = "audio/webm
         """
         
         # Pass prompt and inline audio data
-        response = await asyncio.to_thread(
-            model.generate_content,
+        response = await _generate(
+            CallType.voice,
             [
                 prompt,
                 {
                     "mime_type": mime_type,
                     "data": audio_bytes
                 }
-            ]
+            ],
+            Lane.interactive,
+            tier
         )
         
         result = _parse_json_response(response.text)
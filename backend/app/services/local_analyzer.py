@@ -0,0 +1,420 @@
+"""
+Local Analyzer - lexicon and rule based analysis of journal entries.
+
+Produces the same fields as Gemini's `ANALYSIS_PROMPT` (stress_score,
+emotional_tone, key_themes, suggested_intervention, supportive_message,
+detected_mood) for English and Arabic text, without a network call.
+
+Every word found in the mood lexicon is a hit. A hit has a mood and a
+stress valence: positive leans stressed, negative leans calm. Intensifiers
+("very", "جدا") strengthen the next hit. A negation up to three words
+before a hit ("not", "مش") flips its valence. The self-reported mood, when
+given, counts as one more hit.
+
+Confidence is high only when the hits agree and there are enough of them
+for the entry's length. It is zero, so the entry always escalates, when:
+- the entry has fewer than LOCAL_ANALYSIS_MIN_WORDS words
+- any hit leans stressed, or the entry has a negation ("not", "مش")
+- any distress word the mood lexicon does not cover appears ("goodbye",
+  "forever", "die", "وداعا")
+- crisis language appears ("no reason to live", "give up", "انتحار")
+
+A short upbeat opener therefore cannot mask what follows it. The analyzer
+pre-screens Gemini calls (see `analyze_journal_entry`): a confident
+low-stress result is used as is, and everything else escalates to Gemini.
+When Gemini fails, the local result is the fallback.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Text Normalization
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Tashkeel (harakat, tanween, shadda, sukun), superscript alef, tatweel
+_ARABIC_MARKS = re.compile("[\u064b-\u0652\u0670\u0640]")
+_ARABIC_LETTERS = re.compile("[\u0621-\u064a]")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Clitics tried when a word is not in the lexicon as written
+_ARABIC_PREFIXES = ("وبال", "وال", "بال", "فال", "كال", "لل", "ال", "و", "ف", "ب", "ل")
+_ARABIC_SUFFIXES = ("هما", "كم", "هم", "ها", "نا", "ني", "ه", "ك", "ي", "ت")
+_ENGLISH_SUFFIXES = ("ing", "ed", "es", "s", "ly")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop apostrophes and Arabic diacritics, unify letter variants."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = text.replace("'", "").replace("’", "")
+    text = _ARABIC_MARKS.sub("", text)
+    return (
+        text.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا")
+        .replace("ى", "ي").replace("ة", "ه")
+    )
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(_normalize(text))
+
+
+def _language(text: str) -> str:
+    """"ar" if most letters are Arabic, else "en"."""
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return "en"
+    arabic = sum(1 for ch in letters if _ARABIC_LETTERS.match(ch))
+    return "ar" if arabic / len(letters) >= 0.5 else "en"
+
+
+def _candidates(token: str) -> Iterable[str]:
+    """The token, then forms with common prefixes and suffixes removed."""
+    yield token
+    if _ARABIC_LETTERS.match(token):
+        stems = [token]
+        for prefix in _ARABIC_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 3:
+                stems.append(token[len(prefix):])
+                break
+        for stem in stems:
+            if stem is not token:
+                yield stem
+            for suffix in _ARABIC_SUFFIXES:
+                if stem.endswith(suffix) and len(stem) - len(suffix) >= 3:
+                    yield stem[:-len(suffix)]
+    else:
+        for suffix in _ENGLISH_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                yield token[:-len(suffix)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Lexicons
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Stress valence of each mood, from the analysis prompt's mood options
+MOOD_VALENCE = {
+    "Stressed": 3.0,
+    "Anxious": 3.0,
+    "Frustrated": 2.0,
+    "Exhausted": 2.0,
+    "Tired": 1.0,
+    "Okay": -1.0,
+    "Focused": -1.0,
+    "Calm": -2.0,
+    "Happy": -2.0,
+    "Grateful": -2.0,
+    "Energized": -2.0,
+}
+
+_MOOD_WORDS = {
+    "Stressed": (
+        "stressed stress stressful pressure pressured overwhelmed overwhelming "
+        "swamped hectic tense burnout sad lonely crying cried upset "
+        "متوتر توتر ضغط ضغوط مضغوط مخنوق حزين حزن وحيد وحده بكيت زهقان طفشان"
+    ),
+    "Anxious": (
+        "anxious anxiety worried worry worrying nervous panic panicking scared "
+        "afraid fear uneasy restless dread overthinking "
+        "قلق قلقان خايف خائف خوف متخوف مرعوب توجس"
+    ),
+    "Frustrated": (
+        "frustrated frustrating annoyed annoying angry irritated furious mad "
+        "disappointed "
+        "محبط احباط زعلان غاضب غضب معصب عصبي متضايق ضايق منزعج مقهور"
+    ),
+    "Exhausted": (
+        "exhausted exhausting drained burnt worn "
+        "مرهق ارهاق منهك مستنزف"
+    ),
+    "Tired": (
+        "tired sleepy fatigue fatigued sluggish "
+        "متعب تعبان تعب نعسان كسلان خمول"
+    ),
+    "Okay": (
+        "okay ok fine alright decent "
+        "عادي تمام بخير ماشي"
+    ),
+    "Focused": (
+        "focused concentrated productive organized "
+        "مركز تركيز منتج منجز انجاز"
+    ),
+    "Calm": (
+        "calm relaxed relaxing peaceful peace rested serene chill "
+        "مرتاح راحه هادي هادئ هدوء مطمئن طمانينه سكينه سلام"
+    ),
+    "Happy": (
+        "happy happiness great good wonderful amazing awesome fantastic lovely "
+        "nice joy joyful fun glad smiled smiling laughed laughing "
+        "سعيد سعاده فرحان فرح مبسوط مستانس جميل رائع ممتاز حلو روعه"
+    ),
+    "Grateful": (
+        "grateful thankful blessed gratitude appreciate appreciated "
+        "ممتن امتنان شاكر نعمه الحمدلله الحمد حمدلله"
+    ),
+    "Energized": (
+        "energized energetic motivated excited refreshed inspired "
+        "نشيط نشاط متحمس حماس متفائل"
+    ),
+}
+
+# Words that flip the valence of a hit up to three words later
+_NEGATIONS = {
+    "not", "no", "never", "dont", "didnt", "doesnt", "isnt", "wasnt", "arent",
+    "werent", "cant", "cannot", "couldnt", "wont", "wouldnt", "hardly", "without",
+    "nothing", "لا", "لم", "لن", "ما", "ليس", "ليست", "مش", "مو", "مب", "غير", "بدون",
+}
+_NEGATION_WINDOW = 3
+
+# Words that strengthen the next hit
+_INTENSIFIERS = {
+    "very", "so", "really", "extremely", "super", "too", "totally", "incredibly",
+    "جدا", "كثير", "كتير", "مره", "للغايه", "وايد", "بزاف", "كتيير",
+}
+_INTENSITY = 1.5
+
+# Crisis language: always escalated to Gemini, never answered locally
+_ESCALATE_PHRASES = [
+    "suicide", "suicidal", "kill myself", "end my life", "self harm", "hurt myself",
+    "want to die", "hopeless", "worthless", "depressed", "depression",
+    "no reason to live", "nothing to live for", "dont want to live", "do not want to live",
+    "cant go on", "cannot go on", "can not go on", "give up", "giving up", "gave up",
+    "ending it", "end it all", "end it tonight", "better off without me",
+    "better off dead", "wish i was dead", "wish i were dead", "no way out",
+    "take my life", "goodbye forever",
+    "انتحار", "انتحر", "اقتل نفسي", "اذي نفسي", "اؤذي نفسي", "انهي حياتي",
+    "ابغى اموت", "ابي اموت", "بدي موت", "بدي اموت", "اكتئاب", "مكتئب", "يائس",
+    "ما في سبب اعيش", "تعبت من الحياه", "ما عاد فيني", "وداعا للابد",
+]
+# "goodbye everyone forever", "say goodbye to you all forever"
+_ESCALATE_PATTERNS = [
+    re.compile(r" (goodbye|bye|farewell)( \w+){0,4} forever "),
+    re.compile(r" (وداعا|مع السلامه)( \w+){0,4} للابد "),
+]
+
+# Distress words the mood lexicon does not score. Any of them sends the
+# entry to Gemini, whatever the other words say.
+_DISTRESS_WORDS = (
+    "die dying dead death kill hurt hurting pain alone hate goodbye farewell "
+    "forever anymore nobody empty numb useless burden ending quit ruined "
+    "terrible awful horrible worst miserable broken hopeless pointless lost "
+    "موت اموت ميت وداعا خلاص ضايع اكره الم وجع فاشل عبء مكسور تعيس سيء "
+    "للابد"
+)
+
+_THEMES: Dict[str, Tuple[str, str, str]] = {
+    # theme: (English label, Arabic label, keywords)
+    "work": (
+        "work", "العمل",
+        "work working job boss manager meeting deadline office project colleague "
+        "coworker client shift عمل شغل دوام وظيفه مدير اجتماع مشروع زملاء زميل"
+    ),
+    "sleep": (
+        "sleep", "النوم",
+        "sleep slept insomnia nap bed woke نوم نمت ارق سهر صحيت"
+    ),
+    "family": (
+        "family", "العائلة",
+        "family mom dad mother father parents kids children son daughter brother "
+        "sister عائله اهل امي ابوي ابي ماما بابا اولاد عيال اخوي اختي"
+    ),
+    "relationships": (
+        "relationships", "العلاقات",
+        "friend friends partner boyfriend girlfriend husband wife date "
+        "صديق صديقه اصدقاء اصحاب زوج زوجه خطيب"
+    ),
+    "health": (
+        "health", "الصحة",
+        "health sick ill gym exercise workout run ran walk doctor headache "
+        "صحه مريض مرض رياضه تمرين نادي مشي دكتور صداع"
+    ),
+    "studies": (
+        "studies", "الدراسة",
+        "exam study studying class university school homework assignment "
+        "امتحان اختبار دراسه جامعه مدرسه واجب محاضره"
+    ),
+    "finances": (
+        "finances", "المال",
+        "money rent bills salary debt budget فلوس مال راتب فواتير ديون ايجار"
+    ),
+    "faith": (
+        "faith", "الإيمان",
+        "pray prayer prayed mosque quran faith صلاه صليت قران مسجد دعاء ذكر"
+    ),
+}
+
+_TONES = {
+    "Stressed": ("stressed", "متوتر"),
+    "Anxious": ("anxious", "قلق"),
+    "Frustrated": ("frustrated", "محبط"),
+    "Exhausted": ("exhausted", "منهك"),
+    "Tired": ("tired", "متعب"),
+    "Okay": ("neutral", "هادئ نسبيا"),
+    "Focused": ("focused", "مركز"),
+    "Calm": ("calm", "هادئ"),
+    "Happy": ("joyful", "سعيد"),
+    "Grateful": ("grateful", "ممتن"),
+    "Energized": ("energized", "متحمس"),
+}
+
+_MESSAGES = {
+    "en": {
+        "low": "It's lovely to hear this. Hold on to what made today feel good.",
+        "medium": "Thank you for sharing. I'm here with you.",
+        "high": "That sounds like a lot to carry. Take a slow breath; you don't have to handle it all at once.",
+    },
+    "ar": {
+        "low": "جميل أن أسمع هذا. احتفظ بما جعل يومك طيبًا.",
+        "medium": "شكرًا لمشاركتك. أنا هنا معك.",
+        "high": "يبدو أنك تحمل الكثير. خذ نفسًا عميقًا، لست مضطرًا للتعامل مع كل شيء دفعة واحدة.",
+    },
+}
+
+
+def _index(groups: Dict[str, str]) -> Dict[str, str]:
+    """Map each normalized word to its group."""
+    return {_normalize(word): group for group, words in groups.items() for word in words.split()}
+
+
+_MOOD_INDEX = _index(_MOOD_WORDS)
+_THEME_INDEX = _index({theme: words for theme, (_, _, words) in _THEMES.items()})
+_NEGATIONS = {_normalize(word) for word in _NEGATIONS}
+_INTENSIFIERS = {_normalize(word) for word in _INTENSIFIERS}
+_ESCALATE_PHRASES = [" ".join(_tokens(phrase)) for phrase in _ESCALATE_PHRASES]
+_DISTRESS_INDEX = _index({"distress": _DISTRESS_WORDS})
+
+
+def _lookup(token: str, index: Dict[str, str]) -> Optional[str]:
+    for candidate in _candidates(token):
+        if candidate in index:
+            return index[candidate]
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Analyzer
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LocalAnalysis:
+    """A local analysis result and how far it can be trusted (0-1)."""
+    result: dict
+    confidence: float
+    language: str
+
+    @property
+    def decisive(self) -> bool:
+        """
+        Confident enough and calm enough to skip Gemini, per
+        LOCAL_ANALYSIS_CONFIDENCE_THRESHOLD and LOCAL_ANALYSIS_MAX_STRESS_SCORE.
+        """
+        return (
+            self.confidence >= settings.LOCAL_ANALYSIS_CONFIDENCE_THRESHOLD
+            and self.result["stress_score"] <= settings.LOCAL_ANALYSIS_MAX_STRESS_SCORE
+        )
+
+
+def _intervention(mood: str, stress: int) -> Optional[str]:
+    if stress < 50:
+        return None
+    if mood == "Anxious":
+        return "grounding"
+    if mood in ("Stressed", "Frustrated"):
+        return "breathing"
+    return "reflection"
+
+
+def analyze_locally(content: str, mood: Optional[str] = None) -> LocalAnalysis:
+    """
+    Analyze a journal entry with the lexicons.
+
+    Args:
+        content: Journal entry text (English or Arabic)
+        mood: User's self-reported mood, if any
+
+    Returns:
+        The analysis, in the shape returned by `analyze_journal_entry`, and
+        its confidence
+    """
+    language = _language(content)
+    tokens = _tokens(content)
+    joined = f" {' '.join(tokens)} "
+    crisis = (
+        any(f" {phrase} " in joined for phrase in _ESCALATE_PHRASES)
+        or any(pattern.search(joined) for pattern in _ESCALATE_PATTERNS)
+    )
+    distress = any(_lookup(token, _DISTRESS_INDEX) for token in tokens)
+    has_negation = any(token in _NEGATIONS for token in tokens)
+
+    # (mood, signed valence, weight)
+    hits: List[Tuple[str, float, float]] = []
+    themes: List[str] = []
+    for i, token in enumerate(tokens):
+        theme = _lookup(token, _THEME_INDEX)
+        if theme and theme not in themes:
+            themes.append(theme)
+        word_mood = _lookup(token, _MOOD_INDEX)
+        if word_mood is None:
+            continue
+        window = tokens[max(0, i - _NEGATION_WINDOW):i]
+        weight = _INTENSITY if i > 0 and tokens[i - 1] in _INTENSIFIERS else 1.0
+        valence = MOOD_VALENCE[word_mood]
+        if any(word in _NEGATIONS for word in window):
+            # "not stressed" leans calm, "not happy" leans stressed, but
+            # neither says which mood it is
+            hits.append(("", -valence * 0.5, weight))
+        else:
+            hits.append((word_mood, valence, weight))
+
+    text_hits = len(hits)
+    if mood in MOOD_VALENCE:
+        hits.append((mood, MOOD_VALENCE[mood], 1.0))
+
+    total_weight = sum(weight for _, _, weight in hits)
+    net = sum(valence * weight for _, valence, weight in hits)
+    magnitude = sum(abs(valence) * weight for _, valence, weight in hits)
+    mean = net / total_weight if total_weight else 0.0
+    stress = max(0, min(100, round(45 + 15 * mean)))
+
+    mood_weight: Dict[str, float] = {}
+    for hit_mood, valence, weight in hits:
+        if hit_mood:
+            mood_weight[hit_mood] = mood_weight.get(hit_mood, 0.0) + abs(valence) * weight
+    top_mood = max(mood_weight, key=mood_weight.get) if mood_weight else "Okay"
+
+    if crisis:
+        stress = max(stress, 85)
+        if MOOD_VALENCE[top_mood] < 2:
+            top_mood = "Stressed"
+        confidence = 0.0
+    elif (
+        not hits
+        or has_negation
+        or distress
+        or len(tokens) < settings.LOCAL_ANALYSIS_MIN_WORDS
+        or any(valence > 0 for _, valence, _ in hits)
+    ):
+        # Mixed or unscored sentiment, or too little text to judge
+        confidence = 0.0
+    else:
+        agreement = abs(net) / magnitude if magnitude else 0.0
+        evidence = min(1.0, 0.6 + 0.2 * len(hits))
+        # About one mood word per six words reads as clearly one way
+        density = min(1.0, 6 * max(1, text_hits) / max(1, len(tokens)))
+        confidence = agreement * evidence * density
+
+    band = "low" if stress < 40 else "high" if stress >= 60 else "medium"
+    tone_en, tone_ar = _TONES[top_mood]
+    result = {
+        "stress_score": stress,
+        "emotional_tone": tone_ar if language == "ar" else tone_en,
+        "key_themes": [_THEMES[theme][1 if language == "ar" else 0] for theme in themes[:3]],
+        "suggested_intervention": "grounding" if crisis else _intervention(top_mood, stress),
+        "supportive_message": _MESSAGES[language][band],
+        "detected_mood": mood or top_mood,
+    }
+    return LocalAnalysis(result=result, confidence=round(confidence, 3), language=language)
@@ -0,0 +1,317 @@
+"""
+Nudge Service - computes proactive nudge decisions and serves them
+stale-while-revalidate.
+
+The last decision per user is stored in `nudge_decisions`. Readers such as
+the dashboard get it immediately; when it is older than the freshness
+window, or new journal/intervention data has marked it stale, a background
+refresh recomputes it (possibly via Gemini) without blocking the request.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+from uuid import UUID
+
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.events import NUDGE_AVAILABLE, queue_event
+from app.models.journal import JournalEntry
+from app.models.intervention import InterventionLog
+from app.models.nudge import NudgeState
+from app.models.user import User
+from app.schemas.schemas import NudgeDecision
+from app.services.gemini_scheduler import Lane
+from app.services.gemini_service import generate_nudge_decision
+
+logger = logging.getLogger(__name__)
+
+# Fields of NudgeDecision that make up the stored payload
+_DECISION_FIELDS = {"should_nudge", "message", "nudge_type", "context", "priority"}
+
+# In-flight background refreshes, one per user
+_refresh_tasks: dict[str, asyncio.Task] = {}
+# Users whose data changed while a refresh was already running
+_rerun_requested: set[str] = set()
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normalize a timestamp to aware UTC (naive values are taken as UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+@dataclass
+class _NudgeInputs:
+    """What Gemini is asked about, loaded before the session is closed."""
+    entries_summary: str
+    last_nudge_time: Optional[str]
+    tier: str
+
+
+def _build_entries_summary(entries: list) -> str:
+    """Build a summary of journal entries for AI analysis."""
+    if not entries:
+        return "No recent journal entries."
+
+    summary_parts = []
+    for entry in entries[:5]:  # Last 5 entries
+        summary_parts.append(
+            f"- Mood: {entry.mood.value if entry.mood else 'not set'}, "
+            f"Stress: {entry.stress_score or 'not analyzed'}, "
+            f"Content snippet: {entry.content[:100]}..."
+        )
+
+    return "\n".join(summary_parts)
+
+
+async def compute_nudge_decision(
+    db: AsyncSession,
+    user_id: str,
+    lane: Lane = Lane.background
+) -> NudgeDecision:
+    """
+    Decide whether a proactive nudge should be shown right now.
+
+    Considers:
+    - Recent journal entries and stress levels
+    - Time since last nudge
+    - User's nudge preferences
+
+    Cheap heuristics run first; Gemini is only asked for nuanced cases,
+    scheduled in `lane` (background refreshes unless a user is waiting).
+    Before that call `db` is closed, returning its connection to the pool;
+    the session checks out a new one if it is used again.
+    """
+    inputs = await _load_nudge_inputs(db, user_id)
+    if isinstance(inputs, NudgeDecision):
+        return inputs
+
+    await db.close()
+    result = await generate_nudge_decision(
+        inputs.entries_summary, inputs.last_nudge_time, lane=lane, tier=inputs.tier
+    )
+    return NudgeDecision(**result)
+
+
+async def _load_nudge_inputs(db: AsyncSession, user_id: str) -> Union[NudgeDecision, _NudgeInputs]:
+    """
+    Run the heuristics on the user's recent data.
+
+    Returns:
+        The decision when the heuristics settle it, else the inputs for
+        Gemini
+    """
+    # Check if user has nudges enabled
+    user = await db.get(User, UUID(user_id))
+    if user and not user.nudge_enabled:
+        return NudgeDecision(
+            should_nudge=False,
+            message="",
+            nudge_type="breathing",
+            context="Nudges disabled",
+            priority="low"
+        )
+
+    # Get recent journal entries (last 24 hours, by the database clock)
+    result = await db.execute(
+        select(JournalEntry).where(
+            JournalEntry.user_id == UUID(user_id),
+            JournalEntry.created_at >= func.now() - timedelta(hours=24)
+        ).order_by(desc(JournalEntry.created_at))
+    )
+    recent_entries = result.scalars().all()
+
+    # Get last intervention time
+    result = await db.execute(
+        select(InterventionLog).where(
+            InterventionLog.user_id == UUID(user_id)
+        ).order_by(desc(InterventionLog.created_at)).limit(1)
+    )
+    last_intervention = result.scalars().first()
+
+    last_nudge_time = None
+    if last_intervention:
+        last_nudge_time = last_intervention.created_at.isoformat()
+
+    # Build summary for AI
+    entries_summary = _build_entries_summary(recent_entries)
+
+    # Quick heuristic check before calling AI
+    # If no entries or all entries are calm, don't nudge
+    if not recent_entries:
+        # Check for inactivity nudge (no entries in 48 hours)
+        result = await db.execute(
+            select(JournalEntry).where(
+                JournalEntry.user_id == UUID(user_id)
+            ).order_by(desc(JournalEntry.created_at)).limit(1)
+        )
+        last_entry = result.scalars().first()
+
+        if last_entry:
+            last_created = _as_utc(last_entry.created_at)
+            hours_since_last = (datetime.now(timezone.utc) - last_created).total_seconds() / 3600
+            if hours_since_last > 48:
+                return NudgeDecision(
+                    should_nudge=True,
+                    message="I noticed you've been quiet lately. How are you feeling today?",
+                    nudge_type="reflection",
+                    context="No journal entries for 48 hours",
+                    priority="low"
+                )
+
+        return NudgeDecision(
+            should_nudge=False,
+            message="",
+            nudge_type="breathing",
+            context="No recent activity",
+            priority="low"
+        )
+
+    # Calculate average stress score
+    stress_scores = [e.stress_score for e in recent_entries if e.stress_score is not None]
+    avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else 50
+
+    # Quick rules before AI call
+    high_stress_count = sum(1 for s in stress_scores if s > 70)
+
+    if avg_stress < 40 and high_stress_count == 0:
+        return NudgeDecision(
+            should_nudge=False,
+            message="",
+            nudge_type="breathing",
+            context="Stress levels are healthy",
+            priority="low"
+        )
+
+    # Use AI for nuanced decision
+    tier = user.subscription.value if user and user.subscription else "free"
+    return _NudgeInputs(entries_summary, last_nudge_time, tier)
+
+
+async def store_nudge_decision(
+    db: AsyncSession,
+    user_id: str,
+    decision: NudgeDecision
+) -> datetime:
+    """
+    Upsert the user's latest nudge decision and mark it fresh. When it
+    says to nudge, the user's clients are sent `nudge_available`.
+
+    Returns:
+        The computed_at timestamp that was stored
+    """
+    computed_at = datetime.now(timezone.utc)
+    payload = decision.model_dump(mode="json", include=_DECISION_FIELDS)
+    stmt = insert(NudgeState).values(
+        user_id=UUID(user_id),
+        decision=payload,
+        computed_at=computed_at,
+        stale=False
+    ).on_conflict_do_update(
+        index_elements=[NudgeState.user_id],
+        set_={"decision": payload, "computed_at": computed_at, "stale": False}
+    )
+    await db.execute(stmt)
+    if decision.should_nudge:
+        queue_event(db, user_id, NUDGE_AVAILABLE, {
+            "nudge_type": decision.nudge_type,
+            "priority": decision.priority,
+            "computed_at": computed_at.isoformat(),
+        })
+    await db.commit()
+    return computed_at
+
+
+async def mark_nudge_stale(db: AsyncSession, user_id: str) -> None:
+    """
+    Flag the stored decision as outdated. Runs inside the caller's
+    transaction, so the flag commits together with the new data.
+    """
+    await db.execute(
+        update(NudgeState)
+        .where(NudgeState.user_id == UUID(user_id))
+        .values(stale=True)
+    )
+
+
+async def refresh_nudge(user_id: str) -> None:
+    """
+    Recompute and store a user's nudge decision. No connection is held
+    while Gemini is asked: the inputs are loaded on one session and the
+    decision is stored on another.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            decision = await compute_nudge_decision(db, user_id)
+        async with AsyncSessionLocal() as db:
+            await store_nudge_decision(db, user_id, decision)
+    except Exception as e:
+        # Keep serving the previous decision; the next read retries
+        logger.error(f"Nudge refresh failed for user {user_id}: {e}")
+
+
+def _on_refresh_done(user_id: str, task: asyncio.Task) -> None:
+    if _refresh_tasks.get(user_id) is task:
+        del _refresh_tasks[user_id]
+    if user_id in _rerun_requested:
+        _rerun_requested.discard(user_id)
+        schedule_nudge_refresh(user_id)
+
+
+def schedule_nudge_refresh(user_id: str) -> None:
+    """
+    Start a background refresh for the user unless one is already running.
+    If one is running, another is queued to pick up data that arrived
+    after it started.
+    """
+    running = _refresh_tasks.get(user_id)
+    if running is not None and not running.done():
+        _rerun_requested.add(user_id)
+        return
+    task = asyncio.create_task(refresh_nudge(user_id))
+    _refresh_tasks[user_id] = task
+    task.add_done_callback(lambda t: _on_refresh_done(user_id, t))
+
+
+def nudge_is_stale(computed_at: Optional[datetime], stale_flag: Optional[bool]) -> bool:
+    """
+    Whether a stored decision needs a refresh: missing, marked stale by new
+    data, or older than NUDGE_FRESHNESS_SECONDS.
+    """
+    if computed_at is None or stale_flag:
+        return True
+    age = datetime.now(timezone.utc) - _as_utc(computed_at)
+    return age > timedelta(seconds=settings.NUDGE_FRESHNESS_SECONDS)
+
+
+async def get_cached_nudge(db: AsyncSession, user_id: str) -> NudgeDecision:
+    """
+    Return the last known nudge decision without waiting on Gemini.
+
+    Schedules a background refresh when the decision is missing, older
+    than NUDGE_FRESHNESS_SECONDS, or was marked stale by new data.
+    """
+    state: Optional[NudgeState] = await db.get(NudgeState, UUID(user_id))
+    if state is None:
+        schedule_nudge_refresh(user_id)
+        return NudgeDecision(
+            should_nudge=False,
+            message="",
+            nudge_type="breathing",
+            context="Checking in on your recent entries",
+            priority="low",
+            stale=True
+        )
+
+    stale = nudge_is_stale(state.computed_at, state.stale)
+    if stale:
+        schedule_nudge_refresh(user_id)
+
+    return NudgeDecision(**state.decision, computed_at=state.computed_at, stale=stale)
@@ -0,0 +1,77 @@
+"""
+Streak Service - journaling streaks computed in SQL.
+
+Streaks use the gaps-and-islands technique over the user's whole history.
+Each local calendar day with an entry (one `user_daily_stats` row) is
+numbered with ROW_NUMBER(). Consecutive days share the same
+`day - row_number` value, so grouping by it yields one row per streak. Only
+the streak summary leaves the database, and the work grows with active days
+rather than with the number of entries.
+
+Days are bucketed in the user's timezone (`users.timezone`, default UTC), so
+an entry written at 23:30 in Riyadh counts for that Riyadh day.
+"""
+from uuid import UUID
+
+from sqlalchemy import Integer, Select, cast, func, select
+
+from app.models.daily_stats import UserDailyStats
+from app.services.daily_stats_service import local_today
+
+
+def streak_query(user_id: str) -> Select:
+    """
+    Build a single-row statement with the user's streak summary.
+
+    Columns:
+        current_streak: Length of the streak ending today or yesterday
+            (local time), else 0
+        longest_streak: Longest streak across all history
+        total_entries: Total journal entries
+
+    Args:
+        user_id: User UUID as string
+
+    Returns:
+        Select statement, usable directly or as a subquery
+    """
+    user_uuid = UUID(user_id)
+    today = local_today(user_uuid)
+
+    # One row per local day with at least one entry
+    days = select(UserDailyStats.day).where(
+        UserDailyStats.user_id == user_uuid,
+        UserDailyStats.entry_count > 0
+    ).subquery("days")
+
+    # Consecutive days map to the same island key
+    islands = select(
+        days.c.day,
+        (days.c.day - cast(func.row_number().over(order_by=days.c.day), Integer)).label("island"),
+    ).subquery("islands")
+
+    streaks = select(
+        func.max(islands.c.day).label("last_day"),
+        func.count().label("length"),
+    ).group_by(islands.c.island).subquery("streaks")
+
+    # Islands are separated by at least one empty day, so at most one
+    # streak can end today or yesterday.
+    return select(
+        func.coalesce(
+            func.max(streaks.c.length).filter(streaks.c.last_day >= today - 1), 0
+        ).label("current_streak"),
+        func.coalesce(func.max(streaks.c.length), 0).label("longest_streak"),
+        select(func.coalesce(func.sum(UserDailyStats.entry_count), 0)).where(
+            UserDailyStats.user_id == user_uuid
+        ).scalar_subquery().label("total_entries"),
+    ).select_from(streaks)
+
+
+def streak_from_row(row) -> dict:
+    """Shape a `streak_query` row as the streak API response."""
+    return {
+        "current_streak": row.current_streak,
+        "longest_streak": row.longest_streak,
+        "total_entries": row.total_entries
+    }
@@ -0,0 +1,63 @@
+"""
+Version Service - per-user data version counters.
+
+`users.data_version` is bumped in the same transaction as every write that
+changes what a user sees (journal entries, analysis results, interventions,
+profile and preferences). Cached reads put the version in their key, so a
+write makes older entries unreachable without scanning or deleting
+anything. Strong ETags are derived from it as well.
+"""
+import hashlib
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.events import STATS_CHANGED, queue_event
+from app.models.user import User
+
+
+async def bump_data_version(db: AsyncSession, user_id: str) -> Optional[int]:
+    """
+    Increment the user's data version inside the caller's transaction.
+    Connected clients get `stats_changed` once it commits.
+
+    Returns:
+        The new version, or None if the user row does not exist
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == UUID(str(user_id)))
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar()
+    if version is not None:
+        queue_event(db, user_id, STATS_CHANGED, {"version": version})
+    return version
+
+
+async def get_data_version(db: AsyncSession, user_id: str) -> int:
+    """Current data version for the user (0 if the user row does not exist)."""
+    result = await db.execute(
+        select(User.data_version).where(User.id == UUID(str(user_id)))
+    )
+    return result.scalar() or 0
+
+
+def make_etag(user_id: str, version: int, *parts: Any) -> str:
+    """
+    Strong ETag for a representation of the user's data at `version`.
+
+    Args:
+        user_id: Owner of the data
+        version: Data version the representation was built from
+        parts: Anything else the representation depends on (path, query, day)
+
+    Returns:
+        Quoted ETag header value
+    """
+    raw = ":".join([str(user_id), str(version), *(str(p) for p in parts)])
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
@@ -0,0 +1,43 @@
+"""
+Server-Sent Events (SSE) responses.
+
+Events are written as `event: <name>` and `data: <json>` lines. Every
+event is flushed as soon as it is yielded. Proxies are asked not to
+buffer the stream (`X-Accel-Buffering: no`). Long-lived streams send
+`sse_comment` heartbeats, which clients ignore, so idle connections are
+not closed by proxies and dead ones are noticed.
+"""
+import json
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one event; `data` is JSON-encoded onto a single line."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_comment(text: str = "ping") -> str:
+    """Format a comment line (heartbeat); clients do not see it as an event."""
+    return f": {text}\n\n"
+
+
+def event_stream(
+    events: AsyncIterator[str],
+    background: Optional[BackgroundTask] = None
+) -> StreamingResponse:
+    """
+    Stream formatted events as a `text/event-stream` response.
+
+    `background` runs once the response has been sent.
+    """
+    return StreamingResponse(
+        events, media_type="text/event-stream", headers=SSE_HEADERS, background=background
+    )
@@ -0,0 +1,40 @@
+"""
+Standalone journal analysis worker.
+
+Runs the analysis queue outside the API processes, so analysis throughput
+scales separately from request serving:
+
+    uv run python -m app.worker
+
+Set ANALYSIS_WORKER_IN_PROCESS=false on the API to leave all analysis to
+standalone workers. Any number of workers can run at once. Clients are
+only notified of the analyses they finish with EVENTS_BACKEND=redis.
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import async_engine
+from app.events import close_events, init_events
+from app.services.analysis_queue import AnalysisWorker
+
+
+async def main() -> None:
+    await init_events()
+    worker = AnalysisWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: asyncio.create_task(worker.stop()))
+    try:
+        await worker.run()
+    finally:
+        await close_events()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    asyncio.run(main())
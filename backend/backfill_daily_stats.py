@@ -0,0 +1,38 @@
+"""
+Rebuild the `user_daily_stats` rollup from raw journal entries and
+interventions.
+
+Run once after applying migrations/005_add_user_daily_stats.sql, or for a
+single user if their rollup ever drifts.
+
+Usage:
+    uv run python backfill_daily_stats.py [user_id]
+"""
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, select
+from app.database import AsyncSessionLocal
+from app.models.daily_stats import UserDailyStats
+from app.services.daily_stats_service import rebuild_daily_stats
+
+
+async def backfill(user_id: str = None) -> None:
+    async with AsyncSessionLocal() as db:
+        await rebuild_daily_stats(db, user_id)
+        await db.commit()
+
+        query = select(func.count())
+        if user_id:
+            query = query.where(UserDailyStats.user_id == user_id)
+        rows = (await db.execute(query.select_from(UserDailyStats))).scalar()
+
+    target = f"user {user_id}" if user_id else "all users"
+    print(f"Rebuilt daily stats for {target}: {rows} day rows.")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(sys.argv[1] if len(sys.argv) > 1 else None))
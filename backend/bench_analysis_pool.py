@@ -0,0 +1,152 @@
+"""
+Measure connection pool wait while many journal analyses are in flight.
+
+Creates `count` unanalyzed entries for an existing user and runs them
+through the analysis queue with Gemini replaced by a fixed `latency`
+sleep. Meanwhile a probe checks out a pooled connection every 20ms, like
+a request would, and records how long it waited. The same probe runs
+against the previous pattern, which held a session for the whole Gemini
+call. The entries are deleted and the user's daily rollup is rebuilt
+afterwards. Run it against a local or staging database.
+
+Usage:
+    uv run python bench_analysis_pool.py <user_id> [count] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+from uuid import UUID
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import delete, text
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.models.journal import JournalEntry
+import app.services.analysis_batcher as analysis_batcher
+import app.services.analysis_queue as analysis_queue
+from app.services.analysis_queue import AnalysisWorker, enqueue_analysis
+from app.services.daily_stats_service import rebuild_daily_stats
+from app.services.gemini_scheduler import Lane
+
+PROBE_INTERVAL = 0.02
+
+
+def _fake_gemini(latency: float):
+    async def analyze(content, mood=None, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return {
+            "stress_score": 40,
+            "emotional_tone": "neutral",
+            "key_themes": [],
+            "suggested_intervention": None,
+            "supportive_message": "benchmark",
+            "detected_mood": "Okay",
+        }
+    return analyze
+
+
+async def _probe(stop: asyncio.Event, waits: list) -> None:
+    """Check out a pooled connection repeatedly, recording the wait."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        async with async_engine.connect() as conn:
+            waits.append((time.perf_counter() - start) * 1000)
+            await conn.execute(text("SELECT 1"))
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+def _report(label: str, waits: list, elapsed: float) -> None:
+    waits.sort()
+    p50 = waits[len(waits) // 2]
+    p99 = waits[min(len(waits) - 1, int(len(waits) * 0.99))]
+    print(
+        f"{label:<16} elapsed={elapsed:6.2f}s  pool wait p50={p50:7.2f}ms  "
+        f"p99={p99:7.2f}ms  max={waits[-1]:7.2f}ms  probes={len(waits)}"
+    )
+
+
+async def _seed(user_id: str, count: int) -> list:
+    async with AsyncSessionLocal() as db:
+        entries = [
+            JournalEntry(user_id=UUID(user_id), entry_type="text", content="benchmark entry")
+            for _ in range(count)
+        ]
+        db.add_all(entries)
+        await db.flush()
+        for entry in entries:
+            await enqueue_analysis(db, entry)
+        await db.commit()
+        return [entry.id for entry in entries]
+
+
+async def _cleanup(user_id: str, entry_ids: list) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(JournalEntry).where(JournalEntry.id.in_(entry_ids)))
+        await rebuild_daily_stats(db, user_id)
+        await db.commit()
+
+
+async def _queued(user_id: str, count: int) -> None:
+    """Current pipeline: no connection held during the Gemini call."""
+    entry_ids = await _seed(user_id, count)
+    worker = AnalysisWorker(concurrency=count, poll_interval=0.05, batch_size=1)
+    stop, waits = asyncio.Event(), []
+    probe = asyncio.create_task(_probe(stop, waits))
+    start = time.perf_counter()
+    runner = asyncio.create_task(worker.run())
+    while worker.completed + worker.failed < count:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await worker.stop()
+    await runner
+    stop.set()
+    await probe
+    _report("queued", waits, elapsed)
+    await _cleanup(user_id, entry_ids)
+
+
+async def _held(user_id: str, count: int) -> None:
+    """Previous pattern: the session stays open across the Gemini call."""
+    entry_ids = await _seed(user_id, count)
+
+    async def analyze(entry_id):
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(JournalEntry, entry_id)
+            await analysis_batcher.analyze_with_gemini(entry.content, None, None, Lane.background, "free")
+
+    stop, waits = asyncio.Event(), []
+    probe = asyncio.create_task(_probe(stop, waits))
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze(entry_id) for entry_id in entry_ids))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    _report("held session", waits, elapsed)
+    await _cleanup(user_id, entry_ids)
+
+
+async def main(user_id: str, count: int, latency: float) -> None:
+    analysis_batcher.analyze_with_gemini = _fake_gemini(latency)
+    # Keep nudge refreshes (real Gemini calls) out of the measurement
+    analysis_queue.schedule_nudge_refresh = lambda user_id: None
+    print(
+        f"{count} analyses, {latency}s simulated Gemini latency, "
+        f"pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}"
+    )
+    await _queued(user_id, count)
+    await _held(user_id, count)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(
+        sys.argv[1],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    ))
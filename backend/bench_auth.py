@@ -0,0 +1,60 @@
+"""
+Benchmark Supabase token verification latency.
+
+Compares a fresh httpx client per call (the old behaviour) with the shared
+pooled client, and local JWT verification. Prints p50/p99 in milliseconds.
+
+Usage:
+    uv run python bench_auth.py <access_token> [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from app.config import settings
+from app.auth import verify_token_locally, verify_token_remotely, LocalVerificationUnavailable
+from app.http_client import init_http_client, close_http_client
+
+
+async def _fresh_client_call(token: str) -> None:
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        await client.get(
+            f"{settings.SUPABASE_URL}/auth/v1/user",
+            headers={"Authorization": f"Bearer {token}", "apikey": settings.SUPABASE_ANON_KEY}
+        )
+
+
+async def _measure(label: str, fn, token: str, iterations: int) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} p50={statistics.median(samples):8.3f}ms  p99={p99:8.3f}ms")
+
+
+async def main(token: str, iterations: int) -> None:
+    await init_http_client()
+    try:
+        await _measure("fresh client per request", _fresh_client_call, token, iterations)
+        await _measure("shared pooled client", verify_token_remotely, token, iterations)
+        try:
+            await _measure("local JWT verification", verify_token_locally, token, iterations)
+        except LocalVerificationUnavailable as exc:
+            print(f"local JWT verification       skipped ({exc})")
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 50))
@@ -0,0 +1,84 @@
+"""
+Benchmark the SQL streak engine against long journaling histories.
+
+Inserts `years` of synthetic daily entries (with periodic gaps) for an
+existing user inside a transaction, rebuilds their daily rollup, times
+`streak_query`, and rolls the transaction back so no data is kept. For comparison it also times the
+previous approach of pulling every distinct entry date into Python.
+
+Usage:
+    uv run python bench_streak.py <user_id> [years] [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import os
+import time
+from uuid import UUID
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import desc, func, select, text
+from app.database import AsyncSessionLocal
+from app.models.journal import JournalEntry
+from app.services.daily_stats_service import rebuild_daily_stats
+from app.services.streak_service import streak_query, streak_from_row
+
+# Every 11th day is skipped so the history has many separate streaks
+SEED_SQL = text("""
+    INSERT INTO journal_entries (user_id, entry_type, content, mood, created_at)
+    SELECT :user_id, 'text', 'benchmark entry', 'Okay',
+           now() - make_interval(days => d) - make_interval(hours => h)
+    FROM generate_series(0, :days - 1) AS d,
+         generate_series(0, 1) AS h
+    WHERE d % 11 <> 10
+""")
+
+
+async def _python_dates(db, user_id: str) -> None:
+    entry_day = func.date(JournalEntry.created_at)
+    result = await db.execute(
+        select(entry_day).where(
+            JournalEntry.user_id == UUID(user_id)
+        ).distinct().order_by(desc(entry_day))
+    )
+    result.scalars().all()
+
+
+async def _sql_streak(db, user_id: str) -> dict:
+    result = await db.execute(streak_query(user_id))
+    return streak_from_row(result.one())
+
+
+async def _measure(label: str, fn, db, user_id: str, iterations: int) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn(db, user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} p50={statistics.median(samples):8.3f}ms  p99={p99:8.3f}ms")
+
+
+async def main(user_id: str, years: int, iterations: int) -> None:
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.execute(SEED_SQL, {"user_id": UUID(user_id), "days": years * 365})
+            await rebuild_daily_stats(db, user_id)
+            print(f"Seeded {years} year(s) of entries; result: {await _sql_streak(db, user_id)}")
+            await _measure("fetch all dates (Python)", _python_dates, db, user_id, iterations)
+            await _measure("gaps-and-islands (SQL)", _sql_streak, db, user_id, iterations)
+        finally:
+            await db.rollback()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(
+        sys.argv[1],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    ))
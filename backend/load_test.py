@@ -0,0 +1,79 @@
+"""
+Concurrent load test against a running backend.
+
+Fires requests at one endpoint with increasing concurrency and reports
+throughput and latency percentiles for each level, so you can check that
+throughput scales with concurrency instead of flatlining.
+
+Usage:
+    uv run python load_test.py <access_token> [path] [requests_per_level]
+
+Example:
+    uv run python load_test.py $TOKEN /api/insights/stats 200
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+BASE_URL = os.environ.get("LOAD_TEST_BASE_URL", "http://localhost:8000")
+CONCURRENCY_LEVELS = (1, 4, 16, 64)
+
+
+async def _run_level(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> None:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"concurrency={concurrency:<4} rps={total / elapsed:8.1f}  "
+        f"p50={p50:7.1f}ms  p99={p99:7.1f}ms  errors={errors}"
+    )
+
+
+async def main(token: str, path: str, total: int) -> None:
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS))
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"Authorization": f"Bearer {token}"},
+        limits=limits,
+        timeout=30.0
+    ) as client:
+        print(f"GET {BASE_URL}{path}, {total} requests per level")
+        for concurrency in CONCURRENCY_LEVELS:
+            await _run_level(client, path, concurrency, total)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(
+        sys.argv[1],
+        sys.argv[2] if len(sys.argv) > 2 else "/api/insights/stats",
+        int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    ))
@@ -0,0 +1,23 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- Nudge Decisions Table
+-- Last computed nudge decision per user, served stale-while-revalidate
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+CREATE TABLE IF NOT EXISTS nudge_decisions (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+
+    -- NudgeDecision payload (should_nudge, message, nudge_type, context, priority)
+    decision JSONB NOT NULL,
+
+    -- Freshness
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    stale BOOLEAN NOT NULL DEFAULT false
+);
+
+ALTER TABLE nudge_decisions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own nudge decision" ON nudge_decisions
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Service role has full access to nudge_decisions" ON nudge_decisions
+    FOR ALL USING (auth.role() = 'service_role');
@@ -0,0 +1,7 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- User Timezone
+-- IANA timezone name used to bucket entries into local calendar days
+-- (streaks, daily stats)
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS timezone VARCHAR(64) DEFAULT 'UTC';
@@ -0,0 +1,34 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- User Daily Stats Table
+-- Per-user, per-local-day rollup of journal and intervention activity.
+-- Maintained by the API in the same transaction as each write; rebuild with
+-- `python backfill_daily_stats.py` after applying this migration.
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+CREATE TABLE IF NOT EXISTS user_daily_stats (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,  -- Calendar day in the user's timezone
+
+    -- Journal entries
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    stress_sum INTEGER NOT NULL DEFAULT 0,
+    stress_count INTEGER NOT NULL DEFAULT 0,
+    high_stress_count INTEGER NOT NULL DEFAULT 0,  -- stress_score > 70
+    mood_counts JSONB NOT NULL DEFAULT '{}',  -- e.g. {"Calm": 2, "Tired": 1}
+
+    -- Interventions
+    intervention_count INTEGER NOT NULL DEFAULT 0,
+    completed_interventions INTEGER NOT NULL DEFAULT 0,
+    calm_seconds INTEGER NOT NULL DEFAULT 0,  -- Duration of completed interventions
+    last_intervention_at TIMESTAMPTZ,
+
+    PRIMARY KEY (user_id, day)
+);
+
+ALTER TABLE user_daily_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own daily stats" ON user_daily_stats
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Service role has full access to user_daily_stats" ON user_daily_stats
+    FOR ALL USING (auth.role() = 'service_role');
@@ -0,0 +1,7 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- User Data Version
+-- Monotonic per-user counter, bumped in the same transaction as every write
+-- that changes what the user sees. Cache keys and ETags are derived from it.
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0;
@@ -0,0 +1,51 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- Analysis Jobs Table
+-- Durable queue for journal entry analysis. Workers claim jobs with
+-- FOR UPDATE SKIP LOCKED; a claimed job is leased until locked_until and is
+-- claimed again if its worker dies. Failed jobs are retried with exponential
+-- backoff and dead-lettered (status 'dead') after max_attempts.
+--
+-- Requeue dead jobs after fixing the cause:
+--   UPDATE analysis_jobs SET status = 'pending', attempts = 0, run_after = NOW()
+--   WHERE status = 'dead';
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    entry_id UUID NOT NULL REFERENCES journal_entries(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+
+    -- pending -> running -> (deleted on success) | pending (retry) | dead
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    -- Lease held by the worker running the job
+    locked_by VARCHAR(100),
+    locked_until TIMESTAMPTZ,
+
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ  -- Set when dead-lettered
+);
+
+-- At most one queued or running job per entry
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_active_entry
+    ON analysis_jobs(entry_id) WHERE status IN ('pending', 'running');
+
+-- Claim scans: due jobs and expired leases
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_due
+    ON analysis_jobs(run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_leases
+    ON analysis_jobs(locked_until) WHERE status = 'running';
+
+ALTER TABLE analysis_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to analysis_jobs" ON analysis_jobs
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- Queue entries whose in-process background analysis was lost
+INSERT INTO analysis_jobs (entry_id, user_id)
+SELECT id, user_id FROM journal_entries WHERE analyzed_at IS NULL
+ON CONFLICT (entry_id) WHERE status IN ('pending', 'running') DO NOTHING;
@@ -0,0 +1,72 @@
+"""Tests for per-user batching of queued analyses (app/services/analysis_batcher.py)."""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import analysis_batcher
+from app.services.analysis_batcher import AnalysisBatcher
+
+
+def _entry(user_id: str, content: str) -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4(), user_id=user_id, content=content, mood=None)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record every Gemini call the batcher makes."""
+    calls = []
+
+    async def prescreen(content, mood):
+        return None, None
+
+    async def analyze_entries(items, lane, tier):
+        calls.append(("batch", [item.content for item in items], tier))
+        return {item.key: {"stress_score": 50, "content": item.content} for item in items}
+
+    async def analyze_one(content, mood, local, lane, tier):
+        calls.append(("single", [content], tier))
+        return {"stress_score": 50, "content": content}
+
+    monkeypatch.setattr(analysis_batcher, "prescreen_analysis", prescreen)
+    monkeypatch.setattr(analysis_batcher, "analyze_journal_entries", analyze_entries)
+    monkeypatch.setattr(analysis_batcher, "analyze_with_gemini", analyze_one)
+    return calls
+
+
+def test_entries_of_different_users_never_share_a_call(calls):
+    async def run():
+        batcher = AnalysisBatcher(max_size=8, window_ms=20)
+        entries = [_entry(user, f"{user} {i}") for i in range(3) for user in ("alice", "bob")]
+        results = await asyncio.gather(*(batcher.analyze(entry, "free") for entry in entries))
+        return entries, results
+
+    entries, results = asyncio.run(run())
+
+    assert len(calls) == 2
+    for _, contents, _ in calls:
+        assert len({content.split()[0] for content in contents}) == 1
+    # Every caller still gets its own entry's result
+    assert [result["content"] for result in results] == [entry.content for entry in entries]
+
+
+def test_full_batch_of_one_user_flushes_without_waiting(calls):
+    async def run():
+        batcher = AnalysisBatcher(max_size=2, window_ms=60_000)
+        waiting = asyncio.ensure_future(batcher.analyze(_entry("bob", "bob 0"), "free"))
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.analyze(_entry("alice", "alice 0"), "premium"),
+                batcher.analyze(_entry("alice", "alice 1"), "premium"),
+            ),
+            timeout=1
+        )
+        # Bob's entry waits for its own window; alice's batch did not take it
+        assert not waiting.done()
+        assert batcher.stats()["waiting"] == 1
+        waiting.cancel()
+
+    asyncio.run(run())
+
+    assert calls == [("batch", ["alice 0", "alice 1"], "premium")]
@@ -0,0 +1,248 @@
+"""
+Tests for the analysis job queue (app/services/analysis_queue.py).
+
+The claim, retry and dead-letter tests run the queue's SQL against a real
+database and are skipped unless TEST_DATABASE_URL points at a Postgres
+database with the migrations applied (Supabase's `auth` schema included).
+Rows they create are deleted afterwards.
+"""
+import asyncio
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import _async_database_url
+from app.models.analysis_job import AnalysisJob, JobStatus
+from app.models.journal import JournalEntry, MoodType
+from app.services import analysis_queue, analysis_service
+from app.services.analysis_queue import (
+    AnalysisWorker,
+    claim_jobs,
+    complete_job,
+    enqueue_analysis,
+    fail_job,
+    retry_delay,
+)
+from app.services.daily_stats_service import record_entry
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+needs_database = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+def _job(**overrides) -> SimpleNamespace:
+    job = {"id": uuid.uuid4(), "entry_id": uuid.uuid4(), "attempts": 1, "max_attempts": 3, "last_error": None}
+    job.update(overrides)
+    return SimpleNamespace(**job)
+
+
+# Backoff and worker transitions
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_RETRY_BASE_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "ANALYSIS_RETRY_MAX_SECONDS", 60.0)
+    monkeypatch.setattr(analysis_queue, "random", SimpleNamespace(uniform=lambda low, high: high))
+
+    assert [retry_delay(attempts) for attempts in range(1, 6)] == [5.0, 10.0, 20.0, 40.0, 60.0]
+
+    monkeypatch.setattr(analysis_queue, "random", SimpleNamespace(uniform=lambda low, high: low))
+    assert retry_delay(2) == 5.0
+
+
+@pytest.fixture
+def failures(monkeypatch):
+    """Record fail_job calls instead of writing them."""
+    failures = []
+
+    async def record(job, worker_id, error):
+        failures.append((job, worker_id, error))
+
+    monkeypatch.setattr(analysis_queue, "fail_job", record)
+    return failures
+
+
+def test_failed_analysis_is_recorded_for_retry(failures, monkeypatch):
+    async def load(entry_id):
+        return SimpleNamespace(user_id="u1"), "free"
+
+    async def analyze(entry, tier):
+        raise RuntimeError("gemini down")
+
+    monkeypatch.setattr(analysis_queue, "load_entry_for_analysis", load)
+    worker = AnalysisWorker(worker_id="w1")
+    monkeypatch.setattr(worker.batcher, "analyze", analyze)
+    job = _job()
+
+    asyncio.run(worker._run_job(job))
+    assert failures == [(job, "w1", "RuntimeError('gemini down')")]
+    assert (worker.completed, worker.failed) == (0, 1)
+
+
+def test_job_reclaimed_after_its_last_attempt_is_dead_lettered(failures, monkeypatch):
+    async def load(entry_id):
+        raise AssertionError("a job out of attempts must not be analyzed again")
+
+    monkeypatch.setattr(analysis_queue, "load_entry_for_analysis", load)
+    worker = AnalysisWorker(worker_id="w1")
+    job = _job(attempts=4, max_attempts=3, last_error="Timed out")
+
+    asyncio.run(worker._run_job(job))
+    assert failures == [(job, "w1", "Timed out")]
+    assert worker.failed == 1
+
+
+# Queue SQL against Postgres
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Sessions on the test database, used by the queue in place of the app's."""
+    engine = create_async_engine(_async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(analysis_queue, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(analysis_service, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(analysis_queue, "schedule_nudge_refresh", lambda user_id: None)
+    return factory
+
+
+@pytest.fixture
+def user_id(sessions):
+    """A fresh user; deleting it afterwards cascades to its entries and jobs."""
+    user_id = uuid.uuid4()
+
+    async def execute(sql: str):
+        async with sessions() as db:
+            await db.execute(text(sql), {"id": user_id, "email": f"{user_id}@example.com"})
+            await db.commit()
+
+    asyncio.run(execute("INSERT INTO auth.users (id, email) VALUES (:id, :email)"))
+    yield user_id
+    asyncio.run(execute("DELETE FROM auth.users WHERE id = :id"))
+
+
+async def _create_entry(sessions, user_id, content: str = "rough day at work") -> uuid.UUID:
+    """Create an entry the way the journal router does, queuing its analysis."""
+    async with sessions() as db:
+        entry = JournalEntry(user_id=user_id, content=content, mood=MoodType.Okay)
+        db.add(entry)
+        await db.flush()
+        await record_entry(db, entry)
+        await enqueue_analysis(db, entry)
+        await db.commit()
+        return entry.id
+
+
+async def _claim(worker_id: str, entry_id) -> list:
+    """Claim due jobs, keeping the one for `entry_id` (if it was due)."""
+    return [job for job in await claim_jobs(100, worker_id) if job.entry_id == entry_id]
+
+
+async def _stored_job(sessions, entry_id) -> AnalysisJob:
+    async with sessions() as db:
+        result = await db.execute(select(AnalysisJob).where(AnalysisJob.entry_id == entry_id))
+        return result.scalars().one()
+
+
+async def _expire_lease(sessions, job_id) -> None:
+    async with sessions() as db:
+        await db.execute(
+            text("UPDATE analysis_jobs SET locked_until = now() - interval '1 second' WHERE id = :id"),
+            {"id": job_id}
+        )
+        await db.commit()
+
+
+@needs_database
+def test_due_job_is_claimed_once_and_reclaimed_after_its_lease(sessions, user_id):
+    async def run():
+        entry_id = await _create_entry(sessions, user_id)
+        # Enqueuing again while a job is queued is a no-op
+        async with sessions() as db:
+            await enqueue_analysis(db, await db.get(JournalEntry, entry_id))
+            await db.commit()
+
+        first = await _claim("w1", entry_id)
+        again = await _claim("w2", entry_id)
+
+        await _expire_lease(sessions, first[0].id)
+        reclaimed = await _claim("w2", entry_id)
+
+        async with sessions() as db:
+            stale_completed = await complete_job(db, first[0], "w1")
+            await db.rollback()
+        async with sessions() as db:
+            completed = await complete_job(db, reclaimed[0], "w2")
+            await db.commit()
+        async with sessions() as db:
+            remaining = await db.scalar(
+                select(AnalysisJob.id).where(AnalysisJob.entry_id == entry_id)
+            )
+        return first, again, reclaimed, stale_completed, completed, remaining
+
+    first, again, reclaimed, stale_completed, completed, remaining = asyncio.run(run())
+    assert len(first) == 1
+    assert (first[0].status, first[0].attempts, first[0].locked_by) == (JobStatus.running, 1, "w1")
+    assert again == []
+    assert (reclaimed[0].attempts, reclaimed[0].locked_by) == (2, "w2")
+    # The first worker lost its lease and may not complete the job
+    assert stale_completed is False
+    assert completed is True
+    assert remaining is None
+
+
+@needs_database
+def test_failed_job_is_retried_after_a_backoff(sessions, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_RETRY_BASE_SECONDS", 60.0)
+
+    async def run():
+        entry_id = await _create_entry(sessions, user_id)
+        job = (await _claim("w1", entry_id))[0]
+        await fail_job(job, "w1", "gemini down")
+        stored = await _stored_job(sessions, entry_id)
+        async with sessions() as db:
+            wait = await db.scalar(
+                text("SELECT extract(epoch FROM run_after - now()) FROM analysis_jobs WHERE id = :id"),
+                {"id": job.id}
+            )
+        # Not due again until the backoff has passed
+        due = await _claim("w2", entry_id)
+        return stored, float(wait), due
+
+    stored, wait, due = asyncio.run(run())
+    assert stored.status == JobStatus.pending
+    assert (stored.attempts, stored.locked_by, stored.locked_until) == (1, None, None)
+    assert stored.last_error == "gemini down"
+    assert 25 < wait <= 60
+    assert due == []
+
+
+@needs_database
+def test_job_out_of_attempts_is_dead_lettered_with_a_local_analysis(sessions, user_id):
+    async def run():
+        entry_id = await _create_entry(sessions, user_id)
+        async with sessions() as db:
+            await db.execute(
+                text("UPDATE analysis_jobs SET max_attempts = 1 WHERE entry_id = :id"),
+                {"id": entry_id}
+            )
+            await db.commit()
+        job = (await _claim("w1", entry_id))[0]
+        await fail_job(job, "w1", "gemini down")
+        async with sessions() as db:
+            entry = await db.get(JournalEntry, entry_id)
+        return await _stored_job(sessions, entry_id), entry
+
+    stored, entry = asyncio.run(run())
+    assert stored.status == JobStatus.dead
+    assert stored.finished_at is not None
+    assert stored.last_error == "gemini down"
+    # The entry is not left pending
+    assert entry.analyzed_at is not None
+    assert entry.stress_score is not None
@@ -0,0 +1,178 @@
+"""Tests for token verification (app/auth.py) with locally signed tokens."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app import auth
+from app.auth import JWKSCache, TokenCache
+from app.config import settings
+
+SECRET = "test-jwt-secret"
+JWKS_URL = "https://example.supabase.co/auth/v1/.well-known/jwks.json"
+
+
+def _claims(**overrides) -> dict:
+    claims = {
+        "sub": "3f1c2d9e-0000-4000-8000-000000000001",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "email": "user@example.com",
+        "role": "authenticated",
+    }
+    claims.update(overrides)
+    return claims
+
+
+def _rsa_key(kid: str):
+    """A private PEM for signing and the public JWK Supabase would publish."""
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+@pytest.fixture
+def local_auth(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_VERIFY_MODE", "local")
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", False)
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", SECRET)
+
+
+class FakeJWKS:
+    """Serves a JWKS document through httpx.MockTransport and counts fetches."""
+
+    def __init__(self):
+        self.keys: list = []
+        self.fetches = 0
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        assert str(request.url) == JWKS_URL
+        self.fetches += 1
+        return httpx.Response(200, json={"keys": self.keys})
+
+
+@pytest.fixture
+def jwks(monkeypatch, local_auth):
+    """A fresh JWKS cache in front of a fake JWKS endpoint."""
+    server = FakeJWKS()
+    monkeypatch.setattr(auth, "get_http_client", lambda: server.client)
+    monkeypatch.setattr(auth, "jwks_cache", JWKSCache(JWKS_URL, ttl_seconds=600))
+    return server
+
+
+# HS256 with the project secret
+
+def test_hs256_token_is_verified_locally(local_auth):
+    token = jwt.encode(_claims(), SECRET)
+    user = asyncio.run(auth._verify_uncached(token))
+    assert user["id"] == _claims()["sub"]
+    assert user["email"] == "user@example.com"
+
+
+@pytest.mark.parametrize("token", [
+    jwt.encode(_claims(exp=int(time.time()) - 10), SECRET),
+    jwt.encode(_claims(), "some-other-secret"),
+    jwt.encode(_claims(aud="anon"), SECRET),
+    jwt.encode({k: v for k, v in _claims().items() if k != "exp"}, SECRET),
+    jwt.encode(_claims(), SECRET, algorithm="HS512"),
+    "not-a-jwt",
+], ids=["expired", "bad-signature", "wrong-audience", "no-exp", "unsupported-alg", "malformed"])
+def test_invalid_tokens_are_rejected(local_auth, token):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth._verify_uncached(token))
+    assert exc.value.status_code == 401
+
+
+def test_missing_secret_without_fallback_is_unavailable(local_auth, monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth._verify_uncached(jwt.encode(_claims(), SECRET)))
+    assert exc.value.status_code == 503
+
+
+# RS256 against the JWKS
+
+def test_rs256_token_is_verified_against_jwks(jwks):
+    pem, public = _rsa_key("key-1")
+    jwks.keys = [public]
+    token = jwt.encode(_claims(), pem, algorithm="RS256", headers={"kid": "key-1"})
+
+    async def run():
+        return [await auth._verify_uncached(token) for _ in range(3)]
+
+    users = asyncio.run(run())
+    assert all(user["id"] == _claims()["sub"] for user in users)
+    assert jwks.fetches == 1
+
+
+def test_unknown_kid_refreshes_jwks_once(jwks, monkeypatch):
+    old_pem, old_public = _rsa_key("old")
+    new_pem, new_public = _rsa_key("new")
+    jwks.keys = [old_public]
+
+    async def run():
+        old_token = jwt.encode(_claims(), old_pem, algorithm="RS256", headers={"kid": "old"})
+        await auth._verify_uncached(old_token)
+
+        # Keys rotated; the first token with the new kid forces a refresh
+        jwks.keys = [old_public, new_public]
+        monkeypatch.setattr(auth, "JWKS_MIN_REFRESH_INTERVAL", 0)
+        new_token = jwt.encode(_claims(), new_pem, algorithm="RS256", headers={"kid": "new"})
+        user = await auth._verify_uncached(new_token)
+        fetches_after_rotation = jwks.fetches
+
+        # Unknown kids right after a refresh are rate limited
+        monkeypatch.setattr(auth, "JWKS_MIN_REFRESH_INTERVAL", 30.0)
+        bogus_pem, _ = _rsa_key("bogus")
+        bogus = jwt.encode(_claims(), bogus_pem, algorithm="RS256", headers={"kid": "bogus"})
+        with pytest.raises(HTTPException) as exc:
+            await auth._verify_uncached(bogus)
+        return user, fetches_after_rotation, exc.value.status_code
+
+    user, fetches_after_rotation, status = asyncio.run(run())
+    assert user["id"] == _claims()["sub"]
+    assert fetches_after_rotation == 2
+    assert jwks.fetches == 2
+    # No key for the kid and no remote fallback configured
+    assert status == 503
+
+
+def test_token_signed_with_another_key_for_known_kid_is_rejected(jwks):
+    _, public = _rsa_key("key-1")
+    forged_pem, _ = _rsa_key("key-1")
+    jwks.keys = [public]
+    token = jwt.encode(_claims(), forged_pem, algorithm="RS256", headers={"kid": "key-1"})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth._verify_uncached(token))
+    assert exc.value.status_code == 401
+
+
+def test_falls_back_to_supabase_without_a_secret(local_auth, monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", True)
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"id": "remote-user"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(auth, "get_http_client", lambda: client)
+    token = jwt.encode(_claims(), SECRET)
+
+    user = asyncio.run(auth._verify_uncached(token))
+    assert user == {"id": "remote-user"}
+    assert requests[0].url.path == "/auth/v1/user"
+    assert requests[0].headers["Authorization"] == f"Bearer {token}"
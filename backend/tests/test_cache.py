@@ -0,0 +1,175 @@
+"""Tests for the cache backends (app/cache)."""
+import asyncio
+
+import fakeredis
+import pytest
+from pydantic import BaseModel
+
+from app.cache.memory import SWEEP_INTERVAL, TTLCache
+from app.cache.redis_backend import RedisCacheBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Stats(BaseModel):
+    entries: int
+    avg_stress: float
+
+
+# TTLCache
+
+def test_ttl_cache_round_trip_and_expiry():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, default_ttl=60, clock=clock)
+    cache.set("a", {"n": 1})
+    cache.set("b", [1, 2], ttl=5)
+
+    clock.now += 4.9
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("b") == [1, 2]
+
+    clock.now += 0.1
+    assert cache.get("b", "missing") == "missing"
+    assert cache.get("a") == {"n": 1}
+    assert cache.stats()["expirations"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, default_ttl=60, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_invalidates_one_users_entries():
+    cache = TTLCache(max_entries=10, default_ttl=60, clock=FakeClock())
+    cache.set("stats:u1", 1, user_id="u1")
+    cache.set("profile:u1", 2, user_id="u1")
+    cache.set("stats:u2", 3, user_id="u2")
+
+    assert cache.invalidate_user("u1", prefixes=["stats:"]) == 1
+    assert cache.get("stats:u1") is None
+    assert cache.get("profile:u1") == 2
+
+    assert cache.invalidate_user("u1") == 1
+    assert cache.get("stats:u2") == 3
+
+
+def test_ttl_cache_sweeps_expired_entries_on_write():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, default_ttl=1, clock=clock)
+    cache.set("a", 1, user_id="u1")
+    clock.now += SWEEP_INTERVAL
+    cache.set("b", 2)
+
+    assert len(cache) == 1
+    assert cache.invalidate_user("u1") == 0
+
+
+# RedisCacheBackend
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _backend(server, **options) -> RedisCacheBackend:
+    options = {"default_ttl": 60, "max_ttl": 300, **options}
+    return RedisCacheBackend(fakeredis.aioredis.FakeRedis(server=server), **options)
+
+
+def test_redis_round_trip_encodes_models(server):
+    async def run():
+        backend = _backend(server)
+        await backend.set("insights:stats:u1", Stats(entries=3, avg_stress=41.5))
+        await backend.set("journal:u1", [{"id": "e1", "mood": None}])
+        return (
+            await backend.get("insights:stats:u1"),
+            await backend.get("journal:u1"),
+            await backend.get("missing", "default"),
+            backend.stats(),
+        )
+
+    stats, entries, missing, counters = asyncio.run(run())
+    assert stats == {"entries": 3, "avg_stress": 41.5}
+    assert entries == [{"id": "e1", "mood": None}]
+    assert missing == "default"
+    assert (counters["hits"], counters["misses"]) == (2, 1)
+
+
+def test_redis_ttl_is_capped_and_entries_expire(server):
+    async def run():
+        backend = _backend(server, max_ttl=120)
+        await backend.set("long", 1, ttl=3600)
+        await backend.set("short", 2, ttl=0.05)
+        await backend.set("never", 3, ttl=0)
+        long_ttl = await backend.client.pttl(backend._key("long"))
+        await asyncio.sleep(0.1)
+        return long_ttl, await backend.get("short"), await backend.get("never")
+
+    long_ttl, short, never = asyncio.run(run())
+    assert 0 < long_ttl <= 120_000
+    assert short is None
+    assert never is None
+
+
+def test_redis_invalidate_user_is_shared_between_workers(server):
+    async def run():
+        worker_a, worker_b = _backend(server), _backend(server)
+        await worker_a.set("profile:u1", {"name": "A"}, user_id="u1")
+        await worker_a.set("settings:u1", {"tz": "UTC"}, user_id="u1")
+        await worker_a.set("profile:u2", {"name": "B"}, user_id="u2")
+        seen_before = await worker_b.get("profile:u1")
+
+        removed_profile = await worker_b.invalidate_user("u1", prefixes=["profile:"])
+        after_profile = await worker_a.get("profile:u1"), await worker_a.get("settings:u1")
+        removed_rest = await worker_b.invalidate_user("u1")
+        return (
+            seen_before, removed_profile, after_profile, removed_rest,
+            await worker_a.get("settings:u1"), await worker_a.get("profile:u2"),
+        )
+
+    seen_before, removed_profile, after_profile, removed_rest, settings, other = asyncio.run(run())
+    assert seen_before == {"name": "A"}
+    assert removed_profile == 1
+    assert after_profile == (None, {"tz": "UTC"})
+    assert removed_rest == 1
+    assert settings is None
+    assert other == {"name": "B"}
+
+
+def test_redis_invalidate_prefix_escapes_glob_characters(server):
+    async def run():
+        backend = _backend(server)
+        await backend.set("a[1]:x", 1)
+        await backend.set("a1:x", 2)
+        removed = await backend.invalidate_prefix("a[1]")
+        return removed, await backend.get("a[1]:x"), await backend.get("a1:x")
+
+    assert asyncio.run(run()) == (1, None, 2)
+
+
+def test_redis_errors_degrade_to_misses(server):
+    async def run():
+        backend = _backend(server)
+        await backend.set("k", 1)
+        server.connected = False
+        await backend.set("k2", 2)
+        return await backend.get("k", "miss"), await backend.invalidate_user("u1"), backend.stats()
+
+    value, removed, counters = asyncio.run(run())
+    assert value == "miss"
+    assert removed == 0
+    assert counters["errors"] == 3
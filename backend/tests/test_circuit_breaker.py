@@ -0,0 +1,106 @@
+"""Tests for the circuit breaker (app/services/circuit_breaker.py)."""
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _tripped(clock) -> CircuitBreaker:
+    """A breaker that has just opened after two failures."""
+    breaker = CircuitBreaker("gemini", failure_threshold=2, reset_seconds=30, clock=clock)
+    for _ in range(2):
+        breaker.record_failure(breaker.before_call())
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_consecutive_failures_trip_the_breaker(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=2, reset_seconds=30, clock=clock)
+    breaker.record_failure(breaker.before_call())
+    breaker.record_success(breaker.before_call())
+    breaker.record_failure(breaker.before_call())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure(breaker.before_call())
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 2, "trips": 1, "rejected": 1}
+
+
+def test_one_probe_after_the_cooldown(clock):
+    breaker = _tripped(clock)
+    clock.now += 29.9
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    clock.now += 0.1
+    assert breaker.before_call() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+
+def test_probe_success_closes_the_breaker(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    breaker.record_success(breaker.before_call())
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.before_call() is False
+
+
+def test_probe_failure_reopens_for_another_cooldown(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    breaker.record_failure(breaker.before_call())
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["trips"] == 2
+    clock.now += 29.9
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    clock.now += 0.1
+    assert breaker.before_call() is True
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    breaker = _tripped(clock)
+    clock.now += 30
+    breaker.release(breaker.before_call())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.before_call() is True
+
+
+def test_calls_started_before_the_trip_do_not_end_the_probe(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=2, reset_seconds=30, clock=clock)
+    stragglers = [breaker.before_call() for _ in range(3)]
+    for _ in range(2):
+        breaker.record_failure(breaker.before_call())
+    clock.now += 30
+    probe = breaker.before_call()
+
+    # Late results of earlier calls neither decide nor free the probe slot
+    breaker.record_success(stragglers[0])
+    breaker.release(stragglers[1])
+    breaker.record_failure(stragglers[2])
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
@@ -0,0 +1,124 @@
+"""Tests for the event bus (app/events) and the events stream endpoint."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import app.events as events
+from app.events import RESYNC_EVENT, EventBus, TooManyConnections, queue_event
+from app.routers.events import stream_events
+
+
+def _drain(subscription) -> list:
+    items = []
+    while not subscription._queue.empty():
+        items.append(subscription._queue.get_nowait())
+    return items
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = EventBus(queue_size=3, max_connections_per_user=2)
+    monkeypatch.setattr(events, "_bus", bus)
+    return bus
+
+
+def test_events_reach_only_the_users_subscriptions(bus):
+    first, second, other = bus.subscribe("u1"), bus.subscribe("u1"), bus.subscribe("u2")
+    bus.publish("u1", "entry_analyzed", {"entry_id": "e1"})
+
+    assert _drain(first) == [("entry_analyzed", {"entry_id": "e1"})]
+    assert _drain(second) == [("entry_analyzed", {"entry_id": "e1"})]
+    assert _drain(other) == []
+
+
+def test_overflow_replaces_the_backlog_with_one_resync(bus):
+    slow, fast = bus.subscribe("u1"), bus.subscribe("u1")
+    for i in range(10):
+        bus.publish("u1", "stats_changed", {"n": i})
+        if i < 9:
+            _drain(fast)
+
+    assert _drain(slow) == [(RESYNC_EVENT, {"dropped": 10})]
+    assert _drain(fast) == [("stats_changed", {"n": 9})]
+    assert bus.stats()["overflows"] == 3
+
+    # Events after the resync are delivered normally again
+    bus.publish("u1", "stats_changed", {"n": 10})
+    assert _drain(slow) == [("stats_changed", {"n": 10})]
+
+
+def test_connection_limit_per_user(bus):
+    first = bus.subscribe("u1")
+    bus.subscribe("u1")
+    with pytest.raises(TooManyConnections):
+        bus.subscribe("u1")
+    bus.subscribe("u2")
+
+    first.close()
+    first.close()
+    bus.subscribe("u1")
+    assert bus.connections("u1") == 2
+
+
+@pytest.fixture
+def session():
+    with Session(create_engine("sqlite://")) as session:
+        yield session
+
+
+def test_queued_events_are_published_after_commit(bus, session):
+    subscription = bus.subscribe("u1")
+    session.execute(text("select 1"))
+    queue_event(session, "u1", "entry_analyzed", {"entry_id": "e1"})
+    assert _drain(subscription) == []
+
+    session.commit()
+    assert _drain(subscription) == [("entry_analyzed", {"entry_id": "e1"})]
+
+
+def test_queued_events_are_discarded_on_rollback(bus, session):
+    subscription = bus.subscribe("u1")
+    session.execute(text("select 1"))
+    queue_event(session, "u1", "entry_analyzed", {"entry_id": "e1"})
+    session.rollback()
+
+    # A later commit on the same session does not resurrect them
+    session.execute(text("select 1"))
+    session.commit()
+    assert _drain(subscription) == []
+
+
+def test_stream_subscribes_before_responding_and_releases(bus):
+    async def run():
+        response = await stream_events(user_id="u1")
+        connected = bus.connections("u1")
+        first = await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+        await response.background()
+        return connected, first
+
+    connected, first = asyncio.run(run())
+    assert connected == 1
+    assert first.startswith("event: ready\n")
+    assert bus.connections("u1") == 0
+
+
+def test_stream_that_never_starts_is_released(bus):
+    async def run():
+        response = await stream_events(user_id="u1")
+        await response.background()
+
+    asyncio.run(run())
+    assert bus.connections("u1") == 0
+
+
+def test_stream_over_the_limit_is_rejected_with_429(bus):
+    bus.subscribe("u1")
+    bus.subscribe("u1")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(stream_events(user_id="u1"))
+    assert exc.value.status_code == 429
+    assert bus.connections("u1") == 2
@@ -0,0 +1,180 @@
+"""Tests for Gemini call admission (app/services/gemini_scheduler.py)."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.gemini_scheduler import GeminiOverloaded, GeminiScheduler, Lane
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def no_output_estimate(monkeypatch):
+    """Charge calls for their prompt only, so costs are exact."""
+    monkeypatch.setattr(settings, "GEMINI_OUTPUT_TOKEN_ESTIMATE", 0)
+
+
+def _scheduler(clock, requests_per_minute=1, tokens_per_minute=1_000_000, free=10, premium=10):
+    return GeminiScheduler(
+        requests_per_minute, tokens_per_minute, {"free": free, "premium": premium}, clock=clock
+    )
+
+
+async def _settle() -> None:
+    """Let every runnable task take its next step."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def _advance(scheduler, clock, seconds: float) -> None:
+    """Move the clock and let the head of the queue re-check the buckets."""
+    clock.now += seconds
+    scheduler._wake_head()
+    await _settle()
+
+
+def test_waiters_are_admitted_by_lane_then_tier_then_arrival():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    admitted = []
+
+    async def call(name, lane, tier):
+        await scheduler.admit("x", lane, tier)
+        admitted.append(name)
+
+    async def run():
+        await call("first", Lane.interactive, "free")
+        # The request bucket is empty; everyone else queues
+        waiting = [
+            asyncio.create_task(call(*args)) for args in [
+                ("background premium", Lane.background, "premium"),
+                ("standard free", Lane.standard, "free"),
+                ("interactive free 1", Lane.interactive, "free"),
+                ("standard premium", Lane.standard, "premium"),
+                ("interactive premium", Lane.interactive, "premium"),
+                ("interactive free 2", Lane.interactive, "free"),
+            ]
+        ]
+        await _settle()
+        queued = scheduler.stats()["queued"]
+        # One request per minute: each minute admits exactly one waiter
+        for _ in waiting:
+            await _advance(scheduler, clock, 60)
+        await asyncio.gather(*waiting)
+        return queued
+
+    queued = asyncio.run(run())
+    assert queued == {"interactive": 3, "standard": 2, "background": 1}
+    assert admitted == [
+        "first",
+        "interactive premium",
+        "interactive free 1",
+        "interactive free 2",
+        "standard premium",
+        "standard free",
+        "background premium",
+    ]
+    assert scheduler.stats()["admitted"] == 7
+
+
+def test_token_bucket_waits_for_refill_and_is_corrected_by_usage():
+    clock = FakeClock()
+    # 150 tokens per minute refill 2.5 tokens per second
+    scheduler = _scheduler(clock, requests_per_minute=100, tokens_per_minute=150)
+    prompt = "x" * 400  # 100 tokens
+
+    async def run():
+        charged = await scheduler.admit(prompt, Lane.standard)
+        # The call used more than estimated: 20 tokens are left
+        scheduler.settle(charged, 130)
+        second = asyncio.create_task(scheduler.admit(prompt, Lane.standard))
+        await _settle()
+        waited = []
+        for seconds in (31.5, 0.5):
+            waited.append(second.done())
+            await _advance(scheduler, clock, seconds)
+        return charged, waited, await second
+
+    charged, waited, second = asyncio.run(run())
+    assert charged == 100
+    assert waited == [False, False]
+    assert second == 100
+    assert scheduler.stats()["tokens_available"] == 0
+
+
+def test_call_larger_than_the_bucket_is_charged_one_full_bucket():
+    scheduler = _scheduler(FakeClock(), requests_per_minute=100, tokens_per_minute=150)
+    charged = asyncio.run(scheduler.admit("x" * 4000, Lane.interactive))
+    assert charged == 150
+
+
+def test_calls_queued_behind_too_many_are_shed_by_tier():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, free=2, premium=3)
+
+    async def run():
+        await scheduler.admit("x", Lane.interactive)
+        waiting = [
+            asyncio.create_task(scheduler.admit("x", Lane.interactive, "free")),
+            asyncio.create_task(scheduler.admit("x", Lane.interactive, "free")),
+        ]
+        await _settle()
+
+        shed = []
+        for lane, tier in [
+            (Lane.interactive, "free"),  # 2 free calls ahead
+            (Lane.standard, "premium"),  # still only 2 ahead: queued
+            (Lane.interactive, "premium"),  # premium goes ahead of free
+            (Lane.standard, "free"),  # 4 ahead
+            (Lane.standard, "premium"),  # 4 ahead, premium limit 3
+        ]:
+            task = asyncio.create_task(scheduler.admit("x", lane, tier))
+            await _settle()
+            if task.done():
+                with pytest.raises(GeminiOverloaded):
+                    task.result()
+                shed.append(f"{lane.name}:{tier}")
+            else:
+                waiting.append(task)
+
+        # Background calls are never shed
+        waiting += [asyncio.create_task(scheduler.admit("x", Lane.background)) for _ in range(5)]
+        await _settle()
+        stats = scheduler.stats()
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        return shed, stats
+
+    shed, stats = asyncio.run(run())
+    assert shed == ["interactive:free", "standard:free", "standard:premium"]
+    assert stats["shed"] == {"interactive:free": 1, "standard:free": 1, "standard:premium": 1}
+    assert stats["queued"] == {"interactive": 3, "standard": 1, "background": 5}
+    assert scheduler.stats()["queued"] == {"interactive": 0, "standard": 0, "background": 0}
+
+
+def test_cancelled_head_hands_its_turn_to_the_next_waiter():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+
+    async def run():
+        await scheduler.admit("x", Lane.interactive)
+        head = asyncio.create_task(scheduler.admit("x", Lane.interactive))
+        nxt = asyncio.create_task(scheduler.admit("x", Lane.standard))
+        await _settle()
+        head.cancel()
+        clock.now += 60
+        await _settle()
+        await asyncio.wait_for(nxt, timeout=1)
+        return head.cancelled()
+
+    assert asyncio.run(run()) is True
+    assert scheduler.stats()["admitted"] == 2
+    assert scheduler.stats()["queued"]["interactive"] == 0
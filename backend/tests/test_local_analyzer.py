@@ -0,0 +1,47 @@
+"""Tests for the local pre-screen in app/services/local_analyzer.py."""
+import pytest
+
+from app.services.local_analyzer import analyze_locally
+
+CRISIS_ENTRIES = [
+    "great day. no reason to live",
+    "nice. ending it tonight",
+    "happy. cant go on",
+    "happy. can't go on",
+    "so happy, goodbye everyone forever",
+    "good good. I give up",
+    "يوم حلو. ابي اموت",
+]
+
+
+@pytest.mark.parametrize("content", CRISIS_ENTRIES)
+def test_crisis_language_is_never_answered_locally(content):
+    analysis = analyze_locally(content)
+    assert not analysis.decisive
+    assert analysis.confidence == 0
+    assert analysis.result["stress_score"] >= 85
+    assert analysis.result["detected_mood"] != "Happy"
+
+
+@pytest.mark.parametrize("content", [
+    # Too short to judge
+    "great day, so happy",
+    # Negation
+    "Today was good and calm, but I am not happy with how things are going",
+    # Stressed hit next to calm ones
+    "Had a good and happy morning with friends but work was stressful later",
+    # Distress word the mood lexicon does not score
+    "Good lunch with friends and a nice walk, but I feel so alone at night",
+])
+def test_mixed_or_short_entries_escalate(content):
+    assert not analyze_locally(content).decisive
+
+
+@pytest.mark.parametrize("content", [
+    "Today was a really good day, I felt happy and grateful for my friends and family",
+    "يوم جميل جدا، كنت سعيد ومرتاح مع العائلة والحمدلله على كل النعم اليوم",
+])
+def test_clearly_calm_entries_are_answered_locally(content):
+    analysis = analyze_locally(content)
+    assert analysis.decisive
+    assert analysis.result["stress_score"] <= 40
@@ -0,0 +1,34 @@
+"""Tests for SSE framing (app/sse.py) and streamed field extraction."""
+import json
+
+import pytest
+
+from app.services.gemini_service import _FieldStreamer
+from app.sse import sse_comment, sse_event
+
+
+def test_event_is_one_data_line_terminated_by_blank_line():
+    frame = sse_event("delta", {"text": "line one\nline two"})
+    assert frame == 'event: delta\ndata: {"text": "line one\\nline two"}\n\n'
+    event_line, data_line, blank, end = frame.split("\n")
+    assert event_line == "event: delta"
+    assert (blank, end) == ("", "")
+    assert json.loads(data_line.removeprefix("data: ")) == {"text": "line one\nline two"}
+
+
+def test_comment_is_not_an_event():
+    assert sse_comment() == ": ping\n\n"
+
+
+def _stream(response: str, chunk_size: int) -> str:
+    streamer = _FieldStreamer("supportive_message")
+    return "".join(
+        streamer.feed(response[i:i + chunk_size]) for i in range(0, len(response), chunk_size)
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+def test_field_streamer_handles_split_escapes(chunk_size):
+    message = 'Breathe — "slowly".\nYou\'re safe \U0001F49A سلام'
+    response = json.dumps({"stress_score": 40, "supportive_message": message, "key_themes": []})
+    assert _stream(response, chunk_size) == message
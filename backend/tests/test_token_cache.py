@@ -0,0 +1,102 @@
+"""Tests for the verified token cache (app/auth.py `TokenCache`)."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from jose import jwt
+
+from app import auth
+from app.auth import TokenCache
+
+SECRET = "test-jwt-secret"
+
+
+def _token(expires_in: int = 3600) -> str:
+    return jwt.encode({"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + expires_in}, SECRET)
+
+
+def _cache(**options) -> TokenCache:
+    return TokenCache(**{"max_entries": 100, "max_ttl": 3600, "negative_ttl": 10, **options})
+
+
+def test_concurrent_lookups_share_one_verification():
+    cache = _cache()
+    token = _token()
+    calls = []
+
+    async def verify(raw: str) -> dict:
+        calls.append(raw)
+        await asyncio.sleep(0.05)
+        return {"id": "user-1"}
+
+    async def run():
+        users = await asyncio.gather(*(cache.get_or_verify(token, verify) for _ in range(20)))
+        users.append(await cache.get_or_verify(token, verify))
+        return users
+
+    users = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(user == {"id": "user-1"} for user in users)
+
+
+def test_rejections_are_cached_but_outages_are_not():
+    cache = _cache()
+    calls = {"bad": 0, "down": 0}
+
+    async def reject(raw: str) -> dict:
+        calls["bad"] += 1
+        raise auth._unauthorized()
+
+    async def unavailable(raw: str) -> dict:
+        calls["down"] += 1
+        raise HTTPException(status_code=503, detail="Supabase auth unavailable")
+
+    async def run():
+        codes = []
+        for token, verify in [("bad", reject)] * 3 + [("down", unavailable)] * 3:
+            try:
+                await cache.get_or_verify(token, verify)
+            except HTTPException as exc:
+                codes.append(exc.status_code)
+        return codes
+
+    assert asyncio.run(run()) == [401] * 3 + [503] * 3
+    assert calls == {"bad": 1, "down": 3}
+
+
+def test_cached_user_expires_with_the_token(monkeypatch):
+    cache = _cache(max_ttl=600)
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(auth, "time", SimpleNamespace(monotonic=lambda: clock["now"], time=time.time))
+    token = _token(expires_in=60)
+    calls = []
+
+    async def verify(raw: str) -> dict:
+        calls.append(raw)
+        return {"id": "user-1"}
+
+    async def run():
+        await cache.get_or_verify(token, verify)
+        clock["now"] += 50
+        await cache.get_or_verify(token, verify)
+        clock["now"] += 15
+        await cache.get_or_verify(token, verify)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_token_cache_is_bounded():
+    cache = _cache(max_entries=2)
+
+    async def verify(raw: str) -> dict:
+        return {"id": raw}
+
+    async def run():
+        for token in ("a", "b", "c"):
+            await cache.get_or_verify(token, verify)
+
+    asyncio.run(run())
+    assert len(cache._entries) == 2
+    assert cache._get(TokenCache._key("a")) is auth._MISS
@@ -2,7 +2,7 @@
  * React hook for Sakina AI API operations.
  * Provides methods to interact with the Python backend.
  */
-import { useState, useCallback, useEffect } from 'react';
+import { useState, useCallback, useEffect, useSyncExternalStore } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import {
     createJournalEntry,
@@ -11,12 +11,14 @@ import {
     deleteJournalEntry,
     checkForNudge,
     getWeeklyInsights,
+    streamWeeklyInsights,
     getInsightsStats,
     getJournalingStreak,
     logIntervention,
     checkApiHealth,
     updateUserProfile,
     getUserProfile,
+    subscribeToEvents,
     type JournalEntryResponse,
     type NudgeDecision,
     type StressPattern,
@@ -25,11 +27,111 @@ import {
     type UserProfile,
 } from '@/lib/api-client';
 import { toast } from '@/hooks/use-toast';
+// ═══════════════════════════════════════════════════════════════════════════════
+// Live Updates (Server-Sent Events)
+// ═══════════════════════════════════════════════════════════════════════════════
+
+// Queries whose data changes when the user's data version is bumped
+const LIVE_QUERY_KEYS = [
+    'journal-entries',
+    'dashboard-summary',
+    'insights-stats',
+    'insights-summary',
+    'journaling-streak',
+    'user-profile',
+];
+const MAX_RECONNECT_DELAY = 30 * 1000;
+
+let liveUpdatesConnected = false;
+const liveUpdatesListeners = new Set<() => void>();
+
+function setLiveUpdatesConnected(connected: boolean) {
+    if (liveUpdatesConnected === connected) return;
+    liveUpdatesConnected = connected;
+    liveUpdatesListeners.forEach((listener) => listener());
+}
+
+/**
+ * Whether the event stream is connected. Hooks only poll while it is not.
+ */
+export function useLiveUpdatesConnected() {
+    return useSyncExternalStore(
+        (listener) => {
+            liveUpdatesListeners.add(listener);
+            return () => liveUpdatesListeners.delete(listener);
+        },
+        () => liveUpdatesConnected
+    );
+}
+
+/**
+ * Keep the user's event stream open while mounted (once, in the app layout)
+ * and refetch the affected queries when the server reports a change.
+ * Reconnects with exponential backoff.
+ */
+export function useLiveUpdates() {
+    const queryClient = useQueryClient();
+
+    useEffect(() => {
+        const controller = new AbortController();
+        // Join a refetch already in flight instead of restarting it
+        const refresh = (keys: string[]) => keys.forEach((key) =>
+            queryClient.invalidateQueries({ queryKey: [key] }, { cancelRefetch: false })
+        );
+
+        const run = async () => {
+            let delay = 1000;
+            let reconnecting = false;
+            while (!controller.signal.aborted) {
+                try {
+                    await subscribeToEvents((message) => {
+                        switch (message.event) {
+                            case 'ready':
+                                setLiveUpdatesConnected(true);
+                                delay = 1000;
+                                // Changes made while disconnected were not pushed
+                                if (reconnecting) refresh([...LIVE_QUERY_KEYS, 'nudge-check']);
+                                break;
+                            case 'entry_analyzed':
+                                refresh(['journal-entries', 'dashboard-summary']);
+                                break;
+                            case 'stats_changed':
+                                refresh(LIVE_QUERY_KEYS);
+                                break;
+                            case 'nudge_available':
+                                refresh(['nudge-check', 'dashboard-summary']);
+                                break;
+                            case 'resync':
+                                refresh([...LIVE_QUERY_KEYS, 'nudge-check']);
+                                break;
+                        }
+                    }, controller.signal);
+                } catch (error) {
+                    if (controller.signal.aborted) break;
+                    console.warn('[API] Event stream disconnected', error);
+                }
+                setLiveUpdatesConnected(false);
+                reconnecting = true;
+                await new Promise((resolve) => setTimeout(resolve, delay * (0.5 + Math.random() / 2)));
+                delay = Math.min(delay * 2, MAX_RECONNECT_DELAY);
+            }
+        };
+
+        run();
+        return () => {
+            controller.abort();
+            setLiveUpdatesConnected(false);
+        };
+    }, [queryClient]);
+}
+
 // ═══════════════════════════════════════════════════════════════════════════════
 // Journal Hook
 // ═══════════════════════════════════════════════════════════════════════════════
 
 export function useJournalEntries(mood?: string) {
+    const live = useLiveUpdatesConnected();
+
     return useQuery({
         queryKey: ['journal-entries', mood],
         queryFn: () => getJournalEntries({ mood }),
@@ -37,7 +139,8 @@ export function useJournalEntries(mood?: string) {
         retry: 2,
         refetchInterval: (query) => {
             const data = query.state.data;
-            if (!data) return false;
+            // Analysis results are pushed while the event stream is up
+            if (!data || live) return false;
             // Check if any entry is pending analysis
             const hasPendingAnalysis = data.some((entry) => !entry.analyzed_at);
             return hasPendingAnalysis ? 2000 : false;
@@ -105,11 +208,14 @@ export function useDeleteJournalEntry() {
 // ═══════════════════════════════════════════════════════════════════════════════
 
 export function useNudgeCheck() {
+    const live = useLiveUpdatesConnected();
+
     return useQuery({
         queryKey: ['nudge-check'],
         queryFn: checkForNudge,
         staleTime: 5 * 60 * 1000, // 5 minutes
-        refetchInterval: 5 * 60 * 1000, // Refetch every 5 minutes
+        // Refetch every 5 minutes, unless new nudges are pushed
+        refetchInterval: live ? false : 5 * 60 * 1000,
         retry: 1,
     });
 }
@@ -156,7 +262,7 @@ export function useInsightsData(days: number = 7) {
     // Optimization: Reuse data from dashboard-summary query if immediately available (hydration)
     // The dashboard fetches 7-day stats and streak, so we can use that to show data INSTANTLY.
     const dashboardData = queryClient.getQueryData<DashboardSummary>(['dashboard-summary']);
-    const initialData = (days === 7 && dashboardData) ? {
+    const initialData = (days === 7 && dashboardData?.stats && dashboardData.streak) ? {
         stats: dashboardData.stats,
         streak: dashboardData.streak
     } : undefined;
@@ -170,10 +276,19 @@ export function useInsightsData(days: number = 7) {
         retry: 2,
     });
 
-    // Slow path: AI-generated insights (loads separately)
+    // Slow path: AI-generated insights, with the summary streamed in as
+    // Gemini writes it (shown until the final result replaces it)
+    const [streamingSummary, setStreamingSummary] = useState('');
     const aiQuery = useQuery({
         queryKey: ['weekly-insights', days],
-        queryFn: () => getWeeklyInsights(days),
+        queryFn: ({ signal }) => {
+            setStreamingSummary('');
+            return streamWeeklyInsights(
+                days,
+                (text) => setStreamingSummary((current) => current + text),
+                signal
+            );
+        },
         staleTime: 30 * 60 * 1000, // 30 minutes - cache AI results longer
         retry: 2,
     });
@@ -188,6 +303,7 @@ export function useInsightsData(days: number = 7) {
         // AI insights load separately (slower)
         insights: aiQuery.data,
         insightsLoading: aiQuery.isLoading,
+        streamingSummary,
         insightsError: aiQuery.isError,
 
         // Combined loading state - true only if stats are loading
@@ -276,6 +392,7 @@ import { getDashboardSummary, type DashboardSummary } from '@/lib/api-client';
 
 export function useDashboardData() {
     const queryClient = useQueryClient();
+    const live = useLiveUpdatesConnected();
 
     const dashboardQuery = useQuery({
         queryKey: ['dashboard-summary'],
@@ -284,9 +401,9 @@ export function useDashboardData() {
         retry: 2,
         refetchInterval: (query) => {
             const data = query.state.data;
-            if (!data) return false;
+            if (!data || live) return false;
             // Poll if any entry is pending analysis
-            const hasPendingAnalysis = data.entries.some((entry) => !entry.analyzed_at);
+            const hasPendingAnalysis = (data.entries ?? []).some((entry) => !entry.analyzed_at);
             return hasPendingAnalysis ? 3000 : false;
         },
     });
@@ -295,9 +412,9 @@ export function useDashboardData() {
         isLoading: dashboardQuery.isLoading,
         isError: dashboardQuery.isError,
         entries: dashboardQuery.data?.entries || [],
-        nudge: dashboardQuery.data?.nudge,
-        stats: dashboardQuery.data?.stats,
-        streak: dashboardQuery.data?.streak,
+        nudge: dashboardQuery.data?.nudge ?? undefined,
+        stats: dashboardQuery.data?.stats ?? undefined,
+        streak: dashboardQuery.data?.streak ?? undefined,
         refetch: () => {
             dashboardQuery.refetch();
             // Also invalidate individual queries so other pages get fresh data
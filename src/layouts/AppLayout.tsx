@@ -8,11 +8,13 @@ import { BioFeedbackPanel } from '@/components/app/BioFeedbackPanel';
 import { Sheet, SheetContent } from '@/components/ui/sheet';
 import { Suspense } from 'react';
 import { ContentLoader } from '@/components/app/ContentLoader';
+import { useLiveUpdates } from '@/hooks/useApi';
 
 export function AppLayout() {
   const [isPanelOpen, setIsPanelOpen] = useState(false);
   const [isSidebarCollapsed, setIsSidebarCollapsed] = useState(false);
   const location = useLocation();
+  useLiveUpdates();
 
   return (
     <div
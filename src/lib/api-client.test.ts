@@ -0,0 +1,57 @@
+import { describe, it, expect } from 'vitest';
+import { ReadableStream as NodeReadableStream } from 'node:stream/web';
+import { readEventStream } from './api-client';
+
+function streamOf(chunks: (string | Uint8Array)[]): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder();
+  return new NodeReadableStream<Uint8Array>({
+    start(controller) {
+      for (const chunk of chunks) {
+        controller.enqueue(typeof chunk === 'string' ? encoder.encode(chunk) : chunk);
+      }
+      controller.close();
+    },
+  }) as unknown as ReadableStream<Uint8Array>;
+}
+
+async function collect(chunks: (string | Uint8Array)[]) {
+  const events: [string, unknown][] = [];
+  await readEventStream(streamOf(chunks), (event, data) => events.push([event, data]));
+  return events;
+}
+
+describe('readEventStream', () => {
+  it('parses named events', async () => {
+    expect(await collect(['event: delta\ndata: {"text":"Hi"}\n\nevent: result\ndata: {"ok":true}\n\n'])).toEqual([
+      ['delta', { text: 'Hi' }],
+      ['result', { ok: true }],
+    ]);
+  });
+
+  it('joins multi-line data with newlines', async () => {
+    expect(await collect(['event: result\ndata: {"text":\ndata: "a"}\n\n'])).toEqual([
+      ['result', { text: 'a' }],
+    ]);
+  });
+
+  it('reassembles events split across chunks', async () => {
+    expect(await collect(['eve', 'nt: delta\nda', 'ta: {"text":"sal', 'am"}\n', '\nevent: ready\ndata: {}\n\n'])).toEqual([
+      ['delta', { text: 'salam' }],
+      ['ready', {}],
+    ]);
+  });
+
+  it('decodes multi-byte characters split across chunks', async () => {
+    const bytes = new TextEncoder().encode('event: delta\ndata: {"text":"سلام"}\n\n');
+    const cut = bytes.indexOf(0xd8) + 1;
+    expect(await collect([bytes.slice(0, cut), bytes.slice(cut)])).toEqual([
+      ['delta', { text: 'سلام' }],
+    ]);
+  });
+
+  it('skips heartbeat comments and accepts data without a space', async () => {
+    expect(await collect([': ping\n\n', 'event: stats_changed\r\ndata:{"version":3}\r\n\n'])).toEqual([
+      ['stats_changed', { version: 3 }],
+    ]);
+  });
+});
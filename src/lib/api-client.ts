@@ -38,6 +38,9 @@ export interface NudgeDecision {
   nudge_type: 'breathing' | 'grounding' | 'reflection';
   context: string;
   priority: 'low' | 'medium' | 'high';
+  // Set when served from the server-side cache (dashboard)
+  computed_at?: string | null;
+  stale?: boolean;
 }
 
 export interface StressPattern {
@@ -124,6 +127,88 @@ async function apiRequest<T>(
 
   return response.json();
 }
+
+/**
+ * Read a Server-Sent Events body, calling `onEvent` with each event's name
+ * and parsed JSON data. Events may arrive split across chunks; multi-line
+ * `data:` fields are joined with newlines. Comment lines (heartbeats) are
+ * skipped.
+ */
+export async function readEventStream(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: string, data: unknown) => void
+): Promise<void> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary: number;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      const data: string[] = [];
+      for (const raw of block.split('\n')) {
+        const line = raw.endsWith('\r') ? raw.slice(0, -1) : raw;
+        if (line.startsWith(':')) continue;
+        const colon = line.indexOf(':');
+        const field = colon === -1 ? line : line.slice(0, colon);
+        let value = colon === -1 ? '' : line.slice(colon + 1);
+        if (value.startsWith(' ')) value = value.slice(1);
+        if (field === 'event') event = value;
+        else if (field === 'data') data.push(value);
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')));
+    }
+  }
+}
+
+/**
+ * POST to a Server-Sent Events endpoint. Calls `onDelta` with each `delta`
+ * event's text as it arrives and resolves with the final `result` event.
+ */
+async function streamRequest<T>(
+  endpoint: string,
+  body: unknown,
+  { onDelta, signal }: { onDelta?: (text: string) => void; signal?: AbortSignal } = {}
+): Promise<T> {
+  const token = await getAuthToken();
+  if (!token) {
+    console.warn('[API] No auth token found');
+    throw new Error('Not authenticated');
+  }
+
+  const response = await fetch(`${API_BASE}${endpoint}`, {
+    method: 'POST',
+    signal,
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'text/event-stream',
+      'Authorization': `Bearer ${token}`,
+    },
+    body: JSON.stringify(body),
+  });
+
+  if (!response.ok || !response.body) {
+    console.error(`[API] Error ${response.status} ${endpoint}`);
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || `API Error: ${response.status}`);
+  }
+
+  let result: T | undefined;
+  await readEventStream(response.body, (event, data) => {
+    if (event === 'delta') onDelta?.((data as { text: string }).text);
+    else if (event === 'result') result = data as T;
+  });
+
+  if (result === undefined) {
+    throw new Error('Stream ended without a result');
+  }
+  return result;
+}
 
 // ══════════════════════════════════════════════════════════════════════════════?
 // Journal API
@@ -232,6 +317,18 @@ export async function getWeeklyInsights(days: number = 7): Promise<StressPattern
   });
 }
 
+/**
+ * Get weekly AI insights, streaming the summary to `onDelta` as it is
+ * written. Resolves with the final insights.
+ */
+export async function streamWeeklyInsights(
+  days: number,
+  onDelta: (text: string) => void,
+  signal?: AbortSignal
+): Promise<StressPattern> {
+  return streamRequest<StressPattern>('/api/insights/weekly/stream', { days }, { onDelta, signal });
+}
+
 /**
  * Get quick stats
  */
@@ -314,6 +411,7 @@ export interface UserProfile extends UserOnboardingRequest {
   id: string;
   email: string;
   locale: string;
+  timezone: string;
   theme: string;
   subscription: string;
   nudge_enabled: boolean;
@@ -346,10 +444,13 @@ export interface JournalingStreak {
 }
 
 export interface DashboardSummary {
-  entries: JournalEntryResponse[];
-  nudge: NudgeDecision;
-  stats: InsightsStats;
-  streak: JournalingStreak;
+  // Sections that failed or timed out on the server are null
+  entries: JournalEntryResponse[] | null;
+  nudge: NudgeDecision | null;
+  stats: InsightsStats | null;
+  streak: JournalingStreak | null;
+  partial: boolean;
+  failed_sections: string[];
 }
 
 /**
@@ -372,6 +473,49 @@ export interface InsightsSummary {
 export async function getInsightsSummary(days: number = 7): Promise<InsightsSummary> {
   return apiRequest<InsightsSummary>(`/api/insights/summary?days=${days}`);
 }
+
+// ══════════════════════════════════════════════════════════════════════════════?
+// Events API
+// ══════════════════════════════════════════════════════════════════════════════?
+
+export type ServerEvent =
+  | { event: 'ready'; data: { heartbeat_seconds: number } }
+  | { event: 'entry_analyzed'; data: { entry_id: string; stress_score: number; analyzed_at: string } }
+  | { event: 'nudge_available'; data: { nudge_type: string; priority: string; computed_at: string } }
+  | { event: 'stats_changed'; data: { version: number } }
+  | { event: 'resync'; data: { dropped?: number; reason?: string } };
+
+/**
+ * Hold the user's event stream open (Server-Sent Events), calling `onEvent`
+ * for each event. Resolves when the server closes the stream; rejects on
+ * network errors. Abort `signal` to disconnect.
+ */
+export async function subscribeToEvents(
+  onEvent: (event: ServerEvent) => void,
+  signal?: AbortSignal
+): Promise<void> {
+  const token = await getAuthToken();
+  if (!token) {
+    throw new Error('Not authenticated');
+  }
+
+  const response = await fetch(`${API_BASE}/api/events`, {
+    signal,
+    headers: {
+      'Accept': 'text/event-stream',
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Event stream error: ${response.status}`);
+  }
+
+  await readEventStream(response.body, (event, data) => {
+    onEvent({ event, data } as ServerEvent);
+  });
+}
+
 // ══════════════════════════════════════════════════════════════════════════════?
 // Voice Journal API (Appended)
 // ══════════════════════════════════════════════════════════════════════════════?
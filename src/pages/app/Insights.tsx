@@ -28,6 +28,7 @@ export default function Insights() {
     streak,
     insights,
     insightsLoading,
+    streamingSummary,
     isLoading,
     isError,
     refetch
@@ -113,7 +114,9 @@ export default function Insights() {
               </div>
             </CardHeader>
             <CardContent>
-              {insightsLoading ? (
+              {insightsLoading && streamingSummary ? (
+                <p className="text-foreground">{streamingSummary}</p>
+              ) : insightsLoading ? (
                 <div className="space-y-2">
                   <Skeleton className="h-4 w-full" />
                   <Skeleton className="h-4 w-3/4" />